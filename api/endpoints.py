@@ -5,107 +5,359 @@ This module defines FastAPI endpoints that provide a unified interface
 for accessing data from different brokers.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import List, Dict, Any, Optional
+import io
+import json
+import base64
+import asyncio
+import polars as pl
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Optional, Iterator, AsyncIterator
 
-from brokers.factory import BrokerFactory
 from brokers.base.broker import BaseBroker
-from logger import get_logger
 
 router = APIRouter()
 
+MASTER_DATA_PAGE_SIZE = 5000
+MASTER_DATA_MAX_PAGE_SIZE = 50000
+MASTER_DATA_STREAM_BATCH_SIZE = 10000
+INSTRUMENT_SEARCH_MAX_LIMIT = 100
+OPTION_CHAIN_QUOTE_METHODS = {
+    "none": None,
+    "ltp": "ltp_quote",
+    "ohlc": "ohlc_quote",
+    "full": "full_market_quote",
+}
+# Seconds between keep-alive comments on an idle quote event stream.
+QUOTE_STREAM_KEEPALIVE = 15
+QUOTE_STREAM_MAX_RATE = 10
+MASTER_DATA_STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
 
-def get_broker_config(broker_type: str) -> Dict[str, Any]:
+
+async def get_broker(
+    request: Request,
+    broker_type: str = Query(..., description="Broker type (e.g., 'upstox', 'zerodha')"),
+    account_name: Optional[str] = Query(None, description="Broker account name (defaults to the primary account)")
+):
     """
-    Retrieve broker configuration based on broker type.
+    Dependency to get the pooled, initialized broker instance based on type.
     
     Args:
-        broker_type (str): The type of broker to retrieve configuration for.
+        request (Request): The incoming request, used to reach the app's broker pool.
+        broker_type (str): The type of broker to use.
+        account_name (Optional[str]): The account name or ID for the broker.
         
     Returns:
-        Dict[str, Any]: Broker configuration dictionary.
+        BaseBroker: An initialized broker instance.
+        
+    Raises:
+        HTTPException: If the broker is not configured or its initialization fails.
+    """
+    try:
+        broker_pool = request.app.state.broker_pool
+        return await broker_pool.get(broker_type, account_name)
+    except ValueError as err:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid request: {str(err)}"
+        )
+    except Exception as err:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error initializing {broker_type} broker: {str(err)}"
+        )
+
+
+def _encode_cursor(master_trading_date: Optional[str], last_key: Any) -> str:
     """
-    import os
-    import json
-    import boto3 
+    Build an opaque master data pagination cursor.
 
-    UPSTOX_CONFIG_SECRET_NAME = os.getenv("UPSTOX_CONFIG_SECRET_NAME", "my_upstox_config")
-    secrets_client = boto3.client("secretsmanager")
+    Args:
+        master_trading_date (Optional[str]): Trading date of the broker's loaded master.
+        last_key (Any): Key (MASTER_KEY_COLUMN) of the last row returned.
 
-    if broker_type.lower() == "upstox":
-        upstox_config_secret = secrets_client.get_secret_value(SecretId=UPSTOX_CONFIG_SECRET_NAME)
-        upstox_config_json = json.loads(upstox_config_secret["SecretString"])
+    Returns:
+        str: The URL-safe cursor.
+    """
+    return base64.urlsafe_b64encode(json.dumps([master_trading_date, last_key]).encode()).decode()
 
-        return upstox_config_json
-    # Add other brokers as needed
 
+def _cursor_offset(cursor: Optional[str], master_trading_date: Optional[str], keys: pl.Series) -> int:
+    """
+    Find the row offset a master data pagination cursor continues from.
 
-async def get_broker(broker_type: str = Query(..., description="Broker type (e.g., 'upstox', 'zerodha')")):
+    Cursors are tied to the master they were issued for: the master is
+    replaced every trading day, so a cursor from a previous master, or whose
+    last row is no longer in the result, is rejected rather than silently
+    skipping or repeating rows.
+
+    Args:
+        cursor (Optional[str]): Cursor returned as `next_cursor` by a previous page.
+        master_trading_date (Optional[str]): Trading date of the broker's loaded master.
+        keys (pl.Series): Keys (MASTER_KEY_COLUMN) of the filtered master rows.
+
+    Returns:
+        int: The row offset to start from.
+
+    Raises:
+        ValueError: If the cursor is malformed or stale.
+    """
+    if not cursor:
+        return 0
+    try:
+        cursor_date, last_key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError(f"Malformed cursor: {cursor}")
+    if cursor_date != master_trading_date:
+        raise ValueError("Stale cursor: the master data has been reloaded, restart paging")
+    positions = (keys == last_key).arg_true()
+    if positions.is_empty():
+        raise ValueError("Stale cursor: its last instrument is no longer in the master data")
+    return positions[0] + 1
+
+
+def _stream_master_data(df: pl.DataFrame, format: str) -> Iterator[bytes]:
+    """
+    Serialize master data in fixed-size row batches.
+
+    Only one batch is serialized at a time, so the full response is never
+    built in memory.
+
+    Args:
+        df (pl.DataFrame): The filtered master data.
+        format (str): One of 'ndjson', 'csv' or 'arrow'.
+
+    Yields:
+        bytes: The next part of the response body.
+    """
+    if format == "arrow":
+        import pyarrow as pa
+
+        buffer = io.BytesIO()
+        writer = pa.ipc.new_stream(buffer, df.head(0).to_arrow().schema)
+        for offset in range(0, df.height, MASTER_DATA_STREAM_BATCH_SIZE):
+            writer.write_table(df.slice(offset, MASTER_DATA_STREAM_BATCH_SIZE).to_arrow())
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        writer.close()
+        yield buffer.getvalue()
+        return
+
+    for offset in range(0, max(df.height, 1), MASTER_DATA_STREAM_BATCH_SIZE):
+        batch = df.slice(offset, MASTER_DATA_STREAM_BATCH_SIZE)
+        if format == "csv":
+            yield batch.write_csv(include_header=(offset == 0)).encode()
+        elif not batch.is_empty():
+            yield batch.write_ndjson().encode()
+
+
+@router.get("/master-data")
+async def get_master_data(
+    segment: Optional[List[str]] = Query(None, description="Segments to include (e.g., 'NSE_FO' for Upstox, 'NFO-OPT' for Zerodha)"),
+    instrument_type: Optional[List[str]] = Query(None, description="Instrument types to include"),
+    underlying: Optional[str] = Query(None, description="Underlying name (e.g., 'NIFTY')"),
+    expiry: Optional[str] = Query(None, description="Expiry date in 'YYYY-MM-DD' format"),
+    columns: Optional[str] = Query(None, description="Comma separated columns to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's 'next_cursor'; enables paging"),
+    limit: Optional[int] = Query(None, ge=1, le=MASTER_DATA_MAX_PAGE_SIZE, description=f"Rows per page (json format); enables paging, defaults to {MASTER_DATA_PAGE_SIZE} when paging"),
+    format: str = Query("json", description="Response format: 'json', 'ndjson', 'csv' or 'arrow' (streamed)"),
+    broker=Depends(get_broker)
+):
     """
-    Dependency to get initialized broker instance based on type.
+    Get the broker's master data.
+
+    The master can be filtered and projected server-side. The 'json' format
+    returns every matching row unless paging is requested with `cursor` or
+    `limit`: then it returns one page of rows and a `next_cursor` to fetch
+    the next one (None on the last page). The 'ndjson', 'csv' and 'arrow'
+    formats stream every matching row from the cursor onwards. Cursors are
+    opaque and only valid for the master they were issued for; once the
+    daily master is reloaded they are rejected and paging must restart.
     
     Args:
-        broker_type (str): The type of broker to use.
-        account_name (str): The account name or ID for the broker.
+        segment: Segments to include.
+        instrument_type: Instrument types to include.
+        underlying: Underlying name to include.
+        expiry: Expiry date to include.
+        columns: Comma separated columns to return.
+        cursor: Pagination cursor.
+        limit: Rows per page for the 'json' format.
+        format: Response format.
+        broker: The broker instance from the dependency.
         
     Returns:
-        BaseBroker: An initialized broker instance.
+        Dict | StreamingResponse: Response containing master data.
         
     Raises:
-        HTTPException: If broker initialization fails.
+        HTTPException: If the request is invalid or data retrieval fails.
     """
     try:
-        logger = get_logger(
-            name=f"{broker_type.capitalize()}Broker",
-            log_group="DataPipeline",
-            log_stream="broker",
+        if format not in MASTER_DATA_STREAM_MEDIA_TYPES and format != "json":
+            raise ValueError(f"Unsupported format: {format}")
+        selected = [column.strip() for column in columns.split(",") if column.strip()] if columns else None
+        # Cursors are keyed on MASTER_KEY_COLUMN, so it is selected even when not returned.
+        key_column = broker.MASTER_KEY_COLUMN
+        master_df = broker.filter_master(
+            segments=segment,
+            instrument_types=instrument_type,
+            underlying=underlying,
+            expiry=expiry,
+            columns=selected + [key_column] if selected and key_column not in selected else selected
         )
+        keys = master_df[key_column]
+        if selected and key_column not in selected:
+            master_df = master_df.drop(key_column)
+        offset = _cursor_offset(cursor, broker.master_trading_date, keys)
+
+        if format != "json":
+            return StreamingResponse(
+                _stream_master_data(master_df.slice(offset), format),
+                media_type=MASTER_DATA_STREAM_MEDIA_TYPES[format]
+            )
 
-        broker_config = get_broker_config(broker_type)
+        if cursor is None and limit is None:
+            return {"status": "success", "data": master_df.to_dicts()}
 
-        broker = BrokerFactory.create_broker(
-            broker_type=broker_type,
-            logger=logger,
-            config=broker_config
+        page = master_df.slice(offset, limit or MASTER_DATA_PAGE_SIZE)
+        next_offset = offset + page.height
+        return {
+            "status": "success",
+            "data": page.to_dicts(),
+            "next_cursor": (
+                _encode_cursor(broker.master_trading_date, keys[next_offset - 1])
+                if next_offset < master_df.height else None
+            )
+        }
+    except ValueError as err:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid request: {str(err)}"
         )
-        await broker.initialize()
-        return broker
     except Exception as err:
         raise HTTPException(
             status_code=500,
-            detail=f"Error initializing {broker_type} broker: {str(err)}"
+            detail=f"Error retrieving master data: {str(err)}"
         )
 
 
-@router.get("/master-data")
-async def get_master_data(broker=Depends(get_broker)):
+@router.get("/instruments/search")
+async def search_instruments(
+    q: str = Query(..., min_length=1, description="Tradingsymbol or name prefix (e.g., 'NIFTY', 'reliance')"),
+    limit: int = Query(20, ge=1, le=INSTRUMENT_SEARCH_MAX_LIMIT, description="Maximum number of results"),
+    segment: Optional[List[str]] = Query(None, description="Segments to search (e.g., 'NSE_EQ' for Upstox, 'NSE' for Zerodha)"),
+    fuzzy: bool = Query(True, description="Top up prefix matches with fuzzy matches"),
+    broker=Depends(get_broker)
+):
     """
-    Get the broker's master data.
-    
+    Search the broker's instruments by tradingsymbol or name.
+
     Args:
+        q: The search text.
+        limit: Maximum number of results.
+        segment: Segments to search.
+        fuzzy: Whether to top up prefix matches with fuzzy matches.
         broker: The broker instance from the dependency.
-        
+
     Returns:
-        Dict: Response containing master data.
-        
+        Dict: Response containing the matching instruments.
+
     Raises:
-        HTTPException: If data retrieval fails.
+        HTTPException: If the search fails.
     """
     try:
-        # This assumes all brokers have a similar master_df attribute
-        # In a real implementation, you might need broker-specific handling
-        master_data = broker.master_df.to_dicts()
-        return {"status": "success", "data": master_data}
+        results = broker.search_index.search(query=q, limit=limit, segments=segment, fuzzy=fuzzy)
+        return {"status": "success", "data": results}
     except Exception as err:
         raise HTTPException(
             status_code=500,
-            detail=f"Error retrieving master data: {str(err)}"
+            detail=f"Error searching instruments: {str(err)}"
+        )
+
+
+@router.get("/option-chain/instruments")
+async def get_option_chain_instruments(
+    underlying: str = Query(..., description="Underlying name (e.g., 'NIFTY')"),
+    expiry: Optional[str] = Query(None, description="Expiry date in 'YYYY-MM-DD' format (defaults to all expiries)"),
+    quote: str = Query("none", description="Quotes to attach to every contract: 'none', 'ltp', 'ohlc' or 'full'"),
+    broker=Depends(get_broker)
+):
+    """
+    Get the option chain of an underlying from the precomputed chain index.
+
+    Strike rows are sorted by strike within each expiry. With `quote` set,
+    quotes for the whole chain are fetched in one batched call and attached
+    to each contract under 'quote'.
+
+    Args:
+        underlying: Underlying name.
+        expiry: Expiry date to restrict the chain to.
+        quote: Quote type to attach.
+        broker: The broker instance from the dependency.
+
+    Returns:
+        Dict: Response containing the option chain keyed by expiry.
+
+    Raises:
+        HTTPException: If the request is invalid or data retrieval fails.
+    """
+    try:
+        if quote not in OPTION_CHAIN_QUOTE_METHODS:
+            raise ValueError(f"Unsupported quote type: {quote}")
+        chain = broker.option_chain_index.chain(underlying, expiry)
+        if not chain:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No option chain found for {underlying}" + (f" expiring {expiry}." if expiry else ".")
+            )
+
+        quote_method = OPTION_CHAIN_QUOTE_METHODS[quote]
+        if quote_method is not None:
+            if not hasattr(broker, quote_method):
+                raise ValueError(f"'{quote}' quotes are not supported by {broker.broker_name}")
+            quotes = await getattr(broker, quote_method)(
+                request_data=broker.option_chain_index.quote_requests(chain)
+            )
+            chain = {
+                chain_expiry: [
+                    {
+                        "strike": strike_row["strike"],
+                        **{
+                            option_type: None if strike_row[option_type] is None else {
+                                **strike_row[option_type],
+                                "quote": quotes.get(strike_row[option_type]["exchange_token"]),
+                            }
+                            for option_type in ("CE", "PE")
+                        },
+                    }
+                    for strike_row in strikes
+                ]
+                for chain_expiry, strikes in chain.items()
+            }
+
+        return {"status": "success", "data": {"underlying": underlying, "expiries": chain}}
+    except HTTPException:
+        raise
+    except ValueError as err:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid request: {str(err)}"
+        )
+    except Exception as err:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching option chain: {str(err)}"
         )
 
 
 @router.post("/ltp-quote")
 async def get_ltp_quote(
     instruments: List[Dict[str, str]],
+    max_age: Optional[float] = Query(None, ge=0, description="Maximum age in seconds of a cached quote (defaults to the broker's TTL; 0 forces a fresh fetch)"),
     broker=Depends(get_broker)
 ):
     """
@@ -113,10 +365,13 @@ async def get_ltp_quote(
     
     Args:
         instruments: List of instrument identifiers.
+        max_age: Maximum acceptable quote age in seconds.
         broker: The broker instance from the dependency.
         
     Returns:
-        Dict: Response containing LTP data.
+        Dict: Response containing LTP data. If some instruments could not be
+            fetched, the status is 'partial' and 'errors' maps their exchange
+            tokens to the error.
         
     Raises:
         HTTPException: If data retrieval fails.
@@ -130,12 +385,15 @@ async def get_ltp_quote(
     ```
     """
     try:
-        ltp_data = await broker.ltp_quote(request_data=instruments)
+        errors = {}
+        ltp_data = await broker.ltp_quote(request_data=instruments, max_age=max_age, errors=errors)
         if not ltp_data:
             raise HTTPException(
                 status_code=404,
                 detail="No data found for the provided instruments."
             )
+        if errors:
+            return {"status": "partial", "data": ltp_data, "errors": errors}
         return {"status": "success", "data": ltp_data}
     except ValueError as err:
         raise HTTPException(
@@ -151,6 +409,7 @@ async def get_ltp_quote(
 @router.post("/ohlc-quote")
 async def get_ohlc_quote(
     instruments: List[Dict[str, str]],
+    max_age: Optional[float] = Query(None, ge=0, description="Maximum age in seconds of a cached quote (defaults to the broker's TTL; 0 forces a fresh fetch)"),
     broker=Depends(get_broker)
 ):
     """
@@ -158,10 +417,13 @@ async def get_ohlc_quote(
     
     Args:
         instruments: List of instrument identifiers.
+        max_age: Maximum acceptable quote age in seconds.
         broker: The broker instance from the dependency.
         
     Returns:
-        Dict: Response containing OHLC Quote data.
+        Dict: Response containing OHLC Quote data. If some instruments could not be
+            fetched, the status is 'partial' and 'errors' maps their exchange
+            tokens to the error.
         
     Raises:
         HTTPException: If data retrieval fails.
@@ -175,12 +437,15 @@ async def get_ohlc_quote(
     ```
     """
     try:
-        ohlc_quote_data = await broker.ohlc_quote(request_data=instruments)
+        errors = {}
+        ohlc_quote_data = await broker.ohlc_quote(request_data=instruments, max_age=max_age, errors=errors)
         if not ohlc_quote_data:
             raise HTTPException(
                 status_code=404,
                 detail="No data found for the provided instruments."
             )
+        if errors:
+            return {"status": "partial", "data": ohlc_quote_data, "errors": errors}
         return {"status": "success", "data": ohlc_quote_data}
     except ValueError as err:
         raise HTTPException(
@@ -196,6 +461,7 @@ async def get_ohlc_quote(
 @router.post("/full-mkt-quote")
 async def get_full_mkt_quote(
     instruments: List[Dict[str, str]],
+    max_age: Optional[float] = Query(None, ge=0, description="Maximum age in seconds of a cached quote (defaults to the broker's TTL; 0 forces a fresh fetch)"),
     broker=Depends(get_broker)
 ):
     """
@@ -203,10 +469,13 @@ async def get_full_mkt_quote(
     
     Args:
         instruments: List of instrument identifiers.
+        max_age: Maximum acceptable quote age in seconds.
         broker: The broker instance from the dependency.
         
     Returns:
-        Dict: Response containing Full Mkt Quote data.
+        Dict: Response containing Full Mkt Quote data. If some instruments could not be
+            fetched, the status is 'partial' and 'errors' maps their exchange
+            tokens to the error.
         
     Raises:
         HTTPException: If data retrieval fails.
@@ -220,12 +489,15 @@ async def get_full_mkt_quote(
     ```
     """
     try:
-        market_quote_data = await broker.full_market_quote(request_data=instruments)
+        errors = {}
+        market_quote_data = await broker.full_market_quote(request_data=instruments, max_age=max_age, errors=errors)
         if not market_quote_data:
             raise HTTPException(
                 status_code=404,
                 detail="No data found for the provided instruments."
             )
+        if errors:
+            return {"status": "partial", "data": market_quote_data, "errors": errors}
         return {"status": "success", "data": market_quote_data}
     except ValueError as err:
         raise HTTPException(
@@ -262,7 +534,7 @@ async def historical_data(
         "exchange": "NSE",
         "exchange_token": "21195",
         "instrument_type": "EQ",
-        "interval": "1day",
+        "interval": "day",
         "from_date": "2023-01-01",
         "to_date": "2023-01-31"
     }
@@ -304,3 +576,223 @@ async def historical_data(
             detail=f"Error fetching historical data: {str(err)}"
         )
 
+
+
+def _parse_stream_instrument(value: str) -> Dict[str, str]:
+    """
+    Parse an 'EXCHANGE:INSTRUMENT_TYPE:EXCHANGE_TOKEN' query value into an
+    instrument identifier.
+
+    Args:
+        value (str): The query value, e.g. 'NSE:EQ:2885'.
+
+    Returns:
+        Dict[str, str]: The instrument identifier, as in the quote request bodies.
+
+    Raises:
+        ValueError: If the value is malformed.
+    """
+    parts = value.split(":")
+    if len(parts) != 3 or not all(parts):
+        raise ValueError(f"Malformed instrument: {value}. Expected 'EXCHANGE:INSTRUMENT_TYPE:EXCHANGE_TOKEN'")
+    exchange, instrument_type, exchange_token = parts
+    return {"exchange_token": exchange_token, "exchange": exchange, "instrument_type": instrument_type}
+
+
+async def _quote_events(stream_service, stream) -> AsyncIterator[bytes]:
+    """
+    Serialize a quote stream as Server-Sent Events, closing it when the client goes away.
+    """
+    try:
+        while True:
+            try:
+                update = await asyncio.wait_for(stream.next(), QUOTE_STREAM_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            yield f"data: {json.dumps({'status': 'success', 'data': update}, default=str)}\n\n".encode()
+    finally:
+        await stream_service.unsubscribe(stream)
+
+
+@router.get("/quotes/stream")
+async def stream_quotes(
+    request: Request,
+    instrument: List[str] = Query(..., description="Instruments as 'EXCHANGE:INSTRUMENT_TYPE:EXCHANGE_TOKEN' (repeatable)"),
+    broker_type: str = Query(..., description="Broker type (e.g., 'upstox', 'zerodha')"),
+    account_name: Optional[str] = Query(None, description="Broker account name (defaults to the primary account)"),
+    quote_type: str = Query("ltp", description="Quote type: 'ltp' or 'full'"),
+    max_rate: float = Query(1.0, gt=0, le=QUOTE_STREAM_MAX_RATE, description="Maximum updates per second")
+):
+    """
+    Stream quote updates as Server-Sent Events.
+
+    The first event carries the current quotes; later events carry only the
+    instruments whose quote changed, at most `max_rate` times per second.
+    Updates arriving faster are conflated to the latest quote per instrument.
+    All clients of a broker account share one upstream source.
+
+    Args:
+        request: The incoming request, used to reach the app's quote stream service.
+        instrument: Instruments to stream.
+        broker_type: The type of broker.
+        account_name: The broker account name.
+        quote_type: Quote type to stream.
+        max_rate: Maximum updates per second.
+
+    Returns:
+        StreamingResponse: 'text/event-stream' of {"status": "success", "data": {instrument: quote}} events,
+            with instruments named as in the query ('EXCHANGE:INSTRUMENT_TYPE:EXCHANGE_TOKEN').
+
+    Raises:
+        HTTPException: If the request is invalid or the stream cannot be opened.
+
+    Example Request:
+        GET /quotes/stream?broker_type=upstox&instrument=NSE:EQ:2885&instrument=NSE:EQ:11536&max_rate=2
+    """
+    stream_service = request.app.state.quote_stream_service
+    try:
+        instruments = [_parse_stream_instrument(value) for value in instrument]
+        stream = await stream_service.subscribe(broker_type, account_name, quote_type, instruments, max_rate)
+    except ValueError as err:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid request: {str(err)}"
+        )
+    except Exception as err:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error opening quote stream: {str(err)}"
+        )
+    return StreamingResponse(
+        _quote_events(stream_service, stream),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/quotes/ws")
+async def stream_quotes_ws(
+    websocket: WebSocket,
+    broker_type: str = Query(..., description="Broker type (e.g., 'upstox', 'zerodha')"),
+    account_name: Optional[str] = Query(None, description="Broker account name (defaults to the primary account)")
+):
+    """
+    Stream quote updates over a WebSocket.
+
+    The client sends a subscription message to start streaming, and may send
+    another at any time to replace it. Updates are sent and conflated as for
+    the event stream endpoint; errors are sent as {"status": "error", "detail": ...}.
+
+    Example Subscription Message:
+    ```json
+    {
+        "instruments": [
+            {"exchange_token": "21195", "exchange": "NSE", "instrument_type": "EQ"}
+        ],
+        "quote_type": "ltp",
+        "max_rate": 2
+    }
+    ```
+    """
+    await websocket.accept()
+    stream_service = websocket.app.state.quote_stream_service
+    stream = None
+    sender: Optional[asyncio.Task] = None
+
+    async def send_updates(quote_stream) -> None:
+        while True:
+            update = await quote_stream.next()
+            await websocket.send_text(json.dumps({"status": "success", "data": update}, default=str))
+
+    async def stop_sender() -> None:
+        sender.cancel()
+        try:
+            await sender
+        except asyncio.CancelledError:
+            pass
+        except Exception as err:
+            stream_service.logger.warning(f"Quote WebSocket send failed: {err}")
+        await stream_service.unsubscribe(stream)
+
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                if not isinstance(message, dict):
+                    raise ValueError("subscription message must be a JSON object")
+                max_rate = float(message.get("max_rate", 1.0))
+                if not 0 < max_rate <= QUOTE_STREAM_MAX_RATE:
+                    raise ValueError(f"max_rate must be in (0, {QUOTE_STREAM_MAX_RATE}]")
+                new_stream = await stream_service.subscribe(
+                    broker_type, account_name, message.get("quote_type", "ltp"),
+                    message.get("instruments") or [], max_rate
+                )
+            except WebSocketDisconnect:
+                raise
+            except Exception as err:
+                await websocket.send_json({"status": "error", "detail": f"Invalid request: {str(err)}"})
+                continue
+
+            if sender is not None:
+                await stop_sender()
+            stream = new_stream
+            sender = asyncio.ensure_future(send_updates(stream))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if sender is not None:
+            await stop_sender()
+
+
+@router.get("/ticks")
+async def get_ticks(
+    instrument: List[str] = Query(..., description="Instruments as 'EXCHANGE:INSTRUMENT_TYPE:EXCHANGE_TOKEN' (repeatable)"),
+    since: Optional[float] = Query(None, description="Only ticks received after this epoch time in seconds"),
+    limit: Optional[int] = Query(None, gt=0, description="Only the latest ticks, per instrument"),
+    broker=Depends(get_broker)
+):
+    """
+    Get the recent ticks recorded for instruments.
+
+    Ticks are recorded for instruments the broker holds live: those being
+    streamed to clients or configured on its market data feed. Each
+    instrument keeps a fixed number of its latest ticks.
+
+    Args:
+        instrument: Instruments to get ticks for.
+        since: Only ticks received after this time.
+        limit: Maximum number of ticks per instrument.
+        broker: The broker instance from the dependency.
+
+    Returns:
+        Dict: Per exchange token, columns 'timestamp' (receive time in epoch
+            seconds), 'last_price', 'volume' and 'oi', oldest first.
+
+    Raises:
+        HTTPException: If no instrument has recorded ticks or retrieval fails.
+
+    Example Request:
+        GET /ticks?broker_type=upstox&instrument=NSE:EQ:2885&limit=100
+    """
+    try:
+        instruments = [_parse_stream_instrument(value) for value in instrument]
+        ticks = broker.ticks(request_data=instruments, since=since, limit=limit)
+        if not ticks:
+            raise HTTPException(
+                status_code=404,
+                detail="No ticks recorded for the provided instruments."
+            )
+        return {"status": "success", "data": ticks}
+    except HTTPException:
+        raise
+    except ValueError as err:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid request: {str(err)}"
+        )
+    except Exception as err:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching ticks: {str(err)}"
+        )
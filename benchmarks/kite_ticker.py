@@ -0,0 +1,71 @@
+"""
+Benchmark of the Kite ticker packet decoder.
+
+Decodes synthetic ticker messages of each mode on one core and reports the
+sustained ticks per second, both for the columnar decode alone and including
+the conversion to quote dicts that feeds the quote book.
+
+Usage:
+    python -m benchmarks.kite_ticker [--packets 200] [--seconds 2]
+"""
+
+import time
+import struct
+import argparse
+import numpy as np
+
+from brokers.zerodha.ticker import batch_quotes, decode_message
+
+
+PACKET_LENGTHS = {"ltp": 8, "quote": 44, "full": 184}
+
+
+def build_message(mode: str, packets: int, rng: np.random.Generator) -> bytes:
+    """
+    Build a ticker message of random packets of one mode.
+    """
+    length = PACKET_LENGTHS[mode]
+    words = rng.integers(1, 1 << 24, size=(packets, length // 4), dtype=np.uint32)
+    words[:, 0] = (np.arange(packets, dtype=np.uint32) << 8) | 1
+    if mode == "full":
+        words[:, [11, 15]] = 1760600000
+    body = b"".join(struct.pack(">H", length) + row.astype(">u4").tobytes() for row in words)
+    return struct.pack(">H", packets) + body
+
+
+def run(fn, message: bytes, packets: int, seconds: float) -> float:
+    """
+    Call fn on the message repeatedly for about `seconds` and return ticks per second.
+    """
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(50):
+            fn(message)
+        calls += 50
+    return calls * packets / (time.perf_counter() - start)
+
+
+def decode_to_quotes(message: bytes) -> None:
+    for _, columns in decode_message(message):
+        batch_quotes(columns)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--packets", type=int, default=200, help="Packets per message")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Run time per measurement")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'mode':<6} {'decode ticks/s':>16} {'to quotes ticks/s':>19}")
+    for mode in PACKET_LENGTHS:
+        message = build_message(mode, args.packets, rng)
+        decode_rate = run(decode_message, message, args.packets, args.seconds)
+        quote_rate = run(decode_to_quotes, message, args.packets, args.seconds)
+        print(f"{mode:<6} {decode_rate:>16,.0f} {quote_rate:>19,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,14 +5,50 @@ This module contains the BaseBroker abstract base class that defines the common
 interface that all broker implementations must adhere to.
 """
 
+import os
+import re
 import abc
 import json
-import gzip
+import zlib
+import asyncio
 import aiohttp
 import logging
-from io import BytesIO
+import tempfile
+import numpy as np
 import polars as pl
-from typing import Dict, List, Any, Optional
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Tuple, Hashable, Collection
+
+from .master_cache import MasterCache, EXCHANGE_TIMEZONE, current_trading_date
+from .rate_limiter import RateGovernor
+from .retry import RetryPolicy, RetryableError, RETRYABLE_STATUSES, parse_retry_after
+from .single_flight import SingleFlight
+from .micro_batch import MicroBatcher
+from .quote_cache import QuoteCache
+from .quote_book import QuoteBook
+from .tick_store import TickStore
+from .candle_builder import CandleBuilder, candle_interval
+from .history_planner import plan_history_windows
+from .subscription_manager import SubscriptionManager
+from .market_calendar import MarketCalendar
+
+
+# Columns of the Upstox instrument master used by the brokers, with their types.
+UPSTOX_MASTER_SCHEMA = {
+    "instrument_key": pl.Utf8,
+    "exchange_token": pl.Int64,
+    "tradingsymbol": pl.Utf8,
+    "name": pl.Utf8,
+    "expiry": pl.Utf8,
+    "strike": pl.Float64,
+    "tick_size": pl.Float64,
+    "lot_size": pl.Int64,
+    "instrument_type": pl.Utf8,
+    "option_type": pl.Utf8,
+    "exchange": pl.Utf8,
+}
+
+MASTER_DOWNLOAD_CHUNK_SIZE = 1 << 16
 
 
 class BaseBroker(abc.ABC):
@@ -26,7 +62,76 @@ class BaseBroker(abc.ABC):
         broker_name (str): The name of the broker (e.g., 'Upstox', 'Zerodha').
         logger (logging.Logger): Logger instance for the broker.
         config (Dict[str, Any]): Configuration dictionary for the broker.
+        master_cache (MasterCache): On-disk cache of the parsed instrument master.
+        rate_governor (RateGovernor): Process-wide pacing of upstream calls for
+            the broker account.
+        retry_policy (RetryPolicy): Backoff policy for transient upstream failures.
+        in_flight (SingleFlight): Upstream chunk calls currently in flight.
+        quote_cache (QuoteCache): Recently fetched quotes per instrument.
+        history_cache (QuoteCache): Historical responses for settled sessions.
+        market_calendar (MarketCalendar): Exchange sessions and holidays.
+        quote_book (QuoteBook): Live quotes streamed by the market data feed.
+        tick_store (TickStore): Recent ticks of the instruments held with
+            acquire_instruments, and the current session's candles built from them.
+        feed_subscriptions (Optional[SubscriptionManager]): Market data feed
+            subscriptions, once the feed is used.
     """
+
+    # Published upstream request limits per endpoint, as (limit, period in
+    # seconds) windows. Endpoints without an entry get their own limiter with
+    # the 'default' windows. Overridable with the 'rate_limits' config key.
+    # Limits are enforced per account ('account_name' config key).
+    RATE_LIMITS: Dict[str, List[Tuple[int, float]]] = {
+        "default": [(10, 1)],
+    }
+
+    # Master data column holding the market segment.
+    SEGMENT_COLUMN = "exchange"
+
+    # Master data column uniquely identifying an instrument.
+    MASTER_KEY_COLUMN = "instrument_key"
+
+    # HTTP connection pool defaults; each can be overridden with the
+    # lower-cased name as a config key (e.g. 'http_pool_size').
+    HTTP_POOL_SIZE = 100
+    HTTP_POOL_SIZE_PER_HOST = 50
+    HTTP_KEEPALIVE_TIMEOUT = 60
+    HTTP_DNS_CACHE_TTL = 300
+    HTTP_CONNECT_TIMEOUT = 5
+    HTTP_TIMEOUT = 30
+
+    # Window in milliseconds for merging small concurrent LTP/OHLC lookups into
+    # one upstream call; 0 disables it. Config key 'micro_batch_window_ms'.
+    MICRO_BATCH_WINDOW_MS = 0
+
+    # Seconds a cached quote is served for, per quote type, unless a request
+    # asks for a different maximum age. Config key 'quote_cache_ttls'.
+    QUOTE_CACHE_TTLS = {
+        "ltp": 1.0,
+        "ohlc": 2.0,
+        "full": 1.0,
+    }
+    # Maximum number of cached quotes across all types. Config key 'quote_cache_size'.
+    QUOTE_CACHE_SIZE = 50000
+    # Maximum number of cached historical responses for settled sessions.
+    # Config key 'history_cache_size'.
+    HISTORY_CACHE_SIZE = 256
+
+    # Ticks kept per tracked instrument, and the maximum number of tracked
+    # instruments. Config keys 'tick_capacity' and 'tick_instruments'.
+    TICK_CAPACITY = 2048
+    TICK_INSTRUMENTS = 2000
+    # Candle intervals built from the ticks of tracked instruments, in either
+    # broker's naming. Config key 'candle_intervals'.
+    CANDLE_INTERVALS = ("1minute", "5minute", "15minute", "30minute", "day")
+
+    # Longest date range in days of one historical candle request, per
+    # interval; None for no limit. Intervals without an entry are rejected.
+    # Overridable with the 'history_window_days' config key.
+    HISTORY_WINDOW_DAYS: Dict[str, Optional[int]] = {}
+
+    # MarketFeed subclass streaming the broker's quotes, if it has one.
+    MARKET_FEED: Optional[type] = None
     
     def __init__(self, config: Dict[str, Any], logger: logging.Logger):
         """
@@ -40,6 +145,749 @@ class BaseBroker(abc.ABC):
         self.logger = logger
         self.config = config
         self.access_token = None
+        # Trading date the master data was loaded for, see _master_loaded.
+        self.master_trading_date: Optional[str] = None
+        self.master_cache = MasterCache(
+            logger=logger,
+            cache_dir=config.get("master_cache_dir") if config else None
+        )
+        self._session: Optional[aiohttp.ClientSession] = None
+        config = config or {}
+        self.rate_governor = RateGovernor.for_account(
+            broker_name=self.broker_name,
+            account_name=config.get("account_name", "default"),
+            rate_limits={**self.RATE_LIMITS, **(config.get("rate_limits") or {})}
+        )
+        self.retry_policy = RetryPolicy(**(config.get("retry_policy") or {}))
+        self.in_flight = SingleFlight()
+        self._batchers: Dict[Hashable, MicroBatcher] = {}
+        self.quote_cache = QuoteCache(max_entries=config.get("quote_cache_size", self.QUOTE_CACHE_SIZE))
+        self.quote_cache_ttls = {**self.QUOTE_CACHE_TTLS, **(config.get("quote_cache_ttls") or {})}
+        self.history_cache = QuoteCache(max_entries=config.get("history_cache_size", self.HISTORY_CACHE_SIZE))
+        self.market_calendar = MarketCalendar.load(config.get("market_holidays"))
+        self.quote_book = QuoteBook()
+        candle_intervals = [
+            candle_interval(interval) for interval in config.get("candle_intervals", self.CANDLE_INTERVALS)
+        ]
+        self.tick_store = TickStore(
+            capacity=config.get("tick_capacity", self.TICK_CAPACITY),
+            max_instruments=config.get("tick_instruments", self.TICK_INSTRUMENTS),
+            candles=CandleBuilder(
+                intervals=[interval for interval in candle_intervals if interval is not None],
+                calendar=self.market_calendar,
+                exchange_of=self._instrument_exchange
+            )
+        )
+        self.feed_subscriptions: Optional[SubscriptionManager] = None
+
+    def _http_setting(self, name: str) -> Any:
+        """
+        Get an HTTP setting from the config, falling back to the class default.
+
+        Args:
+            name (str): Class attribute name of the setting (e.g. 'HTTP_POOL_SIZE').
+
+        Returns:
+            Any: The configured value.
+        """
+        return (self.config or {}).get(name.lower(), getattr(self, name))
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the broker's long-lived HTTP session, creating it on first use.
+
+        All upstream calls share this session, so connections are kept alive and
+        reused across requests instead of paying a TCP and TLS handshake per call.
+        The connection pool is bounded, DNS lookups are cached and responses are
+        requested compressed.
+
+        Returns:
+            aiohttp.ClientSession: The shared session.
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._http_setting("HTTP_POOL_SIZE"),
+                limit_per_host=self._http_setting("HTTP_POOL_SIZE_PER_HOST"),
+                keepalive_timeout=self._http_setting("HTTP_KEEPALIVE_TIMEOUT"),
+                ttl_dns_cache=self._http_setting("HTTP_DNS_CACHE_TTL"),
+                use_dns_cache=True,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    total=self._http_setting("HTTP_TIMEOUT"),
+                    connect=self._http_setting("HTTP_CONNECT_TIMEOUT")
+                ),
+                headers={"Accept-Encoding": "gzip, deflate"},
+                auto_decompress=True,
+            )
+        return self._session
+
+    async def _gather_chunks(
+        self,
+        endpoint: str,
+        chunks: List[List[str]],
+        fetch_chunk: Callable[[List[str]], Awaitable[Dict[str, Any]]],
+        request_key: Hashable = None,
+        errors: Optional[Dict[str, BaseException]] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch request chunks concurrently within the endpoint's rate limits.
+
+        Every chunk waits for its turn on the account's rate governor and is
+        then sent without waiting for the others, so a large batch takes roughly
+        one round trip when the limits allow it. The chunks of one call queue
+        as a single caller, so concurrent requests are served in turn.
+
+        A chunk failing transiently is retried on its own under the broker's
+        retry policy, re-queuing on the governor each time, while the other
+        chunks' results are kept. All retries share one request deadline. If a
+        chunk fails for good, the chunks still in flight are cancelled and the
+        error is raised; when `errors` is given, the other chunks are instead
+        completed and returned, and the failed chunk's keys are recorded in
+        `errors`. The call fails anyway if every chunk does.
+
+        Concurrent calls for the same request key and chunk, from this or any
+        other request, share a single upstream call and its result.
+
+        Args:
+            endpoint (str): Endpoint name used to pick the rate limiter.
+            chunks (List[List[str]]): Request chunks of instrument keys.
+            fetch_chunk (Callable[[List[str]], Awaitable[Dict[str, Any]]]): Coroutine
+                fetching one chunk and returning its converted data. Transient
+                failures should raise RetryableError.
+            request_key (Hashable): Identity of the upstream request apart from
+                the chunk, e.g. the endpoint and its other query parameters.
+                Defaults to the endpoint name.
+            errors (Optional[Dict[str, BaseException]]): Filled with the error per
+                key of the chunks that failed for good, which then do not fail
+                the call.
+
+        Returns:
+            Dict[str, Any]: The chunk results merged in chunk order.
+        """
+        caller = object()
+        deadline = self.retry_policy.request_deadline()
+        if request_key is None:
+            request_key = endpoint
+
+        def log_retry(retry: int, error: BaseException, delay: float) -> None:
+            self.logger.warning(f"Retrying {endpoint} chunk (retry {retry}) in {delay:.2f}s after: {error}")
+
+        async def attempt(chunk: List[str]) -> Dict[str, Any]:
+            await self.rate_governor.acquire(endpoint, caller)
+            return await fetch_chunk(chunk)
+
+        async def run(chunk: List[str]) -> Dict[str, Any]:
+            return await self.in_flight.do(
+                (request_key, tuple(chunk)),
+                lambda: self.retry_policy.call(lambda: attempt(chunk), deadline=deadline, on_retry=log_retry)
+            )
+
+        tasks = [asyncio.ensure_future(run(chunk)) for chunk in chunks]
+        if errors is None:
+            try:
+                results = await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+        else:
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            failed = [(chunk, result) for chunk, result in zip(chunks, results) if isinstance(result, BaseException)]
+            if failed and len(failed) == len(chunks):
+                raise failed[0][1]
+            for chunk, error in failed:
+                self.logger.error(f"Giving up on {endpoint} chunk of {len(chunk)} keys: {error}")
+                errors.update(dict.fromkeys(chunk, error))
+            results = [result for result in results if not isinstance(result, BaseException)]
+
+        combined_response = {}
+        for result in results:
+            combined_response.update(result)
+        return combined_response
+
+    async def _fetch_quotes(
+        self,
+        endpoint: str,
+        instrument_keys: List[str],
+        fetch_chunk: Callable[[List[str]], Awaitable[Dict[str, Any]]],
+        chunk_size: int,
+        quote_type: str,
+        request_key: Hashable = None,
+        batchable: bool = False,
+        max_age: Optional[float] = None,
+        book_modes: Collection[str] = (),
+        errors: Optional[Dict[str, BaseException]] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch raw quotes for a list of instrument keys, serving fresh ones from cache.
+
+        Instruments streamed live by the market data feed in one of `book_modes`
+        are answered from the quote book, with 'age' counting from their last
+        update; `max_age` bounds that age too. Quotes younger than `max_age`
+        (by default the TTL of the quote type) are taken from the quote cache.
+        Only the remaining instruments are fetched upstream; those are cached
+        and recorded in the tick store. Every returned quote is a copy carrying
+        an 'age' field: seconds since it was fetched.
+
+        Without an explicit `max_age`, quotes of an exchange that is closed and
+        was fetched after its last session settled are served from cache until
+        the next session, whatever their age.
+
+        Args:
+            endpoint (str): Endpoint name used to pick the rate limiter.
+            instrument_keys (List[str]): Broker instrument keys to quote.
+            fetch_chunk (Callable[[List[str]], Awaitable[Dict[str, Any]]]): Coroutine
+                fetching one chunk and returning raw quotes keyed by instrument key.
+            chunk_size (int): Maximum number of instruments per upstream call.
+            quote_type (str): QUOTE_CACHE_TTLS key of the quotes ('ltp', 'ohlc', 'full').
+            request_key (Hashable): Identity of the upstream request apart from
+                the instruments. Defaults to the endpoint name.
+            batchable (bool): Whether the request may be micro-batched.
+            max_age (Optional[float]): Maximum accepted age of a cached quote in
+                seconds; 0 always fetches. Defaults to the quote type's TTL.
+            book_modes (Collection[str]): Quote book modes carrying the fields of
+                this quote type. Defaults to none: the book is not used.
+            errors (Optional[Dict[str, BaseException]]): When given, instruments
+                whose chunk failed for good are recorded here with the error and
+                the others are returned, instead of failing the call.
+
+        Returns:
+            Dict[str, Any]: Raw quotes keyed by instrument key, in request order.
+        """
+        if request_key is None:
+            request_key = endpoint
+
+        booked, missing = {}, instrument_keys
+        if book_modes and max_age != 0:
+            booked, missing = self.quote_book.get_many(missing, book_modes, max_age)
+
+        if not missing:
+            cached = {}
+        elif max_age is None:
+            cached, missing = self._cached_quotes(
+                request_key, missing, self.quote_cache_ttls.get(quote_type, 0)
+            )
+        elif max_age > 0:
+            cached, missing = self.quote_cache.get_many(request_key, missing, max_age)
+        else:
+            cached = {}
+
+        fetched = {}
+        if missing:
+            fetched = await self._fetch_upstream_quotes(
+                endpoint, missing, fetch_chunk, chunk_size, request_key, batchable, errors
+            )
+            self.quote_cache.put_many(request_key, fetched)
+            self.tick_store.record(fetched)
+
+        quotes = {}
+        for instrument_key in instrument_keys:
+            if instrument_key in fetched:
+                quotes[instrument_key] = {**fetched[instrument_key], "age": 0.0}
+            elif instrument_key in booked:
+                quote, age = booked[instrument_key]
+                quotes[instrument_key] = {**quote, "age": round(age, 3)}
+            elif instrument_key in cached:
+                quote, age = cached[instrument_key]
+                quotes[instrument_key] = {**quote, "age": round(age, 3)}
+        return quotes
+
+    def _cached_quotes(
+        self,
+        request_key: Hashable,
+        instrument_keys: List[str],
+        ttl: float
+    ) -> Tuple[Dict[str, Tuple[Any, float]], List[str]]:
+        """
+        Look up cached quotes, stretching the TTL for closed exchanges.
+
+        Args:
+            request_key (Hashable): Identity of the quote type.
+            instrument_keys (List[str]): Instrument keys to look up.
+            ttl (float): TTL of the quote type in seconds.
+
+        Returns:
+            Tuple[Dict[str, Tuple[Any, float]], List[str]]: Cached (quote, age)
+                per instrument key, and the instrument keys to fetch.
+        """
+        by_exchange: Dict[str, List[str]] = {}
+        for instrument_key in instrument_keys:
+            by_exchange.setdefault(self._instrument_exchange(instrument_key), []).append(instrument_key)
+
+        now = datetime.now(EXCHANGE_TIMEZONE)
+        cached, missing = {}, []
+        for exchange, keys in by_exchange.items():
+            max_age = ttl
+            settled_since = self.market_calendar.settled_since(exchange, now)
+            if settled_since is not None:
+                max_age = max(max_age, (now - settled_since).total_seconds())
+            if max_age <= 0:
+                missing.extend(keys)
+                continue
+            exchange_cached, exchange_missing = self.quote_cache.get_many(request_key, keys, max_age)
+            cached.update(exchange_cached)
+            missing.extend(exchange_missing)
+        return cached, missing
+
+    @staticmethod
+    def _instrument_exchange(instrument_key: str) -> str:
+        """
+        Get the exchange or segment of a broker instrument key.
+
+        Args:
+            instrument_key (str): An Upstox ('NSE_EQ|INE002A01018') or Kite
+                ('NSE:RELIANCE') instrument key.
+
+        Returns:
+            str: The exchange or segment part (e.g. 'NSE_EQ', 'NSE').
+        """
+        return re.split(r"[|:]", instrument_key, maxsplit=1)[0]
+
+    @staticmethod
+    def _request_errors(
+        request_data: List[Dict[str, str]],
+        instrument_keys: List[str],
+        failures: Dict[str, BaseException]
+    ) -> Dict[str, str]:
+        """
+        Key the errors of instruments that could not be fetched like their quotes.
+
+        Args:
+            request_data (List[Dict[str, str]]): The request's instrument identifiers.
+            instrument_keys (List[str]): Their broker instrument keys, in the same order.
+            failures (Dict[str, BaseException]): Errors by instrument key.
+
+        Returns:
+            Dict[str, str]: Error messages by exchange token.
+        """
+        return {
+            str(data.get("exchange_token")): str(failures[instrument_key])
+            for data, instrument_key in zip(request_data, instrument_keys)
+            if instrument_key in failures
+        }
+
+    async def _fetch_upstream_quotes(
+        self,
+        endpoint: str,
+        instrument_keys: List[str],
+        fetch_chunk: Callable[[List[str]], Awaitable[Dict[str, Any]]],
+        chunk_size: int,
+        request_key: Hashable,
+        batchable: bool,
+        errors: Optional[Dict[str, BaseException]] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch raw quotes for a list of instrument keys from the broker.
+
+        Requests are split into chunks of `chunk_size` and dispatched through
+        `_gather_chunks`, recording failed chunks in `errors` when it is given.
+        When micro-batching is enabled and `batchable` is set, requests smaller
+        than a chunk are instead merged with other concurrent requests for the
+        same request key into a single chunk, which succeeds or fails as a whole.
+
+        Returns:
+            Dict[str, Any]: Raw quotes keyed by instrument key.
+        """
+        window_ms = (self.config or {}).get("micro_batch_window_ms", self.MICRO_BATCH_WINDOW_MS)
+        if batchable and window_ms and len(instrument_keys) < chunk_size:
+            batcher = self._batchers.get(request_key)
+            if batcher is None:
+                batcher = MicroBatcher(window=window_ms / 1000, max_size=chunk_size)
+                self._batchers[request_key] = batcher
+            return await batcher.submit(
+                instrument_keys,
+                lambda keys: self._gather_chunks(endpoint, [keys], fetch_chunk, request_key)
+            )
+
+        chunks = [
+            instrument_keys[i:i + chunk_size]
+            for i in range(0, len(instrument_keys), chunk_size)
+        ]
+        return await self._gather_chunks(endpoint, chunks, fetch_chunk, request_key, errors)
+
+    def market_subscriptions(self) -> SubscriptionManager:
+        """
+        Get the manager of the broker's market data feed subscriptions,
+        creating it on first use.
+
+        Feed settings come from the 'market_data_feed' config key: 'mode' (see
+        the feed's MODES, default 'full'), 'max_instruments' and
+        'max_connections' (default to the feed's published limits),
+        'batch_window_ms' and 'grace_period' (seconds).
+
+        Returns:
+            SubscriptionManager: The subscription manager.
+
+        Raises:
+            NotImplementedError: If the broker has no market data feed.
+            ValueError: If the configured mode is unsupported.
+        """
+        if self.MARKET_FEED is None:
+            raise NotImplementedError(f"{self.broker_name} has no market data feed")
+        if self.feed_subscriptions is None:
+            feed_config = (self.config or {}).get("market_data_feed") or {}
+            feed_class = self.MARKET_FEED
+            mode = feed_config.get("mode", "full")
+            if mode not in feed_class.MODES:
+                raise ValueError(f"Unsupported market data feed mode: {mode}. Valid modes are: {list(feed_class.MODES)}")
+            self.feed_subscriptions = SubscriptionManager(
+                feed_factory=lambda: feed_class(self, self.quote_book, mode=mode),
+                max_instruments=feed_config.get("max_instruments", feed_class.MAX_INSTRUMENTS[mode]),
+                max_connections=feed_config.get("max_connections", feed_class.MAX_CONNECTIONS),
+                logger=self.logger,
+                batch_window=feed_config.get("batch_window_ms", 50) / 1000,
+                grace_period=feed_config.get("grace_period", 30.0)
+            )
+        return self.feed_subscriptions
+
+    @property
+    def has_market_feed(self) -> bool:
+        """
+        Whether the broker streams quotes: it has a market data feed and the
+        'market_data_feed' config key is set.
+        """
+        return self.MARKET_FEED is not None and (self.config or {}).get("market_data_feed") is not None
+
+    async def acquire_instruments(self, request_data: List[Dict[str, str]]) -> List[str]:
+        """
+        Hold instruments for live data until released.
+
+        Their ticks are recorded in the tick store and, when the broker streams
+        a market data feed, they are held on it: while their feed connection is
+        up, their quotes are served from the quote book instead of the REST API.
+
+        Args:
+            request_data (List[Dict[str, str]]): List of dictionaries containing
+                'exchange_token', 'exchange' and 'instrument_type'.
+
+        Returns:
+            List[str]: The broker instrument keys held, to pass to release_instruments.
+
+        Raises:
+            ValueError: If instrument identifiers are invalid or the feed mode is unsupported.
+        """
+        instrument_keys = self._resolve_instrument_keys(request_data)
+        rejected = self.tick_store.track(instrument_keys)
+        if rejected:
+            self.logger.warning(
+                f"Tick store full ({self.tick_store.max_instruments} instruments); "
+                f"not recording ticks for {len(rejected)} instruments"
+            )
+        if self.has_market_feed:
+            try:
+                await self.market_subscriptions().acquire(instrument_keys)
+            except BaseException:
+                self.tick_store.untrack(instrument_keys)
+                raise
+        return instrument_keys
+
+    async def release_instruments(self, instrument_keys: List[str]) -> None:
+        """
+        Release instruments held with acquire_instruments.
+
+        Args:
+            instrument_keys (List[str]): The instrument keys acquire_instruments returned.
+        """
+        self.tick_store.untrack(instrument_keys)
+        if self.feed_subscriptions is not None:
+            await self.feed_subscriptions.release(instrument_keys)
+
+    async def start_market_feed(self, request_data: List[Dict[str, str]]) -> None:
+        """
+        Stream quotes for instruments into the quote book for the broker's lifetime.
+
+        Args:
+            request_data (List[Dict[str, str]]): List of dictionaries containing
+                'exchange_token', 'exchange' and 'instrument_type'.
+
+        Raises:
+            NotImplementedError: If the broker has no market data feed.
+            ValueError: If instrument identifiers are invalid or the mode is unsupported.
+        """
+        self.market_subscriptions()
+        await self.acquire_instruments(request_data)
+
+    def ticks(
+        self,
+        request_data: List[Dict[str, str]],
+        since: Optional[float] = None,
+        limit: Optional[int] = None
+    ) -> Dict[str, Dict[str, List[Optional[float]]]]:
+        """
+        Get the recorded ticks of instruments held with acquire_instruments.
+
+        Args:
+            request_data (List[Dict[str, str]]): List of dictionaries containing
+                'exchange_token', 'exchange' and 'instrument_type'.
+            since (Optional[float]): Only ticks received after this epoch time.
+            limit (Optional[int]): Only the latest `limit` ticks per instrument.
+
+        Returns:
+            Dict[str, Dict[str, List[Optional[float]]]]: Per exchange token of a
+                tracked instrument, the tick columns (timestamp in epoch seconds,
+                last_price, volume, oi) oldest first; missing fields are None.
+
+        Raises:
+            ValueError: If instrument identifiers are invalid.
+        """
+        instrument_keys = self._resolve_instrument_keys(request_data)
+        result = {}
+        for data, instrument_key in zip(request_data, instrument_keys):
+            columns = self.tick_store.ticks(instrument_key, since=since, limit=limit)
+            if columns is None:
+                continue
+            result[str(data.get("exchange_token"))] = {
+                name: np.where(np.isnan(column), None, column).tolist()
+                for name, column in columns.items()
+            }
+        return result
+
+    async def _start_configured_market_feed(self) -> None:
+        """
+        Stream the instruments in the 'market_data_feed' config key's
+        'instruments' list, if the key is set.
+        """
+        feed_config = (self.config or {}).get("market_data_feed")
+        if feed_config is not None and feed_config.get("instruments"):
+            await self.start_market_feed(feed_config["instruments"])
+
+    def _history_windows(
+        self,
+        exchange: str,
+        interval: str,
+        from_day: date,
+        to_day: date
+    ) -> List[Tuple[str, str]]:
+        """
+        Plan the upstream requests for a historical candle range.
+
+        Args:
+            exchange (str): Exchange or segment name of the instrument.
+            interval (str): Candle interval, a HISTORY_WINDOW_DAYS key.
+            from_day (date): First day of the range.
+            to_day (date): Last day of the range, inclusive.
+
+        Returns:
+            List[Tuple[str, str]]: ('YYYY-MM-DD', 'YYYY-MM-DD') first and last
+                day per request, in order.
+
+        Raises:
+            ValueError: If the interval is not supported by the broker.
+        """
+        window_days = {**self.HISTORY_WINDOW_DAYS, **((self.config or {}).get("history_window_days") or {})}
+        if interval not in window_days:
+            raise ValueError(f"Invalid interval: {interval}. Valid intervals are: {list(window_days)}")
+        windows = plan_history_windows(from_day, to_day, window_days[interval], self.market_calendar, exchange)
+        return [(start.isoformat(), end.isoformat()) for start, end in windows]
+
+    async def _fetch_history(
+        self,
+        exchange: str,
+        instrument_key: str,
+        interval: str,
+        from_date: str,
+        to_date: str,
+        fetch_window: Callable[[str, str], Awaitable[List[List[Any]]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch historical candles over a date range.
+
+        The range is split by _history_windows into the fewest requests the
+        broker allows for the interval. The requests are sent concurrently
+        within the 'historical' rate limits, a request failing transiently is
+        retried on its own, and the candles are merged in date order once all
+        have arrived.
+
+        When candles of the current session are built from live ticks (see
+        _session_candles), they are served from memory and only the closed
+        sessions are fetched. Responses for ranges whose sessions have all
+        settled are cached and served without going upstream.
+
+        Args:
+            exchange (str): Exchange or segment name of the instrument.
+            instrument_key (str): Broker instrument key.
+            interval (str): Candle interval in the broker's naming.
+            from_date (str): Start date in 'YYYY-MM-DD' format.
+            to_date (str): End date in 'YYYY-MM-DD' format.
+            fetch_window (Callable[[str, str], Awaitable[List[List[Any]]]]): Coroutine
+                fetching the raw [timestamp, open, high, low, close, volume, oi]
+                candles from one first day to one last day ('YYYY-MM-DD').
+                Transient failures should raise RetryableError.
+
+        Returns:
+            List[Dict[str, Any]]: Candles with datetime, open, high, low, close,
+                volume, oi fields, oldest first.
+
+        Raises:
+            ValueError: If the dates or the interval are invalid.
+        """
+        from_day = datetime.strptime(from_date, "%Y-%m-%d").date()
+        to_day = datetime.strptime(to_date, "%Y-%m-%d").date()
+
+        live_df = None
+        today = datetime.now(EXCHANGE_TIMEZONE).date()
+        if from_day <= today <= to_day:
+            live_df = self._session_candles(instrument_key, interval)
+            if live_df is not None and not live_df["datetime"].str.starts_with(today.isoformat()).all():
+                live_df = None
+        if live_df is not None:
+            self.logger.debug(f"Serving current session candles for {instrument_key} from live ticks")
+            to_day = today - timedelta(days=1)
+            if to_day < from_day:
+                return live_df.to_dicts()
+
+        history_key = ("historical", interval, from_day, to_day)
+        settled = self.market_calendar.is_session_settled(exchange, to_day)
+        if settled:
+            cached, _ = self.history_cache.get_many(history_key, [instrument_key], max_age=float("inf"))
+            if instrument_key in cached:
+                self.logger.debug(f"Serving settled historical data for {instrument_key} from cache")
+                candles = list(cached[instrument_key][0])
+                return candles + (live_df.to_dicts() if live_df is not None else [])
+
+        windows = self._history_windows(exchange, interval, from_day, to_day)
+        self.logger.info(f"Processing {len(windows)} chunks for historical data")
+
+        async def fetch_chunk(chunk: List[str]) -> Dict[str, pl.DataFrame]:
+            window_from, window_to = chunk
+            self.logger.debug(f"Processing chunk {window_from} to {window_to}")
+            return {window_from: self._candles_frame(await fetch_window(window_from, window_to))}
+
+        frames = await self._gather_chunks(
+            "historical", [list(window) for window in windows], fetch_chunk,
+            request_key=("historical", instrument_key, interval)
+        )
+        frames = [frame for frame in frames.values() if not frame.is_empty()]
+
+        candles = []
+        if frames:
+            self.logger.info(f"Successfully processed {len(windows)} chunks")
+            candles = pl.concat(frames).sort("datetime").to_dicts()
+            if settled:
+                self.history_cache.put_many(history_key, {instrument_key: candles})
+            candles = list(candles)
+        elif live_df is None:
+            self.logger.warning(
+                f"Historical data for {instrument_key} from: {from_date} to: {to_date} at interval: {interval} not found."
+            )
+
+        if live_df is not None:
+            candles.extend(live_df.to_dicts())
+        return candles
+
+    @staticmethod
+    def _candles_frame(candles: List[List[Any]]) -> pl.DataFrame:
+        """
+        Convert raw broker candles to a DataFrame in exchange time.
+
+        Args:
+            candles (List[List[Any]]): [timestamp, open, high, low, close, volume, oi]
+                rows with ISO 8601 timestamps carrying a UTC offset; oi may be missing.
+
+        Returns:
+            pl.DataFrame: Columns datetime ('YYYY-MM-DD HH:MM:SS'), open, high,
+                low, close, volume, oi.
+        """
+        return pl.DataFrame(
+            {
+                "datetime": [item[0] for item in candles],
+                "open": [item[1] for item in candles],
+                "high": [item[2] for item in candles],
+                "low": [item[3] for item in candles],
+                "close": [item[4] for item in candles],
+                "volume": [item[5] for item in candles],
+                "oi": [item[6] if len(item) > 6 else 0 for item in candles],
+            },
+            schema={
+                "datetime": pl.Utf8,
+                "open": pl.Float64,
+                "high": pl.Float64,
+                "low": pl.Float64,
+                "close": pl.Float64,
+                "volume": pl.Int64,
+                "oi": pl.Int64,
+            },
+            strict=False
+        ).with_columns(
+            pl.col("datetime")
+            .str.strptime(pl.Datetime, "%Y-%m-%dT%H:%M:%S%z")
+            .dt.convert_time_zone(str(EXCHANGE_TIMEZONE))
+            .dt.strftime("%Y-%m-%d %H:%M:%S")
+        )
+
+    def _session_candles(self, instrument_key: str, interval: str) -> Optional[pl.DataFrame]:
+        """
+        Get the current session's candles built from live ticks.
+
+        Available for instruments held with acquire_instruments since before
+        the session opened, at the CANDLE_INTERVALS.
+
+        Args:
+            instrument_key (str): Broker instrument key.
+            interval (str): Candle interval name (e.g. '1minute', 'day').
+
+        Returns:
+            Optional[pl.DataFrame]: Candles with columns datetime, open, high,
+                low, close, volume, oi, or None if they are not built.
+        """
+        interval_seconds = candle_interval(interval)
+        if interval_seconds is None:
+            return None
+        columns = self.tick_store.session_candles(instrument_key, interval_seconds)
+        if columns is None:
+            return None
+        return pl.DataFrame({
+            "datetime": columns["datetime"].tolist(),
+            "open": columns["open"],
+            "high": columns["high"],
+            "low": columns["low"],
+            "close": columns["close"],
+            "volume": pl.Series(columns["volume"], nan_to_null=True).cast(pl.Int64),
+            "oi": pl.Series(columns["oi"], nan_to_null=True).cast(pl.Int64),
+        })
+
+    @staticmethod
+    def _upstream_error(response: aiohttp.ClientResponse, error_msg: str) -> Exception:
+        """
+        Build the error to raise for an unsuccessful upstream response.
+
+        Args:
+            response (aiohttp.ClientResponse): The unsuccessful response.
+            error_msg (str): Description of the failure.
+
+        Returns:
+            Exception: A RetryableError (carrying any Retry-After) for rate
+                limiting and transient server errors, a plain Exception otherwise.
+        """
+        if response.status in RETRYABLE_STATUSES:
+            return RetryableError(error_msg, retry_after=parse_retry_after(response.headers.get("Retry-After")))
+        return Exception(error_msg)
+
+    async def refresh_access_token(self) -> None:
+        """
+        Load the current access token into this instance, e.g. after a token rotation.
+
+        The master data, quote cache and market data feed are kept. Open feed
+        connections stay authorized and pick up the new token when they reconnect.
+
+        Raises:
+            Exception: If token fetching fails.
+        """
+        self.access_token = await self.fetch_access_token()
+
+    async def close(self) -> None:
+        """
+        Close the market data feed connections, then close the broker's HTTP session and
+        release its connections.
+        """
+        if self.feed_subscriptions is not None:
+            await self.feed_subscriptions.close()
+            self.feed_subscriptions = None
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
         
     @abc.abstractmethod
     def _get_broker_name(self) -> str:
@@ -79,13 +927,23 @@ class BaseBroker(abc.ABC):
         pass
     
     @abc.abstractmethod
-    async def ltp_quote(self, ltp_request_data: List[Dict[str, str]]) -> Dict[str, Any]:
+    async def ltp_quote(
+        self,
+        request_data: List[Dict[str, str]],
+        max_age: Optional[float] = None,
+        errors: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
         """
         Get last traded price quotes for specified instruments.
         
         Args:
-            ltp_request_data (List[Dict[str, str]]): List of dictionaries containing
+            request_data (List[Dict[str, str]]): List of dictionaries containing
                 instrument identifiers like exchange_token, exchange, etc.
+            max_age (Optional[float]): Maximum age in seconds of a cached quote.
+                Defaults to the LTP cache TTL; 0 forces a fresh fetch.
+            errors (Optional[Dict[str, str]]): When given, instruments that could
+                not be fetched are recorded here (error message by exchange
+                token) and the others are returned, instead of failing the call.
                 
         Returns:
             Dict[str, Any]: Dictionary containing LTP data for requested instruments.
@@ -113,7 +971,7 @@ class BaseBroker(abc.ABC):
             exchange (str): Exchange name (e.g., 'NSE', 'BSE').
             exchange_token (str): Exchange token for the instrument.
             instrument_type (str): Type of instrument (e.g., 'EQ', 'FUT').
-            interval (str): Time interval for candles (e.g., '1minute', '1day').
+            interval (str): Time interval for candles (e.g., '1minute', 'day').
             from_date (str): Start date in 'YYYY-MM-DD' format.
             to_date (str): End date in 'YYYY-MM-DD' format.
             
@@ -129,46 +987,192 @@ class BaseBroker(abc.ABC):
     @abc.abstractmethod
     async def full_market_quote(
         self,
-        exchange_token: str,
-        exchange: str,
-        instrument_type: str
+        request_data: List[Dict[str, str]],
+        max_age: Optional[float] = None,
+        errors: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
         """
-        Get full market quote for a specified instrument.
+        Get full market quotes for specified instruments.
         
         Args:
-            exchange_token (str): Exchange token for the instrument.
-            exchange (str): Exchange name (e.g., 'NSE', 'BSE').
-            instrument_type (str): Type of instrument (e.g., 'EQ', 'FUT').
+            request_data (List[Dict[str, str]]): List of dictionaries containing
+                instrument identifiers like exchange_token, exchange, etc.
+            max_age (Optional[float]): Maximum age in seconds of a cached quote.
+                Defaults to the full quote cache TTL; 0 forces a fresh fetch.
+            errors (Optional[Dict[str, str]]): When given, instruments that could
+                not be fetched are recorded here (error message by exchange
+                token) and the others are returned, instead of failing the call.
             
         Returns:
-            Dict[str, Any]: Dictionary containing full market quote data.
+            Dict[str, Any]: Dictionary containing full market quote data for requested instruments.
             
         Raises:
-            ValueError: If parameters are invalid.
+            ValueError: If instrument identifiers are invalid.
             Exception: If quote retrieval fails.
         """
         pass
 
-    async def _get_upstox_master_data(self) -> Dict:
+    def filter_master(
+        self,
+        segments: Optional[List[str]] = None,
+        instrument_types: Optional[List[str]] = None,
+        underlying: Optional[str] = None,
+        expiry: Optional[str] = None,
+        columns: Optional[List[str]] = None
+    ) -> pl.DataFrame:
+        """
+        Select a filtered projection of the master data.
+
+        Filtering is vectorized over master_df; the result shares memory with it
+        until it is serialized.
+
+        Args:
+            segments (Optional[List[str]]): Values of the broker's segment column
+                (SEGMENT_COLUMN) to keep, e.g. 'NSE_FO' for Upstox or 'NFO-OPT' for Zerodha.
+            instrument_types (Optional[List[str]]): Instrument types to keep.
+            underlying (Optional[str]): Underlying name to keep (the 'name' column).
+            expiry (Optional[str]): Expiry date to keep, in 'YYYY-MM-DD' format.
+            columns (Optional[List[str]]): Columns to return. Defaults to all.
+
+        Returns:
+            pl.DataFrame: The matching master rows.
+
+        Raises:
+            ValueError: If an unknown column is requested.
+        """
+        predicates = []
+        if segments:
+            predicates.append(pl.col(self.SEGMENT_COLUMN).is_in(segments))
+        if instrument_types:
+            predicates.append(pl.col("instrument_type").is_in(instrument_types))
+        if underlying:
+            predicates.append(pl.col("name") == underlying)
+        if expiry:
+            predicates.append(pl.col("expiry") == expiry)
+
+        df = self.master_df.filter(*predicates) if predicates else self.master_df
+        if columns:
+            unknown_columns = [column for column in columns if column not in df.columns]
+            if unknown_columns:
+                raise ValueError(f"Unknown master data column(s): {unknown_columns}")
+            df = df.select(columns)
+        return df
+
+    def _master_loaded(self) -> None:
+        """
+        Record that master_df holds the current trading date's master data.
+        """
+        self.master_trading_date = current_trading_date().isoformat()
+
+    def _master_segments(self) -> Optional[List[str]]:
+        """
+        Get the market segments whose instruments should be loaded.
+
+        Segments use Upstox naming (e.g. 'NSE_EQ', 'NSE_FO', 'NSE_INDEX') for all
+        brokers and come from the 'master_segments' config key or the
+        MASTER_SEGMENTS environment variable (comma separated).
+
+        Returns:
+            Optional[List[str]]: Sorted segment names, or None to load the full universe.
+        """
+        segments = (self.config or {}).get("master_segments") or os.getenv("MASTER_SEGMENTS")
+        if not segments:
+            return None
+        if isinstance(segments, str):
+            segments = segments.split(",")
+        return sorted({segment.strip().upper() for segment in segments if segment.strip()})
+
+    async def _get_upstox_master_data(self) -> pl.DataFrame:
         '''
         Mapping Index tradingsymbols into the upstox master file.
         Add the 'instrument_key' with it's respective 'tradingsymbol'
 
+        The gzip is decompressed while it streams in and only the columns in
+        UPSTOX_MASTER_SCHEMA are parsed. When master segments are configured,
+        only the per-exchange files covering them are downloaded, concurrently,
+        and filtered to those segments. The parsed files are served from the
+        local master cache when they are current for the trading date.
         '''
-        instrument_link = 'https://assets.upstox.com/market-quote/instruments/exchange/complete.csv.gz'
+        segments = self._master_segments()
+        if segments is None:
+            files = {"complete": None}
+        else:
+            files = {}
+            for segment in segments:
+                files.setdefault(segment.split("_")[0], []).append(segment)
+
+        async def load(file_name: str, file_segments: Optional[List[str]]) -> pl.DataFrame:
+            instrument_link = f'https://assets.upstox.com/market-quote/instruments/exchange/{file_name}.csv.gz'
+            segment_filter = None if file_segments is None else pl.col("exchange").is_in(file_segments)
+
+            async def parse(response: aiohttp.ClientResponse) -> pl.DataFrame:
+                return await self._read_master_csv(
+                    response,
+                    schema=UPSTOX_MASTER_SCHEMA,
+                    compressed=True,
+                    row_filter=segment_filter
+                )
+
+            snapshot_name = f"upstox_{file_name}"
+            if file_segments is not None:
+                snapshot_name += "_" + "-".join(file_segments)
+            return await self.master_cache.load(
+                name=snapshot_name,
+                url=instrument_link,
+                parse=parse,
+                session=self._get_session()
+            )
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(instrument_link) as response:
-                    response.raise_for_status()
-                    compressed_data = BytesIO(await response.read())
-                    if response.status == 200:
-                        with gzip.GzipFile(fileobj=compressed_data) as f:
-                            instrument_df = pl.read_csv(f)
-                            return instrument_df.to_dict()
-                    else:
-                        error_msg = f"Failed to retrieve Upstox instrument data. Status code: {response.status}"
-                        raise Exception(error_msg)
+            frames = await asyncio.gather(
+                *(load(file_name, file_segments) for file_name, file_segments in files.items())
+            )
+            return pl.concat(frames) if len(frames) > 1 else frames[0]
         except Exception as e:
-            raise Exception(f"Error fetching instrument data: {e}")
\ No newline at end of file
+            raise Exception(f"Error fetching instrument data: {e}")
+
+    @staticmethod
+    async def _read_master_csv(
+        response: aiohttp.ClientResponse,
+        schema: Dict[str, pl.DataType],
+        compressed: bool = False,
+        row_filter: Optional[pl.Expr] = None
+    ) -> pl.DataFrame:
+        """
+        Stream an instrument CSV to a temporary file and parse a projection of it.
+
+        The body is written (and gunzipped when `compressed`) chunk by chunk, so
+        neither the compressed nor the decompressed file is held in memory, and
+        only the columns in `schema` are parsed with their declared types. Only
+        the network reads run on the event loop; the disk writes, decompression
+        and parsing run in worker threads, so quote requests are not stalled
+        while a master loads.
+
+        Args:
+            response (aiohttp.ClientResponse): Successful response carrying the CSV.
+            schema (Dict[str, pl.DataType]): Columns to parse and their types.
+            compressed (bool): Whether the body is a gzip stream.
+            row_filter (Optional[pl.Expr]): Predicate applied while scanning, so
+                only matching rows are materialized.
+
+        Returns:
+            pl.DataFrame: The projected instrument master.
+        """
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if compressed else None
+
+        def write(csv_file: Any, chunk: bytes) -> None:
+            csv_file.write(decompressor.decompress(chunk) if decompressor else chunk)
+
+        def parse(csv_file: Any) -> pl.DataFrame:
+            if decompressor:
+                csv_file.write(decompressor.flush())
+            csv_file.flush()
+            lazy_df = pl.scan_csv(csv_file.name, schema_overrides=schema).select(list(schema))
+            if row_filter is not None:
+                lazy_df = lazy_df.filter(row_filter)
+            return lazy_df.collect()
+
+        with tempfile.NamedTemporaryFile(suffix=".csv") as csv_file:
+            async for chunk in response.content.iter_chunked(MASTER_DOWNLOAD_CHUNK_SIZE):
+                await asyncio.to_thread(write, csv_file, chunk)
+            return await asyncio.to_thread(parse, csv_file)
@@ -0,0 +1,282 @@
+"""
+Candle builder module.
+
+This module contains the CandleBuilder class that folds live ticks into the
+current session's OHLCV/OI candles for several intervals at once.
+"""
+
+import re
+import math
+import numpy as np
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .master_cache import EXCHANGE_TIMEZONE
+from .market_calendar import EXCHANGE_SESSIONS, MarketCalendar
+
+
+# Per-bar fields. 'volume' holds the cumulative day volume at the bar's last
+# tick; bar volumes are its differences.
+BAR_FIELDS = ("open", "high", "low", "close", "volume", "oi")
+
+# Interval length in seconds for a whole-session (daily) candle.
+SESSION_INTERVAL = 0
+
+_MINUTE_INTERVAL = re.compile(r"^(\d*)minutes?$")
+_LONGEST_SESSION = max(
+    (datetime.combine(date.min, close) - datetime.combine(date.min, open_)).total_seconds()
+    for open_, close in EXCHANGE_SESSIONS.values()
+)
+_UTC_OFFSET = int(datetime(2000, 1, 1, tzinfo=EXCHANGE_TIMEZONE).utcoffset().total_seconds())
+
+
+def candle_interval(interval: str) -> Optional[int]:
+    """
+    Get the length of a broker candle interval.
+
+    Args:
+        interval (str): Interval name in Upstox or Kite naming (e.g. '1minute',
+            'minute', '15minute', 'day').
+
+    Returns:
+        Optional[int]: Length in seconds, SESSION_INTERVAL for 'day', or None
+            for intervals that are not intraday or daily (e.g. 'week').
+    """
+    if interval == "day":
+        return SESSION_INTERVAL
+    match = _MINUTE_INTERVAL.match(interval)
+    if match is None:
+        return None
+    return 60 * int(match.group(1) or 1)
+
+
+class CandleBuilder:
+    """
+    Incremental OHLCV/OI candles of the current session, per instrument row.
+
+    Rows are the TickStore's instrument slots. Each interval has one
+    preallocated (rows, bars per session) float64 matrix per BAR_FIELDS field;
+    bar i of a row covers [session open + i x interval, + interval). A batch
+    of ticks, all received at one time, is folded into every interval with a
+    few vectorized updates. Ticks outside the instrument's exchange session
+    are ignored; the first tick of a new session clears the row, so the last
+    session's candles stay available until the next one opens.
+
+    Candles of a session are only served for instruments tracked since before
+    it opened: bars before the first tick would otherwise be missing.
+
+    Attributes:
+        intervals (List[int]): Interval lengths built, in seconds.
+        calendar (MarketCalendar): Exchange sessions and holidays.
+    """
+
+    def __init__(
+        self,
+        intervals: Iterable[int],
+        calendar: MarketCalendar,
+        exchange_of: Callable[[str], str]
+    ):
+        """
+        Initialize the builder with no rows.
+
+        Args:
+            intervals (Iterable[int]): Interval lengths in seconds;
+                SESSION_INTERVAL builds daily candles.
+            calendar (MarketCalendar): Exchange sessions and holidays.
+            exchange_of (Callable[[str], str]): Maps an instrument key to its
+                exchange or segment name.
+        """
+        self.intervals = sorted(set(intervals))
+        self.calendar = calendar
+        self.exchange_of = exchange_of
+        self._bars = {
+            interval: 1 if interval == SESSION_INTERVAL else math.ceil(_LONGEST_SESSION / interval)
+            for interval in self.intervals
+        }
+        self._fields = {
+            interval: {name: np.empty((0, bars)) for name in BAR_FIELDS}
+            for interval, bars in self._bars.items()
+        }
+        self._exchange_index = np.zeros(0, dtype=np.int64)
+        self._session_open = np.zeros(0)
+        self._tracked_since = np.zeros(0)
+        self._base_volume = np.zeros(0)
+        self._exchanges: List[str] = []
+        self._exchange_ids: Dict[str, int] = {}
+        # Per exchange: current session (open, close) and the time span the
+        # lookup holds for.
+        self._session_bounds = np.zeros((0, 2))
+        self._session_valid = np.zeros((0, 2))
+
+    def resize(self, rows: int) -> None:
+        """
+        Grow the matrices to `rows` rows, keeping existing ones.
+        """
+        grown = rows - len(self._session_open)
+        if grown <= 0:
+            return
+        for interval, fields in self._fields.items():
+            for name, matrix in fields.items():
+                fields[name] = np.concatenate([matrix, np.full((grown, self._bars[interval]), np.nan)])
+        self._exchange_index = np.concatenate([self._exchange_index, np.full(grown, -1, dtype=np.int64)])
+        self._session_open = np.concatenate([self._session_open, np.full(grown, np.nan)])
+        self._tracked_since = np.concatenate([self._tracked_since, np.full(grown, np.nan)])
+        self._base_volume = np.concatenate([self._base_volume, np.full(grown, np.nan)])
+
+    def reset(self, row: int, instrument_key: str, tracked_since: float) -> None:
+        """
+        Assign a row to an instrument, starting without candles.
+
+        Args:
+            row (int): The row.
+            instrument_key (str): Broker instrument key.
+            tracked_since (float): Epoch time ticks are folded from.
+        """
+        exchange = self.exchange_of(instrument_key)
+        if self.calendar.session(exchange) is None:
+            exchange_index = -1
+        else:
+            exchange_index = self._exchange_ids.get(exchange)
+            if exchange_index is None:
+                exchange_index = len(self._exchanges)
+                self._exchanges.append(exchange)
+                self._exchange_ids[exchange] = exchange_index
+                self._session_bounds = np.vstack([self._session_bounds, [np.nan, np.nan]])
+                self._session_valid = np.vstack([self._session_valid, [np.inf, -np.inf]])
+        self._exchange_index[row] = exchange_index
+        self._session_open[row] = np.nan
+        self._tracked_since[row] = tracked_since
+
+    def fold(
+        self,
+        rows: np.ndarray,
+        timestamp: float,
+        last_price: np.ndarray,
+        volume: np.ndarray,
+        oi: np.ndarray
+    ) -> None:
+        """
+        Fold a batch of ticks into the candles of every interval.
+
+        Args:
+            rows (np.ndarray): Distinct rows of the ticking instruments.
+            timestamp (float): Epoch time the ticks were received.
+            last_price (np.ndarray): Last traded prices.
+            volume (np.ndarray): Cumulative day volumes (NaN if unknown).
+            oi (np.ndarray): Open interest (NaN if unknown).
+        """
+        exchange_index = self._exchange_index[rows]
+        known = exchange_index >= 0
+        if not known.any():
+            return
+        bounds = self._sessions_at(timestamp)[np.where(known, exchange_index, 0)]
+        in_session = known & (bounds[:, 0] <= timestamp) & (timestamp < bounds[:, 1]) & ~np.isnan(last_price)
+        if not in_session.any():
+            return
+        if not in_session.all():
+            rows, bounds = rows[in_session], bounds[in_session]
+            last_price, volume, oi = last_price[in_session], volume[in_session], oi[in_session]
+        session_open = bounds[:, 0]
+
+        new_session = self._session_open[rows] != session_open
+        if new_session.any():
+            self._start_session(rows[new_session], session_open[new_session], volume[new_session])
+
+        elapsed = timestamp - session_open
+        for interval, fields in self._fields.items():
+            if interval == SESSION_INTERVAL:
+                bars = np.zeros(len(rows), dtype=np.int64)
+            else:
+                bars = (elapsed // interval).astype(np.int64)
+            opens = fields["open"][rows, bars]
+            fields["open"][rows, bars] = np.where(np.isnan(opens), last_price, opens)
+            fields["high"][rows, bars] = np.fmax(fields["high"][rows, bars], last_price)
+            fields["low"][rows, bars] = np.fmin(fields["low"][rows, bars], last_price)
+            fields["close"][rows, bars] = last_price
+            fields["volume"][rows, bars] = volume
+            fields["oi"][rows, bars] = oi
+
+    def session_candles(self, row: int, interval: int) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Get the candles of a row's current (or last) session.
+
+        Args:
+            row (int): The row.
+            interval (int): Interval length in seconds, one of `intervals`.
+
+        Returns:
+            Optional[Dict[str, np.ndarray]]: Columns 'datetime' (bar start as
+                'YYYY-MM-DD HH:MM:SS' exchange time; midnight for daily
+                candles), open, high, low, close, volume and oi for the bars
+                that traded, oldest first. None if the interval is not built,
+                no session was seen, or the row was assigned after the session
+                opened.
+        """
+        fields = self._fields.get(interval)
+        session_open = self._session_open[row]
+        if fields is None or np.isnan(session_open) or not self._tracked_since[row] <= session_open:
+            return None
+        bars = np.flatnonzero(~np.isnan(fields["open"][row]))
+        columns = {name: fields[name][row, bars] for name in BAR_FIELDS}
+        columns["volume"] = np.diff(columns["volume"], prepend=self._base_volume[row])
+
+        if interval == SESSION_INTERVAL:
+            local_open = session_open + _UTC_OFFSET
+            starts = np.full(len(bars), local_open - local_open % 86400)
+        else:
+            starts = session_open + _UTC_OFFSET + bars * interval
+        columns["datetime"] = np.char.replace(
+            np.datetime_as_string(starts.astype("datetime64[s]")), "T", " "
+        )
+        return columns
+
+    def _start_session(self, rows: np.ndarray, session_open: np.ndarray, volume: np.ndarray) -> None:
+        """
+        Clear rows for a new session. Day volume counts from zero for rows
+        tracked since before the open, and from the first tick otherwise.
+        """
+        for fields in self._fields.values():
+            for matrix in fields.values():
+                matrix[rows] = np.nan
+        self._session_open[rows] = session_open
+        self._base_volume[rows] = np.where(self._tracked_since[rows] <= session_open, 0.0, volume)
+
+    def _sessions_at(self, timestamp: float) -> np.ndarray:
+        """
+        Get the session (open, close) of every known exchange at a time,
+        NaN where the exchange is closed. Lookups are cached while they hold.
+        """
+        valid = self._session_valid
+        stale = np.flatnonzero(~((valid[:, 0] <= timestamp) & (timestamp < valid[:, 1])))
+        for exchange_index in stale:
+            bounds, span = self._session_window(self._exchanges[exchange_index], timestamp)
+            self._session_bounds[exchange_index] = bounds
+            self._session_valid[exchange_index] = span
+        return self._session_bounds
+
+    def _session_window(
+        self,
+        exchange: str,
+        timestamp: float
+    ) -> Tuple[Tuple[float, float], Tuple[float, float]]:
+        """
+        Find the session of an exchange at a time.
+
+        Returns:
+            Tuple[Tuple[float, float], Tuple[float, float]]: The session (open,
+                close) in epoch seconds, NaN if closed, and the span of time
+                the answer holds for.
+        """
+        now = datetime.fromtimestamp(timestamp, EXCHANGE_TIMEZONE)
+        day = now.date()
+        open_time, close_time = self.calendar.session(exchange, day)
+        open_at = datetime.combine(day, open_time, tzinfo=EXCHANGE_TIMEZONE).timestamp()
+        close_at = datetime.combine(day, close_time, tzinfo=EXCHANGE_TIMEZONE).timestamp()
+        closed = (np.nan, np.nan)
+        if self.calendar.is_trading_day(exchange, day):
+            if open_at <= timestamp < close_at:
+                return (open_at, close_at), (open_at, close_at)
+            if timestamp < open_at:
+                return closed, (timestamp, open_at)
+        midnight = datetime.combine(day + timedelta(days=1), time(), tzinfo=EXCHANGE_TIMEZONE).timestamp()
+        return closed, (timestamp, midnight)
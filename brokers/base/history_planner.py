@@ -0,0 +1,84 @@
+"""
+History planner module.
+
+This module contains plan_history_windows, which splits a historical candle
+date range into the fewest upstream requests a broker's range limits allow.
+"""
+
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+from .market_calendar import MarketCalendar
+
+
+# Longest run of non-trading days to skip at a window edge (covers long
+# holiday runs); beyond it the edge is kept as is.
+_MAX_SKIP_DAYS = 15
+
+
+def _next_trading_day(calendar: MarketCalendar, exchange: str, day: date, last: date) -> Optional[date]:
+    """
+    Get the first trading day on or after `day`, up to `last`.
+    """
+    for _ in range(_MAX_SKIP_DAYS):
+        if day > last:
+            return None
+        if calendar.is_trading_day(exchange, day):
+            return day
+        day += timedelta(days=1)
+    return day if day <= last else None
+
+
+def _previous_trading_day(calendar: MarketCalendar, exchange: str, day: date, first: date) -> date:
+    """
+    Get the last trading day on or before `day`, down to `first`.
+    """
+    candidate = day
+    for _ in range(_MAX_SKIP_DAYS):
+        if candidate <= first or calendar.is_trading_day(exchange, candidate):
+            return candidate
+        candidate -= timedelta(days=1)
+    return day
+
+
+def plan_history_windows(
+    from_day: date,
+    to_day: date,
+    max_days: Optional[int],
+    calendar: MarketCalendar,
+    exchange: str
+) -> List[Tuple[date, date]]:
+    """
+    Split a date range into the fewest requests of at most `max_days` days.
+
+    Windows are filled greedily from the start, each spanning `max_days`
+    calendar days (inclusive) or up to the end of the range. Weekends and
+    holidays at the edges of the range and of every window are trimmed, so
+    no window starts or ends on a day without candles and no request is
+    spent on a range without a session.
+
+    Args:
+        from_day (date): First day of the range.
+        to_day (date): Last day of the range, inclusive.
+        max_days (Optional[int]): Longest range of one request in days, or
+            None if the broker has no limit.
+        calendar (MarketCalendar): Exchange sessions and holidays.
+        exchange (str): Exchange or segment name of the instrument.
+
+    Returns:
+        List[Tuple[date, date]]: (first day, last day) per request, in order.
+            Empty if the range has no trading day.
+    """
+    start = _next_trading_day(calendar, exchange, from_day, to_day)
+    if start is None:
+        return []
+    end_of_range = _previous_trading_day(calendar, exchange, to_day, start)
+
+    windows = []
+    while start is not None:
+        end = end_of_range
+        if max_days is not None and (end - start).days >= max_days:
+            end = _previous_trading_day(calendar, exchange, start + timedelta(days=max_days - 1), start)
+        windows.append((start, end))
+        start = _next_trading_day(calendar, exchange, end + timedelta(days=1), end_of_range)
+    return windows
@@ -0,0 +1,94 @@
+"""
+Instrument index module.
+
+This module contains the InstrumentIndex class, a hash index built once per
+master load that resolves instrument identifiers without scanning the master.
+"""
+
+import polars as pl
+from typing import Any, Hashable, Iterable, List, Sequence, Tuple, Union
+
+
+class InstrumentIndex:
+    """
+    Hash index over a broker's master DataFrame.
+
+    Maps the values of one or more key columns to the values of one or more
+    value columns. Composite keys and values are stored as tuples. When several
+    rows share a key, the first row wins, matching a filter-then-take-first lookup.
+
+    Attributes:
+        key_columns (Tuple[str, ...]): Columns forming the lookup key.
+        value_columns (Tuple[str, ...]): Columns returned for a key.
+    """
+
+    def __init__(
+        self,
+        master_df: pl.DataFrame,
+        key_columns: Union[str, Sequence[str]],
+        value_columns: Union[str, Sequence[str]]
+    ):
+        """
+        Build the index from a master DataFrame.
+
+        Args:
+            master_df (pl.DataFrame): The broker's master data.
+            key_columns (Union[str, Sequence[str]]): Column or columns forming the key.
+            value_columns (Union[str, Sequence[str]]): Column or columns returned for a key.
+        """
+        self.key_columns = (key_columns,) if isinstance(key_columns, str) else tuple(key_columns)
+        self.value_columns = (value_columns,) if isinstance(value_columns, str) else tuple(value_columns)
+
+        unique_df = master_df.unique(subset=list(self.key_columns), keep="first", maintain_order=True)
+        self._index = dict(zip(self._column_values(unique_df, self.key_columns),
+                               self._column_values(unique_df, self.value_columns)))
+
+    @staticmethod
+    def _column_values(df: pl.DataFrame, columns: Tuple[str, ...]) -> Iterable[Any]:
+        """
+        Get the values of one column, or row tuples of several columns.
+        """
+        if len(columns) == 1:
+            return df[columns[0]].to_list()
+        return df.select(columns).iter_rows()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._index
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Look up a single key.
+
+        Args:
+            key (Hashable): The key value, or a tuple for composite keys.
+            default (Any): Value returned when the key is not indexed.
+
+        Returns:
+            Any: The indexed value(s) for the key, or `default`.
+        """
+        return self._index.get(key, default)
+
+    def resolve(self, keys: Iterable[Hashable]) -> Tuple[List[Any], List[Hashable]]:
+        """
+        Resolve a list of keys in a single pass.
+
+        Args:
+            keys (Iterable[Hashable]): Keys to resolve, in request order.
+
+        Returns:
+            Tuple[List[Any], List[Hashable]]: The resolved values in request order,
+                and every key that is not in the index.
+        """
+        index = self._index
+        values = []
+        missing = []
+        for key in keys:
+            value = index.get(key)
+            if value is None:
+                missing.append(key)
+            else:
+                values.append(value)
+        return values, missing
@@ -0,0 +1,199 @@
+"""
+Instrument search module.
+
+This module contains the InstrumentSearchIndex class, a prefix index over
+tradingsymbols and names built once per master load, used for typeahead
+instrument lookups.
+"""
+
+import re
+import bisect
+import polars as pl
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+
+# Upper bound for prefix ranges; sorts after every normalized character.
+_PREFIX_END = "~"
+
+_NON_KEY_CHARACTERS = re.compile(r"[^A-Z0-9]")
+
+
+def normalize_search_key(value: str) -> str:
+    """
+    Normalize a symbol, name or query for matching.
+
+    Keys are upper-cased and stripped of everything but letters and digits, so
+    'Nifty 50', 'NIFTY50' and 'nifty-50' all match each other.
+
+    Args:
+        value (str): The raw value.
+
+    Returns:
+        str: The normalized key.
+    """
+    return _NON_KEY_CHARACTERS.sub("", value.upper())
+
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class InstrumentSearchIndex:
+    """
+    Prefix and fuzzy search index over a broker's master DataFrame.
+
+    Every row is indexed by its normalized tradingsymbol. Rows without an
+    expiry (equities, indices) are also indexed by their normalized name, so
+    'reliance industries' finds the equity without also returning every
+    derivative on it. Keys are kept in one sorted array per segment, so a prefix
+    lookup is two binary searches plus the rows it returns.
+
+    Fuzzy matching falls back to trigram similarity over the distinct keys of
+    rows without an expiry, which tolerates typos in underlying names.
+
+    Attributes:
+        segment_column (str): Master data column holding the market segment.
+    """
+
+    FUZZY_MIN_SIMILARITY = 0.4
+
+    def __init__(self, master_df: pl.DataFrame, segment_column: str):
+        """
+        Build the index from a master DataFrame.
+
+        Args:
+            master_df (pl.DataFrame): The broker's master data.
+            segment_column (str): Master data column holding the market segment.
+        """
+        self.segment_column = segment_column
+        self._master_df = master_df
+
+        rows = master_df.select(
+            pl.int_range(pl.len(), dtype=pl.UInt32).alias("row"),
+            pl.col("tradingsymbol"),
+            pl.col("name"),
+            pl.col(segment_column).alias("segment"),
+            (pl.col("expiry").is_null() | (pl.col("expiry") == "")).alias("is_underlying")
+            if "expiry" in master_df.columns else pl.lit(True).alias("is_underlying"),
+        )
+        normalize = lambda column: (
+            pl.col(column).str.to_uppercase().str.replace_all(r"[^A-Z0-9]", "").alias("key")
+        )
+        entries = pl.concat([
+            rows.select("row", "segment", "is_underlying", normalize("tradingsymbol")),
+            rows.filter(pl.col("is_underlying")).select("row", "segment", "is_underlying", normalize("name")),
+        ]).filter(pl.col("key").is_not_null() & (pl.col("key") != "")).unique(
+            subset=["row", "key"]
+        ).sort(["segment", "key", "row"])
+
+        # segment -> (sorted keys, row ids aligned with the keys)
+        self._segments: Dict[str, tuple] = {}
+        for (segment,), segment_entries in entries.group_by(["segment"], maintain_order=True):
+            self._segments[segment] = (
+                segment_entries["key"].to_list(),
+                segment_entries["row"].to_list(),
+            )
+
+        # Fuzzy fallback over the distinct keys of rows without an expiry.
+        underlying_entries = entries.filter(pl.col("is_underlying")).group_by("key").agg(pl.col("row"))
+        self._fuzzy_keys: List[str] = underlying_entries["key"].to_list()
+        self._fuzzy_rows: List[List[int]] = underlying_entries["row"].to_list()
+        self._trigram_postings: Dict[str, List[int]] = {}
+        for key_id, key in enumerate(self._fuzzy_keys):
+            for trigram in _trigrams(key):
+                self._trigram_postings.setdefault(trigram, []).append(key_id)
+
+    def _prefix_rows(self, key: str, segments: List[str], limit: int) -> List[int]:
+        """
+        Collect up to `limit` rows whose keys start with `key`, in key order.
+        """
+        candidates = []
+        for segment in segments:
+            index = self._segments.get(segment)
+            if index is None:
+                continue
+            keys, rows = index
+            lo = bisect.bisect_left(keys, key)
+            hi = min(bisect.bisect_left(keys, key + _PREFIX_END, lo), lo + limit * 2)
+            candidates.extend(zip(keys[lo:hi], rows[lo:hi]))
+        if len(segments) > 1:
+            candidates.sort()
+
+        result = []
+        seen = set()
+        for _, row in candidates:
+            if row not in seen:
+                seen.add(row)
+                result.append(row)
+                if len(result) == limit:
+                    break
+        return result
+
+    def _fuzzy_rows_for(self, key: str, limit: int) -> List[int]:
+        """
+        Collect rows whose keys are most similar to `key` by trigram overlap.
+        """
+        query_trigrams = _trigrams(key)
+        overlaps = Counter()
+        for trigram in query_trigrams:
+            overlaps.update(self._trigram_postings.get(trigram, ()))
+
+        scored = []
+        for key_id, overlap in overlaps.items():
+            candidate_trigrams = len(self._fuzzy_keys[key_id]) + 1
+            similarity = 2 * overlap / (len(query_trigrams) + candidate_trigrams)
+            if similarity >= self.FUZZY_MIN_SIMILARITY:
+                scored.append((-similarity, self._fuzzy_keys[key_id], key_id))
+        scored.sort()
+
+        result = []
+        for _, _, key_id in scored:
+            result.extend(self._fuzzy_rows[key_id])
+            if len(result) >= limit:
+                break
+        return result[:limit]
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        segments: Optional[List[str]] = None,
+        fuzzy: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Search instruments by tradingsymbol or name.
+
+        Prefix matches come first, in key order (so an exact match leads). When
+        `fuzzy` is set and there are fewer than `limit` prefix matches, the
+        result is topped up with the closest fuzzy matches.
+
+        Args:
+            query (str): The search text.
+            limit (int): Maximum number of results.
+            segments (Optional[List[str]]): Segments to search. Defaults to all.
+            fuzzy (bool): Whether to fall back to fuzzy matching.
+
+        Returns:
+            List[Dict[str, Any]]: Matching master rows.
+        """
+        key = normalize_search_key(query)
+        if not key or limit <= 0:
+            return []
+        segments = list(self._segments) if not segments else segments
+
+        rows = self._prefix_rows(key, segments, limit)
+        if fuzzy and len(rows) < limit:
+            seen = set(rows)
+            allowed_segments = set(segments)
+            for row in self._fuzzy_rows_for(key, limit * 2):
+                if row not in seen and self._master_df[self.segment_column][row] in allowed_segments:
+                    seen.add(row)
+                    rows.append(row)
+                    if len(rows) == limit:
+                        break
+
+        if not rows:
+            return []
+        return self._master_df[rows].to_dicts()
@@ -0,0 +1,264 @@
+"""
+Market calendar module.
+
+This module contains the MarketCalendar class that knows the trading sessions
+and holidays of the Indian exchanges, so the broker layer can tell whether a
+quote or candle can still change.
+"""
+
+import os
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from .master_cache import EXCHANGE_TIMEZONE
+
+
+# Regular session (open, close) in exchange time, per holiday calendar.
+EXCHANGE_SESSIONS = {
+    "NSE": (time(hour=9, minute=15), time(hour=15, minute=30)),
+    "CDS": (time(hour=9, minute=0), time(hour=17, minute=0)),
+    "MCX": (time(hour=9, minute=0), time(hour=23, minute=30)),
+}
+
+# Exchange or segment prefix -> session and holiday calendar it follows. Covers
+# both Upstox ('NSE_FO', 'NCD_FO') and Kite ('NFO', 'CDS') naming.
+EXCHANGE_CALENDARS = {
+    "NSE": "NSE",
+    "BSE": "NSE",
+    "NFO": "NSE",
+    "BFO": "NSE",
+    "CDS": "CDS",
+    "NCD": "CDS",
+    "BCD": "CDS",
+    "MCX": "MCX",
+}
+
+# Full-day trading holidays, per holiday calendar. Currency derivatives follow
+# the equity list; MCX only lists days with no session at all. Add new or
+# announced holidays with the 'market_holidays' config key or the
+# MARKET_HOLIDAYS_FILE environment variable.
+EXCHANGE_HOLIDAYS = {
+    "NSE": [
+        "2025-02-26", "2025-03-14", "2025-03-31", "2025-04-10", "2025-04-14",
+        "2025-04-18", "2025-05-01", "2025-08-15", "2025-08-27", "2025-10-02",
+        "2025-10-21", "2025-10-22", "2025-11-05", "2025-12-25",
+        # 2026-01-15: Maharashtra municipal elections, announced separately.
+        "2026-01-15", "2026-01-26", "2026-03-03", "2026-03-26", "2026-03-31",
+        "2026-04-03", "2026-04-14", "2026-05-01", "2026-05-28", "2026-06-26",
+        "2026-09-14", "2026-10-02", "2026-10-20", "2026-11-10", "2026-11-24",
+        "2026-12-25",
+    ],
+    "MCX": [
+        "2025-04-18", "2025-08-15", "2025-10-02", "2025-12-25",
+        "2026-01-26", "2026-04-03", "2026-10-02", "2026-12-25",
+    ],
+}
+EXCHANGE_HOLIDAYS["CDS"] = EXCHANGE_HOLIDAYS["NSE"]
+
+# Holidays with only an evening session, per holiday calendar: the session
+# opens at the given time instead of the regular open.
+EXCHANGE_EVENING_SESSIONS = {
+    "MCX": (time(hour=17, minute=0), [
+        "2025-02-26", "2025-03-14", "2025-03-31", "2025-04-10", "2025-04-14",
+        "2025-05-01", "2025-08-27", "2025-10-21", "2025-10-22", "2025-11-05",
+        "2026-03-03", "2026-03-26", "2026-03-31", "2026-04-14", "2026-05-01",
+        "2026-05-28", "2026-06-26", "2026-09-14", "2026-10-20", "2026-11-10",
+        "2026-11-24",
+    ]),
+}
+
+# Prices keep settling for a while after the close (closing price computation,
+# post-close session); quotes fetched after this are final for the day.
+SESSION_SETTLE_TIME = timedelta(minutes=30)
+
+# How far back to look for the previous session (covers long holiday runs).
+_MAX_LOOKBACK_DAYS = 15
+
+
+class MarketCalendar:
+    """
+    Trading sessions and holidays of the exchanges the brokers trade on.
+
+    Exchanges are given as an exchange or segment name in either broker's
+    naming (e.g. 'NSE', 'NSE_FO', 'NFO', 'MCX_FO'); unknown exchanges are
+    treated as always open, so nothing is cached longer for them.
+
+    Attributes:
+        holidays (Dict[str, set]): Holiday dates per holiday calendar.
+        evening_sessions (Dict[str, set]): Dates with only an evening session
+            per holiday calendar (see EXCHANGE_EVENING_SESSIONS).
+    """
+
+    def __init__(self, holidays: Optional[Dict[str, Iterable[str]]] = None):
+        """
+        Initialize the calendar.
+
+        Args:
+            holidays (Optional[Dict[str, Iterable[str]]]): Extra holidays, as
+                'YYYY-MM-DD' strings keyed by exchange, added to EXCHANGE_HOLIDAYS.
+        """
+        self.holidays: Dict[str, set] = {
+            calendar: {date.fromisoformat(day) for day in days}
+            for calendar, days in EXCHANGE_HOLIDAYS.items()
+        }
+        self.evening_sessions: Dict[str, set] = {
+            calendar: {date.fromisoformat(day) for day in days}
+            for calendar, (_, days) in EXCHANGE_EVENING_SESSIONS.items()
+        }
+        for exchange, days in (holidays or {}).items():
+            calendar = self._calendar(exchange)
+            if calendar is not None:
+                self.holidays.setdefault(calendar, set()).update(date.fromisoformat(day) for day in days)
+
+    @classmethod
+    def load(cls, holidays: Optional[Dict[str, Iterable[str]]] = None) -> "MarketCalendar":
+        """
+        Build the calendar with holidays from config and the MARKET_HOLIDAYS_FILE JSON file.
+
+        Args:
+            holidays (Optional[Dict[str, Iterable[str]]]): Extra holidays keyed by exchange.
+
+        Returns:
+            MarketCalendar: The calendar.
+        """
+        extra: Dict[str, list] = {}
+        holidays_file = os.getenv("MARKET_HOLIDAYS_FILE")
+        if holidays_file:
+            with open(holidays_file) as f:
+                for exchange, days in json.load(f).items():
+                    extra.setdefault(exchange, []).extend(days)
+        for exchange, days in (holidays or {}).items():
+            extra.setdefault(exchange, []).extend(days)
+        return cls(extra)
+
+    @staticmethod
+    def _calendar(exchange: str) -> Optional[str]:
+        """
+        Map an exchange or segment name to its holiday calendar.
+        """
+        return EXCHANGE_CALENDARS.get(exchange.upper().split("_")[0])
+
+    @staticmethod
+    def _now(now: Optional[datetime]) -> datetime:
+        return (now or datetime.now(EXCHANGE_TIMEZONE)).astimezone(EXCHANGE_TIMEZONE)
+
+    def session(self, exchange: str, day: Optional[date] = None) -> Optional[Tuple[time, time]]:
+        """
+        Get the session of an exchange.
+
+        Args:
+            exchange (str): Exchange or segment name.
+            day (Optional[date]): The day, for holidays with only an evening
+                session. Defaults to the regular session.
+
+        Returns:
+            Optional[Tuple[time, time]]: (open, close) in exchange time, or None if unknown.
+        """
+        calendar = self._calendar(exchange)
+        if calendar is None:
+            return None
+        open_time, close_time = EXCHANGE_SESSIONS[calendar]
+        if day is not None and day in self.evening_sessions.get(calendar, ()):
+            open_time = EXCHANGE_EVENING_SESSIONS[calendar][0]
+        return open_time, close_time
+
+    def is_trading_day(self, exchange: str, day: date) -> bool:
+        """
+        Check whether an exchange trades on a day.
+
+        Args:
+            exchange (str): Exchange or segment name.
+            day (date): The day.
+
+        Returns:
+            bool: False on weekends and holidays of a known exchange.
+        """
+        calendar = self._calendar(exchange)
+        if calendar is None:
+            return True
+        return day.weekday() < 5 and day not in self.holidays.get(calendar, ())
+
+    def is_open(self, exchange: str, now: Optional[datetime] = None) -> bool:
+        """
+        Check whether an exchange is in its regular session.
+
+        Args:
+            exchange (str): Exchange or segment name.
+            now (Optional[datetime]): Reference time. Defaults to the current time.
+
+        Returns:
+            bool: True during the session, and always for unknown exchanges.
+        """
+        now = self._now(now)
+        session = self.session(exchange, now.date())
+        if session is None:
+            return True
+        return self.is_trading_day(exchange, now.date()) and session[0] <= now.time() < session[1]
+
+    def last_close(self, exchange: str, now: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        Get the close of the most recent session that has ended.
+
+        Args:
+            exchange (str): Exchange or segment name.
+            now (Optional[datetime]): Reference time. Defaults to the current time.
+
+        Returns:
+            Optional[datetime]: The close time, or None for unknown exchanges.
+        """
+        session = self.session(exchange)
+        if session is None:
+            return None
+        now = self._now(now)
+        for days_back in range(_MAX_LOOKBACK_DAYS):
+            day = now.date() - timedelta(days=days_back)
+            close = datetime.combine(day, session[1], tzinfo=EXCHANGE_TIMEZONE)
+            if close <= now and self.is_trading_day(exchange, day):
+                return close
+        return None
+
+    def settled_since(self, exchange: str, now: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        Get the time since which an exchange's prices have been final.
+
+        Args:
+            exchange (str): Exchange or segment name.
+            now (Optional[datetime]): Reference time. Defaults to the current time.
+
+        Returns:
+            Optional[datetime]: The settle time of the last session if the
+                exchange is closed and its prices have settled, otherwise None.
+        """
+        now = self._now(now)
+        if self.is_open(exchange, now):
+            return None
+        last_close = self.last_close(exchange, now)
+        if last_close is None or last_close + SESSION_SETTLE_TIME > now:
+            return None
+        return last_close + SESSION_SETTLE_TIME
+
+    def is_session_settled(self, exchange: str, day: date, now: Optional[datetime] = None) -> bool:
+        """
+        Check whether a day's data for an exchange can no longer change.
+
+        Args:
+            exchange (str): Exchange or segment name.
+            day (date): The day.
+            now (Optional[datetime]): Reference time. Defaults to the current time.
+
+        Returns:
+            bool: True for past days, and for today once its session has settled
+                or if it is not a trading day. Always False for unknown exchanges.
+        """
+        session = self.session(exchange)
+        if session is None:
+            return False
+        now = self._now(now)
+        if day < now.date():
+            return True
+        if day > now.date():
+            return False
+        if not self.is_trading_day(exchange, day):
+            return True
+        return now >= datetime.combine(day, session[1], tzinfo=EXCHANGE_TIMEZONE) + SESSION_SETTLE_TIME
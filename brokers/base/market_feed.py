@@ -0,0 +1,246 @@
+"""
+Market data feed module.
+
+This module contains the MarketFeed abstract base class for streaming market
+data feeds that keep a broker's QuoteBook up to date over a WebSocket.
+"""
+
+import abc
+import asyncio
+import aiohttp
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .quote_book import QuoteBook
+
+
+class MarketFeed(abc.ABC):
+    """
+    Abstract base class for a broker's streaming market data feed.
+
+    A feed owns one WebSocket connection; a SubscriptionManager decides which
+    instruments each connection streams. It subscribes the requested
+    instruments, decodes every frame into quotes in the broker's REST quote
+    format and writes them into a QuoteBook. The connection is re-opened with
+    the broker's retry backoff when it drops, and all subscriptions are
+    restored. The feed's instruments are dropped from the book while it is
+    disconnected, so they are served by other means.
+
+    Subclasses implement how the connection URL is obtained, how subscription
+    requests are sent and how frames are decoded.
+
+    Attributes:
+        broker (BaseBroker): The broker whose account and session the feed uses.
+        quote_book (QuoteBook): The book the feed maintains.
+        mode (str): Subscription mode, one of MODES.
+        subscriptions (Set[str]): Subscribed broker instrument keys.
+    """
+
+    # Subscription mode -> QuoteBook mode of the quotes it produces.
+    MODES: Dict[str, str] = {}
+
+    # Instruments one connection may subscribe, per subscription mode, and
+    # connections allowed per account.
+    MAX_INSTRUMENTS: Dict[str, int] = {}
+    MAX_CONNECTIONS = 1
+
+    # WebSocket heartbeat interval in seconds.
+    HEARTBEAT = 30
+
+    def __init__(self, broker: Any, quote_book: QuoteBook, mode: str):
+        """
+        Initialize the feed.
+
+        Args:
+            broker (BaseBroker): The broker whose account and session the feed uses.
+            quote_book (QuoteBook): The book the feed maintains.
+            mode (str): Subscription mode.
+
+        Raises:
+            ValueError: If the mode is not supported.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unsupported market data feed mode: {mode}. Valid modes are: {list(self.MODES)}")
+        self.broker = broker
+        self.logger = broker.logger
+        self.quote_book = quote_book
+        self.mode = mode
+        self.subscriptions: Set[str] = set()
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._task: Optional[asyncio.Task] = None
+        self._connected = asyncio.Event()
+
+    def start(self) -> None:
+        """
+        Start streaming in the background.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def wait_connected(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait until the feed is connected and subscribed.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait.
+
+        Raises:
+            asyncio.TimeoutError: If the feed does not connect in time.
+        """
+        await asyncio.wait_for(self._connected.wait(), timeout)
+
+    async def subscribe(self, instrument_keys: Iterable[str]) -> None:
+        """
+        Subscribe instruments to the feed.
+
+        Args:
+            instrument_keys (Iterable[str]): Broker instrument keys.
+        """
+        new_keys = [key for key in dict.fromkeys(instrument_keys) if key not in self.subscriptions]
+        if not new_keys:
+            return
+        self.subscriptions.update(new_keys)
+        await self._send("sub", new_keys)
+
+    async def unsubscribe(self, instrument_keys: Iterable[str]) -> None:
+        """
+        Unsubscribe instruments from the feed and drop them from the book.
+
+        Args:
+            instrument_keys (Iterable[str]): Broker instrument keys.
+        """
+        keys = [key for key in dict.fromkeys(instrument_keys) if key in self.subscriptions]
+        if not keys:
+            return
+        self.subscriptions.difference_update(keys)
+        self.quote_book.discard(keys)
+        await self._send("unsub", keys)
+
+    async def close(self) -> None:
+        """
+        Stop streaming and close the connection.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.quote_book.discard(list(self.subscriptions))
+
+    async def _send(self, method: str, instrument_keys: List[str]) -> None:
+        """
+        Send a subscription request, if connected. Requests made while
+        disconnected are applied from `subscriptions` on reconnect.
+        """
+        ws = self._ws
+        if ws is None or ws.closed:
+            return
+        await self._send_subscription(ws, method, instrument_keys)
+
+    @abc.abstractmethod
+    async def _connect_url(self) -> str:
+        """
+        Get the URL to open the feed's WebSocket on.
+
+        Returns:
+            str: The WebSocket URL.
+
+        Raises:
+            Exception: If the broker refuses the connection.
+        """
+        pass
+
+    @abc.abstractmethod
+    async def _send_subscription(
+        self,
+        ws: aiohttp.ClientWebSocketResponse,
+        method: str,
+        instrument_keys: List[str]
+    ) -> None:
+        """
+        Send a subscription request on the connection.
+
+        Args:
+            ws (aiohttp.ClientWebSocketResponse): The open connection.
+            method (str): 'sub' or 'unsub'.
+            instrument_keys (List[str]): Broker instrument keys.
+        """
+        pass
+
+    @abc.abstractmethod
+    def _decode(self, frame: bytes) -> Dict[str, Dict[str, Any]]:
+        """
+        Decode a binary frame into quotes.
+
+        Args:
+            frame (bytes): The frame payload.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Quotes in the broker's REST quote format,
+                keyed by broker instrument key.
+        """
+        pass
+
+    def _on_text(self, text: str) -> None:
+        """
+        Handle a text frame (broker notices and errors). Logged by default.
+        """
+        self.logger.debug(f"Market data feed message: {text}")
+
+    def _on_frame(self, frame: bytes) -> None:
+        """
+        Write the quotes of a binary frame into the book and the broker's tick store.
+        """
+        book_mode = self.MODES[self.mode]
+        subscriptions = self.subscriptions
+        quotes = self._decode(frame)
+        for instrument_key, quote in quotes.items():
+            if instrument_key in subscriptions:
+                self.quote_book.update(instrument_key, quote, book_mode)
+        self.broker.tick_store.record(quotes)
+
+    async def _run(self) -> None:
+        """
+        Connect, subscribe and stream until cancelled, reconnecting on failure.
+        """
+        retry = 0
+        while True:
+            try:
+                url = await self._connect_url()
+                session = self.broker._get_session()
+                async with session.ws_connect(
+                    url, heartbeat=self.HEARTBEAT, timeout=aiohttp.ClientWSTimeout(ws_close=10)
+                ) as ws:
+                    self._ws = ws
+                    retry = 0
+                    if self.subscriptions:
+                        await self._send("sub", list(self.subscriptions))
+                    self._connected.set()
+                    self.logger.info(
+                        f"{self.broker.broker_name} market data feed connected "
+                        f"({len(self.subscriptions)} instruments)"
+                    )
+                    async for message in ws:
+                        if message.type == aiohttp.WSMsgType.BINARY:
+                            try:
+                                self._on_frame(message.data)
+                            except Exception as e:
+                                self.logger.warning(f"Skipping undecodable market data frame: {e}")
+                        elif message.type == aiohttp.WSMsgType.TEXT:
+                            self._on_text(message.data)
+                        elif message.type == aiohttp.WSMsgType.ERROR:
+                            break
+                self.logger.warning(f"{self.broker.broker_name} market data feed disconnected")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning(f"{self.broker.broker_name} market data feed error: {e}")
+            finally:
+                self._ws = None
+                self._connected.clear()
+                self.quote_book.discard(list(self.subscriptions))
+
+            delay = self.broker.retry_policy.backoff(retry)
+            retry += 1
+            await asyncio.sleep(delay)
@@ -0,0 +1,208 @@
+"""
+Master data cache module.
+
+This module contains the MasterCache class that keeps the last good snapshot of
+a broker's parsed instrument master on local disk, so warm restarts load it in
+milliseconds instead of re-downloading and re-parsing the instrument file.
+"""
+
+import os
+import json
+import asyncio
+import logging
+import aiohttp
+import polars as pl
+from pathlib import Path
+from datetime import datetime, date, time, timedelta
+from zoneinfo import ZoneInfo
+from typing import Dict, Any, Optional, Callable, Awaitable, Tuple
+
+
+EXCHANGE_TIMEZONE = ZoneInfo("Asia/Kolkata")
+
+# Brokers publish the day's instrument files early in the morning (IST).
+MASTER_PUBLISH_TIME = time(hour=7, minute=30)
+
+# Master files are large; only bound the connect and per-read waits.
+MASTER_DOWNLOAD_TIMEOUT = aiohttp.ClientTimeout(total=None, connect=10, sock_read=60)
+
+
+def current_trading_date(now: Optional[datetime] = None) -> date:
+    """
+    Get the exchange trading date whose instrument master should be in use.
+
+    Before the daily publish time, and on weekends, the latest master is the one
+    published on the previous weekday.
+
+    Args:
+        now (Optional[datetime]): Reference time. Defaults to the current time.
+
+    Returns:
+        date: The trading date of the current instrument master.
+    """
+    now = (now or datetime.now(EXCHANGE_TIMEZONE)).astimezone(EXCHANGE_TIMEZONE)
+    trading_date = now.date()
+    if now.time() < MASTER_PUBLISH_TIME:
+        trading_date -= timedelta(days=1)
+    while trading_date.weekday() >= 5:
+        trading_date -= timedelta(days=1)
+    return trading_date
+
+
+class MasterCache:
+    """
+    On-disk cache of parsed instrument master files.
+
+    Each snapshot is stored as a Parquet file next to a small JSON metadata file
+    holding the trading date it is valid for and the HTTP validators (ETag and
+    Last-Modified) of the download it came from. A snapshot for the current
+    trading date is served straight from disk. Otherwise the file is refreshed
+    with a conditional request, and the last good snapshot is served if the
+    download fails. Snapshots are read and written in worker threads, off the
+    event loop.
+
+    Attributes:
+        cache_dir (Path): Directory holding the snapshots.
+        logger (logging.Logger): Logger instance for the cache.
+    """
+
+    DEFAULT_CACHE_DIR = os.getenv("MASTER_CACHE_DIR", os.path.join(".cache", "master"))
+
+    def __init__(self, logger: logging.Logger, cache_dir: Optional[str] = None):
+        """
+        Initialize the master cache.
+
+        Args:
+            logger (logging.Logger): Logger instance for the cache.
+            cache_dir (Optional[str]): Directory holding the snapshots. Defaults to
+                the MASTER_CACHE_DIR environment variable or '.cache/master'.
+        """
+        self.logger = logger
+        self.cache_dir = Path(cache_dir or self.DEFAULT_CACHE_DIR)
+
+    def _snapshot_path(self, name: str) -> Path:
+        return self.cache_dir / f"{name}.parquet"
+
+    def _meta_path(self, name: str) -> Path:
+        return self.cache_dir / f"{name}.meta.json"
+
+    def _read_meta(self, name: str) -> Dict[str, Any]:
+        """
+        Read the metadata of a snapshot.
+
+        Args:
+            name (str): Snapshot name.
+
+        Returns:
+            Dict[str, Any]: The metadata, or an empty dict if there is no usable snapshot.
+        """
+        meta_path = self._meta_path(name)
+        if not meta_path.exists() or not self._snapshot_path(name).exists():
+            return {}
+        try:
+            return json.loads(meta_path.read_text())
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable master cache metadata {meta_path}: {e}")
+            return {}
+
+    def _write_meta(self, name: str, meta: Dict[str, Any]) -> None:
+        meta_path = self._meta_path(name)
+        tmp_path = meta_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(meta))
+        os.replace(tmp_path, meta_path)
+
+    def _write_snapshot(self, name: str, df: pl.DataFrame) -> None:
+        snapshot_path = self._snapshot_path(name)
+        tmp_path = snapshot_path.with_suffix(".tmp")
+        df.write_parquet(tmp_path)
+        os.replace(tmp_path, snapshot_path)
+
+    async def _download(
+        self,
+        name: str,
+        url: str,
+        parse: Callable[[aiohttp.ClientResponse], Awaitable[pl.DataFrame]],
+        headers: Dict[str, str],
+        session: aiohttp.ClientSession,
+        meta: Dict[str, Any]
+    ) -> Tuple[pl.DataFrame, Dict[str, Any]]:
+        """
+        Download and parse a master file, or reuse the snapshot on a 304.
+
+        Returns:
+            Tuple[pl.DataFrame, Dict[str, Any]]: The parsed master and its updated metadata.
+        """
+        async with session.get(url, headers=headers, timeout=MASTER_DOWNLOAD_TIMEOUT) as response:
+            if response.status == 304 and meta:
+                self.logger.info(f"{name} master not modified, reusing local snapshot")
+                return await asyncio.to_thread(pl.read_parquet, self._snapshot_path(name)), meta
+
+            response.raise_for_status()
+            df = await parse(response)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            await asyncio.to_thread(self._write_snapshot, name, df)
+            return df, {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+
+    async def load(
+        self,
+        name: str,
+        url: str,
+        parse: Callable[[aiohttp.ClientResponse], Awaitable[pl.DataFrame]],
+        headers: Optional[Dict[str, str]] = None,
+        session: Optional[aiohttp.ClientSession] = None
+    ) -> pl.DataFrame:
+        """
+        Load a parsed master, from disk when possible and from the network otherwise.
+
+        Args:
+            name (str): Snapshot name, unique per broker and file.
+            url (str): URL of the instrument file.
+            parse (Callable[[aiohttp.ClientResponse], Awaitable[pl.DataFrame]]): Coroutine
+                turning a successful response into the parsed master DataFrame.
+            headers (Optional[Dict[str, str]]): Extra request headers (e.g. authorization).
+            session (Optional[aiohttp.ClientSession]): Session to download with. A
+                temporary session is used when omitted.
+
+        Returns:
+            pl.DataFrame: The parsed instrument master.
+
+        Raises:
+            Exception: If the download fails and no snapshot is available.
+        """
+        trading_date = current_trading_date().isoformat()
+        meta = self._read_meta(name)
+        if meta.get("url") != url:
+            meta = {}
+
+        if meta.get("trading_date") == trading_date:
+            self.logger.info(f"Loading {name} master from local snapshot for {trading_date}")
+            return await asyncio.to_thread(pl.read_parquet, self._snapshot_path(name))
+
+        request_headers = dict(headers or {})
+        if meta.get("etag"):
+            request_headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            request_headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            if session is None:
+                async with aiohttp.ClientSession() as own_session:
+                    df, meta = await self._download(name, url, parse, request_headers, own_session, meta)
+            else:
+                df, meta = await self._download(name, url, parse, request_headers, session, meta)
+            meta["trading_date"] = trading_date
+            meta["fetched_at"] = datetime.now(EXCHANGE_TIMEZONE).isoformat()
+            self._write_meta(name, meta)
+            return df
+        except Exception as e:
+            if not meta:
+                raise
+            self.logger.warning(
+                f"Failed to refresh {name} master ({e}); "
+                f"falling back to snapshot from {meta.get('trading_date')}"
+            )
+            return await asyncio.to_thread(pl.read_parquet, self._snapshot_path(name))
@@ -0,0 +1,113 @@
+"""
+Micro-batching module.
+
+This module contains the MicroBatcher class that merges small concurrent quote
+lookups into a single upstream call.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+
+class MicroBatcher:
+    """
+    Collects instrument keys from concurrent callers into one upstream call.
+
+    The first caller opens a batch and starts a short timer. Callers arriving
+    before it fires add their keys to the same batch. The batch is sent when the
+    timer fires or as soon as it reaches `max_size` keys; its result is then
+    scattered back so each caller receives only its own keys.
+
+    Attributes:
+        window (float): Seconds a batch stays open for more callers.
+        max_size (int): Maximum number of distinct keys per batch.
+    """
+
+    def __init__(self, window: float, max_size: int):
+        """
+        Initialize the batcher.
+
+        Args:
+            window (float): Seconds a batch stays open for more callers.
+            max_size (int): Maximum number of distinct keys per batch.
+        """
+        self.window = window
+        self.max_size = max_size
+        self._keys: Dict[str, None] = {}
+        self._waiters: List[Tuple[List[str], asyncio.Future]] = []
+        self._fetch: Optional[Callable[[List[str]], Awaitable[Dict[str, Any]]]] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushing: Set[asyncio.Task] = set()
+
+    async def submit(
+        self,
+        keys: List[str],
+        fetch: Callable[[List[str]], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Add keys to the open batch and wait for their results.
+
+        Args:
+            keys (List[str]): Instrument keys to look up.
+            fetch (Callable[[List[str]], Awaitable[Dict[str, Any]]]): Coroutine
+                function fetching a batch of keys and returning results keyed by
+                instrument key. All callers of a batcher must pass equivalent
+                fetch functions; the batch uses the one from its first caller.
+
+        Returns:
+            Dict[str, Any]: Results for the caller's keys that were found.
+        """
+        new_keys = [key for key in dict.fromkeys(keys) if key not in self._keys]
+        if self._keys and len(self._keys) + len(new_keys) > self.max_size:
+            self._flush()
+            new_keys = list(dict.fromkeys(keys))
+
+        future = asyncio.get_running_loop().create_future()
+        if self._fetch is None:
+            self._fetch = fetch
+        self._keys.update(dict.fromkeys(new_keys))
+        self._waiters.append((keys, future))
+
+        if len(self._keys) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """
+        Close the open batch and send it.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._waiters:
+            return
+        keys, waiters, fetch = list(self._keys), self._waiters, self._fetch
+        self._keys, self._waiters, self._fetch = {}, [], None
+
+        task = asyncio.ensure_future(self._send(keys, waiters, fetch))
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    @staticmethod
+    async def _send(
+        keys: List[str],
+        waiters: List[Tuple[List[str], asyncio.Future]],
+        fetch: Callable[[List[str]], Awaitable[Dict[str, Any]]]
+    ) -> None:
+        """
+        Fetch a batch and scatter its results to the waiting callers.
+        """
+        if all(future.done() for _, future in waiters):
+            return
+        try:
+            result = await fetch(keys)
+        except Exception as e:
+            for _, future in waiters:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for caller_keys, future in waiters:
+            if not future.done():
+                future.set_result({key: result[key] for key in caller_keys if key in result})
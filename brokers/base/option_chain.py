@@ -0,0 +1,126 @@
+"""
+Option chain module.
+
+This module contains the OptionChainIndex class, a nested
+underlying -> expiry -> strike -> {CE, PE} structure built once per master load.
+"""
+
+import polars as pl
+from typing import Any, Dict, List, Optional
+
+
+class OptionChainIndex:
+    """
+    Precomputed option chains for every underlying in a broker's master.
+
+    Chains are stored as {underlying: {expiry: [strike_row, ...]}} with expiries
+    in ascending order and strike rows sorted by strike. Each strike row is
+    {"strike": float, "CE": leg, "PE": leg}, where a leg holds the contract's
+    exchange_token, tradingsymbol and lot_size plus the 'exchange' and
+    'instrument_type' values the broker's quote methods expect, so a chain can
+    be passed straight to them as request data.
+    """
+
+    OPTION_TYPES = ("CE", "PE")
+
+    def __init__(
+        self,
+        master_df: pl.DataFrame,
+        option_type_column: str,
+        request_exchange: pl.Expr,
+        request_instrument_type: pl.Expr
+    ):
+        """
+        Build the chains from a master DataFrame.
+
+        Args:
+            master_df (pl.DataFrame): The broker's master data.
+            option_type_column (str): Column holding 'CE'/'PE' for option contracts.
+            request_exchange (pl.Expr): Expression giving a contract's 'exchange'
+                in the broker's quote request format.
+            request_instrument_type (pl.Expr): Expression giving a contract's
+                'instrument_type' in the broker's quote request format.
+        """
+        options = master_df.filter(
+            pl.col(option_type_column).is_in(self.OPTION_TYPES)
+        ).select(
+            pl.col("name").alias("underlying"),
+            pl.col("expiry"),
+            pl.col("strike").cast(pl.Float64),
+            pl.col(option_type_column).alias("option_type"),
+            pl.col("exchange_token"),
+            pl.col("tradingsymbol"),
+            pl.col("lot_size"),
+            request_exchange.alias("exchange"),
+            request_instrument_type.alias("instrument_type"),
+        ).sort(["underlying", "expiry", "strike"])
+
+        self._chains: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        for row in options.iter_rows(named=True):
+            expiries = self._chains.setdefault(row.pop("underlying"), {})
+            strikes = expiries.setdefault(row.pop("expiry"), [])
+            strike = row.pop("strike")
+            option_type = row.pop("option_type")
+            if not strikes or strikes[-1]["strike"] != strike:
+                strikes.append({"strike": strike, "CE": None, "PE": None})
+            strikes[-1][option_type] = row
+
+    def underlyings(self) -> List[str]:
+        """
+        Get every underlying with listed options.
+
+        Returns:
+            List[str]: Underlying names in ascending order.
+        """
+        return list(self._chains)
+
+    def expiries(self, underlying: str) -> List[str]:
+        """
+        Get the listed expiries of an underlying.
+
+        Args:
+            underlying (str): Underlying name (e.g., 'NIFTY').
+
+        Returns:
+            List[str]: Expiry dates in ascending order, empty if the underlying is unknown.
+        """
+        return list(self._chains.get(underlying, {}))
+
+    def chain(self, underlying: str, expiry: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get the option chain of an underlying.
+
+        Args:
+            underlying (str): Underlying name (e.g., 'NIFTY').
+            expiry (Optional[str]): Expiry date in 'YYYY-MM-DD' format. Defaults to all expiries.
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Strike rows keyed by expiry.
+        """
+        expiries = self._chains.get(underlying, {})
+        if expiry is None:
+            return expiries
+        return {expiry: expiries[expiry]} if expiry in expiries else {}
+
+    @classmethod
+    def quote_requests(cls, chain: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Flatten a chain into quote request data for every listed contract.
+
+        Args:
+            chain (Dict[str, List[Dict[str, Any]]]): Chain as returned by `chain`.
+
+        Returns:
+            List[Dict[str, Any]]: One request entry per contract.
+        """
+        return [
+            {
+                "exchange_token": str(leg["exchange_token"]),
+                "exchange": leg["exchange"],
+                "instrument_type": leg["instrument_type"],
+            }
+            for strikes in chain.values()
+            for strike_row in strikes
+            for leg in (strike_row[option_type] for option_type in cls.OPTION_TYPES)
+            if leg is not None
+        ]
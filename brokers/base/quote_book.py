@@ -0,0 +1,106 @@
+"""
+Quote book module.
+
+This module contains the QuoteBook class that holds the latest streamed quote
+of every instrument subscribed on a broker's market data feed.
+"""
+
+import time
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+
+class QuoteBook:
+    """
+    In-memory book of live quotes, maintained by a streaming market data feed.
+
+    Each entry holds the latest quote of an instrument in the broker's REST
+    quote format, the feed mode it came from (e.g. 'ltpc' or 'full') and when
+    it was last updated. An entry is only present while the feed connection
+    streaming the instrument is up: a feed drops its instruments from the book
+    when it disconnects, and refills them from the snapshot it receives on
+    (re)subscription. Several feed connections can share one book.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty book.
+        """
+        self._quotes: Dict[str, Tuple[float, str, Dict[str, Any]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._quotes)
+
+    def update(self, instrument_key: str, quote: Dict[str, Any], mode: str) -> None:
+        """
+        Store the latest quote of an instrument.
+
+        Args:
+            instrument_key (str): Broker instrument key.
+            quote (Dict[str, Any]): The quote, in the broker's REST quote format.
+            mode (str): Feed mode the quote came from.
+        """
+        self._quotes[instrument_key] = (time.time(), mode, quote)
+
+    def discard(self, instrument_keys: Collection[str]) -> None:
+        """
+        Drop instruments that are no longer streamed.
+
+        Args:
+            instrument_keys (Collection[str]): Broker instrument keys.
+        """
+        for instrument_key in instrument_keys:
+            self._quotes.pop(instrument_key, None)
+
+    def clear(self) -> None:
+        """
+        Drop every quote.
+        """
+        self._quotes.clear()
+
+    def get(self, instrument_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest quote of an instrument.
+
+        Args:
+            instrument_key (str): Broker instrument key.
+
+        Returns:
+            Optional[Dict[str, Any]]: The quote, or None.
+        """
+        entry = self._quotes.get(instrument_key)
+        return entry[2] if entry is not None else None
+
+    def get_many(
+        self,
+        instrument_keys: List[str],
+        modes: Collection[str],
+        max_age: Optional[float] = None
+    ) -> Tuple[Dict[str, Tuple[Dict[str, Any], float]], List[str]]:
+        """
+        Look up the live quotes of several instruments.
+
+        Args:
+            instrument_keys (List[str]): Broker instrument keys.
+            modes (Collection[str]): Feed modes whose quotes carry the fields needed.
+            max_age (Optional[float]): Maximum seconds since the last update.
+                Defaults to no limit: a subscribed instrument's quote stays
+                current until it changes.
+
+        Returns:
+            Tuple[Dict[str, Tuple[Dict[str, Any], float]], List[str]]: (quote, age)
+                for every instrument the book can answer, and the instrument
+                keys it cannot.
+        """
+        if not self._quotes:
+            return {}, list(instrument_keys)
+
+        now = time.time()
+        hits = {}
+        missing = []
+        for instrument_key in instrument_keys:
+            entry = self._quotes.get(instrument_key)
+            if entry is not None and entry[1] in modes and (max_age is None or now - entry[0] <= max_age):
+                hits[instrument_key] = (entry[2], now - entry[0])
+            else:
+                missing.append(instrument_key)
+        return hits, missing
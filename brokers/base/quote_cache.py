@@ -0,0 +1,87 @@
+"""
+Quote cache module.
+
+This module contains the QuoteCache class, a size-bounded per-instrument cache
+of recently fetched quotes.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Tuple
+
+
+class QuoteCache:
+    """
+    Least-recently-used cache of raw quotes, one entry per instrument.
+
+    Entries are keyed by (request_key, instrument_key), so quotes of different
+    types (LTP, OHLC per interval, full quotes) are cached separately. Each entry
+    remembers when it was fetched; readers decide how old a quote they accept.
+    Once the cache holds `max_entries` entries, the least recently used are evicted.
+
+    Attributes:
+        max_entries (int): Maximum number of cached quotes.
+    """
+
+    def __init__(self, max_entries: int):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries (int): Maximum number of cached quotes.
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[Hashable, str], Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_many(
+        self,
+        request_key: Hashable,
+        instrument_keys: List[str],
+        max_age: float
+    ) -> Tuple[Dict[str, Tuple[Any, float]], List[str]]:
+        """
+        Look up the quotes of several instruments.
+
+        Args:
+            request_key (Hashable): Identity of the quote type.
+            instrument_keys (List[str]): Instrument keys to look up.
+            max_age (float): Maximum accepted age in seconds.
+
+        Returns:
+            Tuple[Dict[str, Tuple[Any, float]], List[str]]: (quote, age in seconds)
+                for every instrument with a fresh enough entry, and the
+                instrument keys that have to be fetched.
+        """
+        now = time.time()
+        entries = self._entries
+        hits = {}
+        missing = []
+        for instrument_key in instrument_keys:
+            key = (request_key, instrument_key)
+            entry = entries.get(key)
+            if entry is not None and now - entry[0] <= max_age:
+                entries.move_to_end(key)
+                hits[instrument_key] = (entry[1], now - entry[0])
+            else:
+                missing.append(instrument_key)
+        return hits, missing
+
+    def put_many(self, request_key: Hashable, quotes: Dict[str, Any]) -> None:
+        """
+        Store freshly fetched quotes.
+
+        Args:
+            request_key (Hashable): Identity of the quote type.
+            quotes (Dict[str, Any]): Quotes keyed by instrument key.
+        """
+        now = time.time()
+        entries = self._entries
+        for instrument_key, quote in quotes.items():
+            key = (request_key, instrument_key)
+            entries[key] = (now, quote)
+            entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
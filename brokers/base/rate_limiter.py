@@ -0,0 +1,258 @@
+"""
+Rate limiter module.
+
+This module contains token-bucket rate limiters used to pace upstream broker
+calls against the broker's published request limits, and the process-wide
+RateGovernor every call for a broker account queues through.
+"""
+
+import time
+import asyncio
+from collections import deque
+from typing import Deque, Dict, Hashable, List, Optional, Sequence, Tuple
+
+
+class TokenBucket:
+    """
+    Asynchronous token bucket.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. Waiters
+    are served strictly in arrival order.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        capacity (float): Maximum number of stored tokens (the burst size).
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float): Maximum number of stored tokens.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, tokens: float = 1) -> None:
+        """
+        Wait until `tokens` tokens are available and take them.
+
+        Args:
+            tokens (float): Number of tokens to take.
+        """
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
+
+    def release(self, tokens: float = 1) -> None:
+        """
+        Return unused tokens to the bucket.
+
+        Args:
+            tokens (float): Number of tokens to return.
+        """
+        self._tokens = min(self.capacity, self._tokens + tokens)
+
+
+class RateLimiter:
+    """
+    Rate limiter enforcing several request windows at once.
+
+    Brokers publish limits such as "50 per second, 500 per minute". Each
+    (limit, period) window is modelled as a token bucket holding `limit` tokens
+    and refilling at `limit / period` per second; a call proceeds once every
+    bucket has granted it a token.
+
+    Waiting calls are admitted round-robin across callers rather than in plain
+    arrival order, so one request fanning out into many chunks cannot starve
+    requests queued after it.
+
+    Attributes:
+        limits (List[Tuple[int, float]]): The (limit, period in seconds) windows.
+    """
+
+    def __init__(self, limits: Sequence[Tuple[int, float]]):
+        """
+        Initialize the limiter.
+
+        Args:
+            limits (Sequence[Tuple[int, float]]): (limit, period in seconds) windows.
+        """
+        self.limits: List[Tuple[int, float]] = [(int(limit), float(period)) for limit, period in limits]
+        self._buckets = [TokenBucket(rate=limit / period, capacity=limit) for limit, period in self.limits]
+        # caller -> waiting futures; dict order is the round-robin order.
+        self._waiters: Dict[Hashable, Deque[asyncio.Future]] = {}
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of calls waiting to be admitted.
+        """
+        return sum(len(queue) for queue in self._waiters.values())
+
+    async def acquire(self, caller: Hashable = None) -> None:
+        """
+        Wait until a call is allowed by every window.
+
+        Args:
+            caller (Hashable): Identity of the request the call belongs to. Calls
+                from different callers are admitted in turn.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._waiters.setdefault(caller, deque()).append(future)
+        if self._dispatcher is None or self._dispatcher.done() or self._dispatcher.get_loop() is not loop:
+            self._dispatcher = loop.create_task(self._dispatch())
+        try:
+            await future
+        except asyncio.CancelledError:
+            queue = self._waiters.get(caller)
+            if queue is not None and future in queue:
+                queue.remove(future)
+                if not queue:
+                    del self._waiters[caller]
+            raise
+
+    def _pop_waiter(self) -> Optional[asyncio.Future]:
+        """
+        Pop the next live waiter, moving its caller to the back of the rotation.
+        """
+        while self._waiters:
+            caller = next(iter(self._waiters))
+            queue = self._waiters.pop(caller)
+            future = queue.popleft()
+            if queue:
+                self._waiters[caller] = queue
+            if not future.done():
+                return future
+        return None
+
+    async def _dispatch(self) -> None:
+        """
+        Admit waiters one at a time as the buckets grant tokens.
+        """
+        while self._waiters:
+            for bucket in self._buckets:
+                await bucket.acquire()
+            future = self._pop_waiter()
+            if future is None:
+                for bucket in self._buckets:
+                    bucket.release()
+                break
+            future.set_result(None)
+
+
+class RateGovernor:
+    """
+    Process-wide pacing of upstream calls for one broker account.
+
+    Broker limits apply per account, not per broker instance or per API
+    request, so every instance of an account (including ones swapped in by a
+    refresh) shares a single governor. It holds one RateLimiter per endpoint;
+    bursts beyond the limits queue instead of being rejected upstream.
+
+    Attributes:
+        rate_limits (Dict[str, List[Tuple[int, float]]]): (limit, period) windows
+            per endpoint, with a 'default' entry for unlisted endpoints.
+    """
+
+    _registry: Dict[Tuple[str, str], "RateGovernor"] = {}
+
+    def __init__(self, rate_limits: Dict[str, Sequence[Tuple[int, float]]]):
+        """
+        Initialize the governor.
+
+        Args:
+            rate_limits (Dict[str, Sequence[Tuple[int, float]]]): (limit, period)
+                windows per endpoint, with a 'default' entry.
+        """
+        self.rate_limits = dict(rate_limits)
+        self._limiters: Dict[str, RateLimiter] = {}
+
+    @classmethod
+    def for_account(
+        cls,
+        broker_name: str,
+        account_name: str,
+        rate_limits: Dict[str, Sequence[Tuple[int, float]]]
+    ) -> "RateGovernor":
+        """
+        Get the governor of a broker account, creating it on first use.
+
+        The account keeps one governor; when it is requested with different
+        limits (e.g. after a config reload), the governor switches to them.
+
+        Args:
+            broker_name (str): The broker's name (e.g., 'Upstox').
+            account_name (str): The account name.
+            rate_limits (Dict[str, Sequence[Tuple[int, float]]]): The account's limits.
+
+        Returns:
+            RateGovernor: The account's governor.
+        """
+        key = (broker_name.lower(), account_name)
+        governor = cls._registry.get(key)
+        if governor is None:
+            governor = cls(rate_limits)
+            cls._registry[key] = governor
+        else:
+            governor.update(rate_limits)
+        return governor
+
+    def update(self, rate_limits: Dict[str, Sequence[Tuple[int, float]]]) -> None:
+        """
+        Switch to new limits. Limiters of endpoints whose windows changed are
+        replaced; calls already queued on them are still admitted by them.
+
+        Args:
+            rate_limits (Dict[str, Sequence[Tuple[int, float]]]): (limit, period)
+                windows per endpoint, with a 'default' entry.
+        """
+        rate_limits = dict(rate_limits)
+        if rate_limits == self.rate_limits:
+            return
+        self.rate_limits = rate_limits
+        for endpoint, limiter in list(self._limiters.items()):
+            windows = self.rate_limits.get(endpoint, self.rate_limits["default"])
+            if [(int(limit), float(period)) for limit, period in windows] != limiter.limits:
+                del self._limiters[endpoint]
+
+    def limiter(self, endpoint: str) -> RateLimiter:
+        """
+        Get the rate limiter of an endpoint.
+
+        Args:
+            endpoint (str): Endpoint name (e.g., 'ltp').
+
+        Returns:
+            RateLimiter: The endpoint's limiter.
+        """
+        limiter = self._limiters.get(endpoint)
+        if limiter is None:
+            limiter = RateLimiter(self.rate_limits.get(endpoint, self.rate_limits["default"]))
+            self._limiters[endpoint] = limiter
+        return limiter
+
+    async def acquire(self, endpoint: str, caller: Hashable = None) -> None:
+        """
+        Wait for a turn to call an endpoint.
+
+        Args:
+            endpoint (str): Endpoint name (e.g., 'ltp').
+            caller (Hashable): Identity of the request the call belongs to.
+        """
+        await self.limiter(endpoint).acquire(caller)
@@ -0,0 +1,172 @@
+"""
+Retry module.
+
+This module contains the RetryPolicy shared by broker calls and the
+RetryableError raised for transient upstream failures.
+"""
+
+import random
+import asyncio
+import aiohttp
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Optional
+
+
+# HTTP statuses worth retrying: rate limiting and transient server errors.
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class RetryableError(Exception):
+    """
+    A transient upstream failure that may succeed if retried.
+
+    Attributes:
+        retry_after (Optional[float]): Seconds the upstream asked us to wait, if any.
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header value.
+
+    Args:
+        value (Optional[str]): Header value, either delay-seconds or an HTTP date.
+
+    Returns:
+        Optional[float]: Seconds to wait, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, bounded by a per-request deadline.
+
+    The n-th retry waits a random time between zero and
+    min(max_delay, base_delay * 2 ** n), or at least the upstream's Retry-After
+    when one was given. A retry is only attempted if it can start before the
+    deadline.
+
+    Attributes:
+        max_attempts (int): Maximum number of attempts, including the first.
+        base_delay (float): Backoff base in seconds.
+        max_delay (float): Upper bound of a single backoff in seconds.
+        deadline (float): Seconds after the start of a request past which no
+            retry is started.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.25,
+        max_delay: float = 8.0,
+        deadline: float = 20.0
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            max_attempts (int): Maximum number of attempts, including the first.
+            base_delay (float): Backoff base in seconds.
+            max_delay (float): Upper bound of a single backoff in seconds.
+            deadline (float): Per-request deadline in seconds.
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def backoff(self, retry: int, retry_after: Optional[float] = None) -> float:
+        """
+        Get the wait before a retry.
+
+        Args:
+            retry (int): Zero-based retry number.
+            retry_after (Optional[float]): Upstream Retry-After in seconds.
+
+        Returns:
+            float: Seconds to wait.
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    @staticmethod
+    def is_retryable(error: BaseException) -> bool:
+        """
+        Check whether an error is a transient failure.
+
+        Args:
+            error (BaseException): The raised error.
+
+        Returns:
+            bool: True for RetryableError, connection errors and timeouts.
+        """
+        return isinstance(error, (RetryableError, aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+    def request_deadline(self) -> float:
+        """
+        Get the deadline of a request starting now, in event loop time.
+
+        Returns:
+            float: The deadline, comparable with the running loop's time().
+        """
+        return asyncio.get_running_loop().time() + self.deadline
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        deadline: Optional[float] = None,
+        on_retry: Optional[Callable[[int, BaseException, float], None]] = None
+    ) -> Any:
+        """
+        Call a coroutine function, retrying transient failures.
+
+        Args:
+            fn (Callable[[], Awaitable[Any]]): The call to make; invoked once per attempt.
+            deadline (Optional[float]): Event loop time past which no retry is
+                started. Defaults to `deadline` seconds from now.
+            on_retry (Optional[Callable[[int, BaseException, float], None]]): Called
+                with the retry number, the error and the wait before each retry.
+
+        Returns:
+            Any: The result of the first successful attempt.
+
+        Raises:
+            Exception: The last error, if it is not transient or retries are exhausted.
+        """
+        loop = asyncio.get_running_loop()
+        if deadline is None:
+            deadline = loop.time() + self.deadline
+        retry = 0
+        while True:
+            try:
+                return await fn()
+            except Exception as e:
+                if not self.is_retryable(e) or retry + 1 >= self.max_attempts:
+                    raise
+                delay = self.backoff(retry, getattr(e, "retry_after", None))
+                if loop.time() + delay > deadline:
+                    raise
+                if on_retry is not None:
+                    on_retry(retry + 1, e, delay)
+                await asyncio.sleep(delay)
+                retry += 1
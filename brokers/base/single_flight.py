@@ -0,0 +1,74 @@
+"""
+Single-flight module.
+
+This module contains the SingleFlight class that coalesces concurrent identical
+upstream calls into one.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    """
+    An upstream call in flight and the number of callers waiting on it.
+    """
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    In-flight deduplication of identical calls.
+
+    While a call for a key is running, further calls for the same key wait on
+    it and receive its result (or error) instead of starting their own. The key
+    is forgotten as soon as the call finishes, so nothing is cached. The call is
+    cancelled only once every caller waiting on it has been cancelled.
+
+    Attributes:
+        coalesced (int): Number of calls served by another caller's call.
+    """
+
+    def __init__(self):
+        """
+        Initialize with no calls in flight.
+        """
+        self._calls: Dict[Hashable, _Call] = {}
+        self.coalesced = 0
+
+    def _forget(self, key: Hashable, call: _Call, task: asyncio.Task) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the error as retrieved even if every waiter was cancelled.
+            task.exception()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run `fn` for `key`, or join the call already in flight for it.
+
+        Args:
+            key (Hashable): Identity of the call; equal keys must mean equal results.
+            fn (Callable[[], Awaitable[Any]]): Coroutine function making the call.
+
+        Returns:
+            Any: The call's result.
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._forget(key, call, task))
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
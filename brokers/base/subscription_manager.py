@@ -0,0 +1,299 @@
+"""
+Subscription manager module.
+
+This module contains the SubscriptionManager class that decides which
+instruments a broker streams, and on which market data feed connection.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Set
+
+from .market_feed import MarketFeed
+
+
+class SubscriptionManager:
+    """
+    Reference-counted instrument subscriptions, sharded over feed connections.
+
+    Consumers (API requests, streams, background jobs) acquire the instruments
+    they need and release them when done. An instrument is subscribed while at
+    least one consumer holds it, and unsubscribed once nobody has held it for
+    `grace_period` seconds, so consumers that come and go do not churn the feed.
+
+    Subscription changes are collected for `batch_window` seconds and sent as
+    one subscribe and one unsubscribe request per connection. Instruments are
+    placed on the first connection with room, up to `max_instruments` each;
+    new connections are opened up to `max_connections`, and connections left
+    without instruments are closed. Instruments that do not fit are kept
+    waiting and placed when room frees up; until then they are served by the
+    REST API.
+
+    Attributes:
+        feeds (List[MarketFeed]): Open feed connections.
+        max_instruments (int): Instruments per connection.
+        max_connections (int): Maximum number of connections.
+        batch_window (float): Seconds subscription changes are collected for.
+        grace_period (float): Seconds an unused instrument stays subscribed.
+    """
+
+    def __init__(
+        self,
+        feed_factory: Callable[[], MarketFeed],
+        max_instruments: int,
+        max_connections: int,
+        logger: logging.Logger,
+        batch_window: float = 0.05,
+        grace_period: float = 30.0
+    ):
+        """
+        Initialize the manager. No connection is opened until an instrument is acquired.
+
+        Args:
+            feed_factory (Callable[[], MarketFeed]): Creates an unstarted feed connection.
+            max_instruments (int): Instruments per connection.
+            max_connections (int): Maximum number of connections.
+            logger (logging.Logger): Logger instance.
+            batch_window (float): Seconds subscription changes are collected for.
+            grace_period (float): Seconds an unused instrument stays subscribed.
+        """
+        self.feed_factory = feed_factory
+        self.max_instruments = max_instruments
+        self.max_connections = max_connections
+        self.logger = logger
+        self.batch_window = batch_window
+        self.grace_period = grace_period
+        self.feeds: List[MarketFeed] = []
+        self._refcounts: Dict[str, int] = {}
+        self._shards: Dict[str, MarketFeed] = {}
+        self._idle: Dict[str, asyncio.TimerHandle] = {}
+        self._pending_subscribe: Dict[str, None] = {}
+        self._pending_unsubscribe: Set[str] = set()
+        self._waiting: Dict[str, None] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushed: Optional[asyncio.Future] = None
+        self._lock = asyncio.Lock()
+        self._flushing: Set[asyncio.Task] = set()
+
+    @property
+    def subscribed(self) -> Set[str]:
+        """
+        Instruments currently placed on a connection.
+        """
+        return set(self._shards)
+
+    def refcount(self, instrument_key: str) -> int:
+        """
+        Get the number of consumers holding an instrument.
+        """
+        return self._refcounts.get(instrument_key, 0)
+
+    async def acquire(self, instrument_keys: Iterable[str]) -> None:
+        """
+        Hold instruments, subscribing those nobody held yet.
+
+        Returns once the resulting subscription requests have been sent (or
+        queued until the connection is up).
+
+        Args:
+            instrument_keys (Iterable[str]): Broker instrument keys.
+        """
+        changed = False
+        for instrument_key in instrument_keys:
+            count = self._refcounts.get(instrument_key, 0)
+            self._refcounts[instrument_key] = count + 1
+            if count:
+                continue
+            idle = self._idle.pop(instrument_key, None)
+            if idle is not None:
+                idle.cancel()
+            if instrument_key in self._pending_unsubscribe:
+                self._pending_unsubscribe.discard(instrument_key)
+            elif instrument_key not in self._shards:
+                self._pending_subscribe[instrument_key] = None
+                changed = True
+        if changed:
+            await self._schedule_flush()
+
+    async def release(self, instrument_keys: Iterable[str]) -> None:
+        """
+        Release instruments; those nobody holds are unsubscribed after the grace period.
+
+        Args:
+            instrument_keys (Iterable[str]): Broker instrument keys, as acquired.
+        """
+        loop = asyncio.get_running_loop()
+        for instrument_key in instrument_keys:
+            count = self._refcounts.get(instrument_key, 0)
+            if count > 1:
+                self._refcounts[instrument_key] = count - 1
+                continue
+            if not count:
+                continue
+            del self._refcounts[instrument_key]
+            self._pending_subscribe.pop(instrument_key, None)
+            self._waiting.pop(instrument_key, None)
+            if instrument_key in self._shards:
+                self._idle[instrument_key] = loop.call_later(self.grace_period, self._expire, instrument_key)
+
+    @asynccontextmanager
+    async def subscription(self, instrument_keys: Iterable[str]) -> AsyncIterator[None]:
+        """
+        Hold instruments for the duration of a `with` block.
+
+        Args:
+            instrument_keys (Iterable[str]): Broker instrument keys.
+        """
+        instrument_keys = list(instrument_keys)
+        await self.acquire(instrument_keys)
+        try:
+            yield
+        finally:
+            await self.release(instrument_keys)
+
+    async def wait_connected(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait until every open connection is connected and subscribed.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait.
+
+        Raises:
+            asyncio.TimeoutError: If a connection does not connect in time.
+        """
+        await asyncio.wait_for(asyncio.gather(*(feed.wait_connected() for feed in self.feeds)), timeout)
+
+    async def flush(self) -> None:
+        """
+        Send the pending subscription changes now.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        flushed, self._flushed = self._flushed, None
+        try:
+            await self._apply()
+        except Exception as e:
+            if flushed is not None and not flushed.done():
+                flushed.set_exception(e)
+                flushed.exception()
+            raise
+        if flushed is not None and not flushed.done():
+            flushed.set_result(None)
+
+    async def close(self) -> None:
+        """
+        Drop all subscriptions and close every connection.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._flushed is not None and not self._flushed.done():
+            self._flushed.set_result(None)
+        self._flushed = None
+        for handle in self._idle.values():
+            handle.cancel()
+        self._idle.clear()
+        self._refcounts.clear()
+        self._pending_subscribe.clear()
+        self._pending_unsubscribe.clear()
+        self._waiting.clear()
+        self._shards.clear()
+        feeds, self.feeds = self.feeds, []
+        for feed in feeds:
+            await feed.close()
+
+    def _expire(self, instrument_key: str) -> None:
+        """
+        Queue an instrument whose grace period ended for unsubscription.
+        """
+        self._idle.pop(instrument_key, None)
+        if instrument_key in self._shards and instrument_key not in self._refcounts:
+            self._pending_unsubscribe.add(instrument_key)
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> asyncio.Future:
+        """
+        Make sure a flush is scheduled within the batch window.
+
+        Returns:
+            asyncio.Future: Resolved once the scheduled flush has been applied.
+        """
+        if self._flushed is None:
+            self._flushed = asyncio.get_running_loop().create_future()
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.batch_window, self._start_flush)
+        return self._flushed
+
+    def _start_flush(self) -> None:
+        self._timer = None
+        task = asyncio.ensure_future(self.flush())
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+        task.add_done_callback(self._log_flush_error)
+
+    def _log_flush_error(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.error(f"Applying feed subscription changes failed: {task.exception()}")
+
+    async def _apply(self) -> None:
+        """
+        Apply pending changes: unsubscribe first to free room, then place new
+        and waiting instruments and subscribe them per connection.
+        """
+        async with self._lock:
+            unsubscribe = [key for key in self._pending_unsubscribe if key not in self._refcounts]
+            self._pending_unsubscribe.clear()
+            by_feed: Dict[MarketFeed, List[str]] = {}
+            for instrument_key in unsubscribe:
+                feed = self._shards.pop(instrument_key, None)
+                if feed is not None:
+                    by_feed.setdefault(feed, []).append(instrument_key)
+            for feed, keys in by_feed.items():
+                await feed.unsubscribe(keys)
+                if not feed.subscriptions:
+                    self.feeds.remove(feed)
+                    await feed.close()
+
+            candidates = list(self._waiting) + list(self._pending_subscribe)
+            self._waiting.clear()
+            self._pending_subscribe.clear()
+            load = {feed: len(feed.subscriptions) for feed in self.feeds}
+            placements: Dict[MarketFeed, List[str]] = {}
+            for instrument_key in dict.fromkeys(candidates):
+                if instrument_key not in self._refcounts or instrument_key in self._shards:
+                    continue
+                feed = self._place(load)
+                if feed is None:
+                    self._waiting[instrument_key] = None
+                    continue
+                self._shards[instrument_key] = feed
+                load[feed] += 1
+                placements.setdefault(feed, []).append(instrument_key)
+            for feed, keys in placements.items():
+                await feed.subscribe(keys)
+            if self._waiting:
+                self.logger.warning(
+                    f"Feed subscription limit reached ({self.max_connections} connections x "
+                    f"{self.max_instruments} instruments); {len(self._waiting)} instruments wait for room"
+                )
+
+    def _place(self, load: Dict[MarketFeed, int]) -> Optional[MarketFeed]:
+        """
+        Pick the connection for one more instrument, opening one if needed.
+
+        Args:
+            load (Dict[MarketFeed, int]): Instruments placed per connection; a
+                new connection is added to it.
+        """
+        for feed in self.feeds:
+            if load.get(feed, 0) < self.max_instruments:
+                return feed
+        if len(self.feeds) >= self.max_connections:
+            return None
+        feed = self.feed_factory()
+        feed.start()
+        self.feeds.append(feed)
+        load[feed] = 0
+        return feed
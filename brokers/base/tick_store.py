@@ -0,0 +1,255 @@
+"""
+Tick store module.
+
+This module contains the TickStore class that keeps a bounded, array-backed
+history of recent ticks for the instruments a broker is tracking.
+"""
+
+import time
+import numpy as np
+from typing import Any, Dict, Iterable, List, Optional
+
+from .candle_builder import CandleBuilder
+
+
+# Columns recorded per tick, all float64: receive time in epoch seconds, last
+# traded price, cumulative day volume and open interest (NaN when the quote
+# source does not carry the field).
+TICK_COLUMNS = ("timestamp", "last_price", "volume", "oi")
+
+
+class TickStore:
+    """
+    Fixed-capacity ring buffers of ticks, one per tracked instrument.
+
+    Every column is a preallocated (slots, capacity) float64 matrix; a tracked
+    instrument owns one row of each, written as a ring. Ticks are written in
+    vectorized batches straight into the matrices, so recording allocates no
+    Python objects per tick, and the memory of a tracked instrument is fixed
+    at capacity x 32 bytes. Rows are allocated when instruments are tracked,
+    growing the matrices by doubling up to `max_instruments`, and are reused
+    once an instrument is no longer tracked.
+
+    A tick is recorded when an instrument's price, volume or open interest
+    differs from its previous tick, so repeated polls of an unchanged quote
+    do not fill the buffer. Recorded ticks are also folded into the current
+    session's candles when a CandleBuilder is attached; it shares the rows.
+
+    Attributes:
+        capacity (int): Ticks kept per instrument.
+        max_instruments (int): Maximum number of instruments tracked at once.
+        candles (Optional[CandleBuilder]): Candles built from the ticks.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 2048,
+        max_instruments: int = 2000,
+        candles: Optional[CandleBuilder] = None
+    ):
+        """
+        Initialize an empty store. Nothing is allocated until an instrument is tracked.
+
+        Args:
+            capacity (int): Ticks kept per instrument.
+            max_instruments (int): Maximum number of instruments tracked at once.
+            candles (Optional[CandleBuilder]): Candles to fold the ticks into.
+        """
+        self.capacity = capacity
+        self.max_instruments = max_instruments
+        self.candles = candles
+        self._columns = {name: np.empty((0, capacity)) for name in TICK_COLUMNS}
+        # Ticks written per slot since it was allocated.
+        self._written = np.zeros(0, dtype=np.int64)
+        self._slots: Dict[str, int] = {}
+        self._refcounts: Dict[str, int] = {}
+        self._free: List[int] = []
+
+    def __contains__(self, instrument_key: str) -> bool:
+        return instrument_key in self._slots
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Bytes allocated for tick storage.
+        """
+        return sum(column.nbytes for column in self._columns.values()) + self._written.nbytes
+
+    def track(self, instrument_keys: Iterable[str], timestamp: Optional[float] = None) -> List[str]:
+        """
+        Start recording ticks for instruments; tracking is reference counted.
+
+        Args:
+            instrument_keys (Iterable[str]): Broker instrument keys.
+            timestamp (Optional[float]): Epoch time tracking starts. Defaults to now.
+
+        Returns:
+            List[str]: Newly tracked instrument keys whose ticks are not recorded
+                because the store is full. They are still reference counted.
+        """
+        rejected = []
+        for instrument_key in instrument_keys:
+            count = self._refcounts.get(instrument_key, 0)
+            self._refcounts[instrument_key] = count + 1
+            if count:
+                continue
+            slot = self._allocate()
+            if slot is None:
+                rejected.append(instrument_key)
+                continue
+            self._slots[instrument_key] = slot
+            if self.candles is not None:
+                self.candles.reset(slot, instrument_key, time.time() if timestamp is None else timestamp)
+        return rejected
+
+    def untrack(self, instrument_keys: Iterable[str]) -> None:
+        """
+        Release instruments tracked with track; their history is dropped once
+        nobody tracks them.
+
+        Args:
+            instrument_keys (Iterable[str]): Broker instrument keys, as tracked.
+        """
+        for instrument_key in instrument_keys:
+            count = self._refcounts.get(instrument_key, 0)
+            if count > 1:
+                self._refcounts[instrument_key] = count - 1
+            elif count:
+                del self._refcounts[instrument_key]
+                slot = self._slots.pop(instrument_key, None)
+                if slot is not None:
+                    self._free.append(slot)
+
+    def record(self, quotes: Dict[str, Dict[str, Any]], timestamp: Optional[float] = None) -> int:
+        """
+        Record the quotes of tracked instruments as ticks; others are ignored.
+
+        Args:
+            quotes (Dict[str, Dict[str, Any]]): Quotes keyed by broker instrument
+                key, with 'last_price' and optionally 'volume' and 'oi' fields.
+            timestamp (Optional[float]): Receive time in epoch seconds. Defaults to now.
+
+        Returns:
+            int: Number of ticks recorded.
+        """
+        if not self._slots:
+            return 0
+        slots, prices, volumes, open_interest = [], [], [], []
+        for instrument_key, quote in quotes.items():
+            slot = self._slots.get(instrument_key)
+            if slot is None:
+                continue
+            slots.append(slot)
+            prices.append(quote.get("last_price"))
+            volumes.append(quote.get("volume"))
+            open_interest.append(quote.get("oi"))
+        if not slots:
+            return 0
+
+        slots = np.asarray(slots)
+        values = {
+            "last_price": np.asarray(prices, dtype=np.float64),
+            "volume": np.asarray(volumes, dtype=np.float64),
+            "oi": np.asarray(open_interest, dtype=np.float64),
+        }
+
+        # Drop ticks that repeat the instrument's previous one.
+        written = self._written[slots]
+        previous = (written - 1) % self.capacity
+        changed = written == 0
+        for name, column in values.items():
+            last = self._columns[name][slots, previous]
+            changed |= ~((column == last) | (np.isnan(column) & np.isnan(last)))
+        if not changed.all():
+            slots = slots[changed]
+            written = written[changed]
+            values = {name: column[changed] for name, column in values.items()}
+
+        if timestamp is None:
+            timestamp = time.time()
+        positions = written % self.capacity
+        self._columns["timestamp"][slots, positions] = timestamp
+        for name, column in values.items():
+            self._columns[name][slots, positions] = column
+        self._written[slots] = written + 1
+        if self.candles is not None:
+            self.candles.fold(slots, timestamp, **values)
+        return len(slots)
+
+    def ticks(
+        self,
+        instrument_key: str,
+        since: Optional[float] = None,
+        limit: Optional[int] = None
+    ) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Get the recorded ticks of an instrument, oldest first.
+
+        Args:
+            instrument_key (str): Broker instrument key.
+            since (Optional[float]): Only ticks received after this epoch time.
+            limit (Optional[int]): Only the latest `limit` ticks.
+
+        Returns:
+            Optional[Dict[str, np.ndarray]]: Copies of the TICK_COLUMNS, or None
+                if the instrument is not tracked.
+        """
+        slot = self._slots.get(instrument_key)
+        if slot is None:
+            return None
+        written = int(self._written[slot])
+        count = min(written, self.capacity)
+        if limit is not None:
+            count = min(count, limit)
+        order = np.arange(written - count, written) % self.capacity
+        columns = {name: self._columns[name][slot, order] for name in TICK_COLUMNS}
+        if since is not None:
+            start = int(np.searchsorted(columns["timestamp"], since, side="right"))
+            if start:
+                columns = {name: column[start:] for name, column in columns.items()}
+        return columns
+
+    def session_candles(self, instrument_key: str, interval: int) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Get the current session's candles of an instrument.
+
+        Args:
+            instrument_key (str): Broker instrument key.
+            interval (int): Interval length in seconds (see candle_builder.candle_interval).
+
+        Returns:
+            Optional[Dict[str, np.ndarray]]: Candle columns, or None if the
+                instrument is not tracked or no complete candles are built for
+                it (see CandleBuilder.session_candles).
+        """
+        slot = self._slots.get(instrument_key)
+        if slot is None or self.candles is None:
+            return None
+        return self.candles.session_candles(slot, interval)
+
+    def _allocate(self) -> Optional[int]:
+        """
+        Get a free row, growing the matrices if needed.
+
+        Returns:
+            Optional[int]: The row, or None if max_instruments rows are in use.
+        """
+        if not self._free:
+            rows = len(self._written)
+            if rows >= self.max_instruments:
+                return None
+            grown = min(max(2 * rows, 16), self.max_instruments)
+            for name, column in self._columns.items():
+                resized = np.empty((grown, self.capacity))
+                resized[:rows] = column
+                self._columns[name] = resized
+            self._written = np.concatenate([self._written, np.zeros(grown - rows, dtype=np.int64)])
+            if self.candles is not None:
+                self.candles.resize(grown)
+            self._free.extend(range(grown - 1, rows - 1, -1))
+        slot = self._free.pop()
+        self._written[slot] = 0
+        return slot
@@ -13,11 +13,16 @@ import aiohttp
 import asyncio
 import polars as pl
 from io import BytesIO
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Any, Optional
 
 from ..base.broker import BaseBroker
+from ..base.instrument_index import InstrumentIndex
+from ..base.instrument_search import InstrumentSearchIndex
+from ..base.master_cache import EXCHANGE_TIMEZONE
+from ..base.option_chain import OptionChainIndex
 from .token_rotator import UpstoxTokenRotator
+from .market_feed import UpstoxMarketFeed
 
 
 class UpstoxBroker(BaseBroker):
@@ -30,12 +35,33 @@ class UpstoxBroker(BaseBroker):
         broker_name (str): The name of the broker ('Upstox').
         logger (logging.Logger): Logger instance for the broker.
         access_token (str): The current Upstox API access token.
-        master_data (Dict): The Upstox master data containing instrument information.
-        master_df (pl.DataFrame): DataFrame representation of the master data.
+        master_df (pl.DataFrame): The Upstox master data containing instrument information.
+        instrument_key_index (InstrumentIndex): (exchange_token, exchange) to
+            instrument_key index built from the master data.
+        instrument_key_reverse_index (InstrumentIndex): instrument_key to
+            (exchange_token, tradingsymbol, segment, instrument_type) index.
+        search_index (InstrumentSearchIndex): Prefix index over tradingsymbols and names.
+        option_chain_index (OptionChainIndex): Option chains by underlying, expiry and strike.
     """
     
     BASE_URL = "https://api.upstox.com/v2"
+    BASE_URL_V3 = "https://api.upstox.com/v3"
     BASE_ORDER_URL = "https://api-hft.upstox.com/v2"
+    MARKET_FEED = UpstoxMarketFeed
+
+    # Standard API limits, applied per API and user.
+    RATE_LIMITS = {
+        "default": [(50, 1), (500, 60), (2000, 1800)],
+    }
+
+    # Longest date range of one historical candle request per interval.
+    HISTORY_WINDOW_DAYS = {
+        "1minute": 30,
+        "30minute": 90,
+        "day": 3650,
+        "week": None,
+        "month": None,
+    }
     
     def _get_broker_name(self) -> str:
         """
@@ -51,7 +77,8 @@ class UpstoxBroker(BaseBroker):
         Initialize the Upstox broker with necessary configurations and data.
         
         This method fetches the access token, retrieves the master data,
-        and prepares the broker for use.
+        and prepares the broker for use. When the 'market_data_feed' config key
+        is set, the market data feed is started for its instruments.
         
         Raises:
             Exception: If initialization fails.
@@ -59,60 +86,112 @@ class UpstoxBroker(BaseBroker):
         try:
             self.logger.info(f'Initializing UpstoxBroker')
             self.access_token = await self.fetch_access_token()
-            self.master_data = await self._get_upstox_master_data()
-            self.master_df = pl.DataFrame(data=self.master_data)
+            self.master_df = await self._get_upstox_master_data()
             if self.master_df is None:
                 raise Exception("Instrument data could not be loaded.")
+            self._build_master_indexes()
+            self._master_loaded()
+            await self._start_configured_market_feed()
         except Exception as e:
             self.logger.error(f"Initialization failed: {e}")
             raise
 
-    async def _get_upstox_master_data(self):
-        return await super()._get_upstox_master_data()
+    def _build_master_indexes(self) -> None:
+        """
+        Build the lookup structures derived from the master data.
+
+        Called once per master load, so request-time lookups never scan master_df.
+        """
+        self.instrument_key_index = InstrumentIndex(
+            self.master_df,
+            key_columns=("exchange_token", "exchange"),
+            value_columns="instrument_key"
+        )
+        # The request-side instrument type is the segment suffix, e.g. 'EQ' in 'NSE_EQ'.
+        self.instrument_key_reverse_index = InstrumentIndex(
+            self.master_df.with_columns(
+                pl.col("exchange").str.split("_").list.get(1, null_on_oob=True).alias("segment_type")
+            ),
+            key_columns="instrument_key",
+            value_columns=("exchange_token", "tradingsymbol", "exchange", "segment_type")
+        )
+        self.search_index = InstrumentSearchIndex(self.master_df, segment_column=self.SEGMENT_COLUMN)
+        self.option_chain_index = OptionChainIndex(
+            self.master_df,
+            option_type_column="option_type",
+            request_exchange=pl.col("exchange").str.split("_").list.get(0, null_on_oob=True),
+            request_instrument_type=pl.col("exchange").str.split("_").list.get(1, null_on_oob=True)
+        )
+
+    def _resolve_instrument_keys(self, request_data: List[Dict[str, str]]) -> List[str]:
+        """
+        Resolve request identifiers to Upstox instrument keys in a single pass.
+
+        Args:
+            request_data (List[Dict[str, str]]): List of dictionaries containing
+                'exchange_token', 'exchange' and 'instrument_type'.
 
-    async def ltp_quote(self, request_data: List[Dict[str, str]]) -> Dict[str, Any]:
+        Returns:
+            List[str]: Instrument keys in request order.
+
+        Raises:
+            ValueError: If any exchange token is not found; all unknown tokens are reported.
+        """
+        lookup_keys = []
+        for data in request_data:
+            exchange_token = data.get("exchange_token", "")
+            exchange = data.get("exchange", "NSE")
+            instrument_type = data.get("instrument_type", "")
+            try:
+                exchange_token = int(exchange_token)
+            except (TypeError, ValueError):
+                pass
+            lookup_keys.append((exchange_token, f"{exchange}_{instrument_type}"))
+
+        instrument_key_list, missing = self.instrument_key_index.resolve(lookup_keys)
+        if missing:
+            missing_tokens = ", ".join(f"{token} ({segment})" for token, segment in missing)
+            error_msg = f'exchange_token(s) not found in the upstox master file: {missing_tokens}'
+            self.logger.error(error_msg)
+            raise ValueError(error_msg)
+        return instrument_key_list
+
+    async def ltp_quote(
+            self,
+            request_data: List[Dict[str, str]],
+            max_age: Optional[float] = None,
+            errors: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
         """
         Get last traded price quotes for specified instruments.
+        Instruments streamed by the market data feed are answered from the quote book.
         Handles chunking of requests to respect API limits (max 1000 instruments per request).
-        Rate limited to 1 request per second.
+        Chunks are sent concurrently within the endpoint's rate limits.
+        Small requests are merged with concurrent ones when micro-batching is enabled.
         
         Args:
             request_data (List[Dict[str, str]]): List of dictionaries containing
                 instrument identifiers like exchange_token, exchange, etc.
+            max_age (Optional[float]): Maximum age in seconds of a cached quote.
+                Defaults to the LTP cache TTL; 0 forces a fresh fetch.
+            errors (Optional[Dict[str, str]]): When given, instruments that could
+                not be fetched are recorded here (error message by exchange
+                token) and the others are returned, instead of failing the call.
                 
         Returns:
-            Dict[str, Any]: Dictionary containing LTP data for requested instruments.
+            Dict[str, Any]: Dictionary containing LTP data for requested instruments,
+                each with the quote's 'age' in seconds.
             
         Raises:
             ValueError: If instrument identifiers are invalid.
             Exception: If quote retrieval fails.
         """
         try:
-            # Process all instrument keys first
-            instrument_key_list = []
-            for data in request_data:
-                exchange_token = data.get("exchange_token", "")
-                exchange = data.get("exchange", "NSE") 
-                instrument_type = data.get("instrument_type", "")
-
-                instrument_rows = self.master_df.filter(
-                    (pl.col('exchange_token') == int(exchange_token)),
-                    (pl.col('exchange') == f"{exchange}_{instrument_type}"),
-                )
-                if instrument_rows.is_empty():
-                    error_msg = f'exchange_token: {exchange_token} not found in the upstox master file.'
-                    self.logger.error(error_msg)
-                    raise ValueError(error_msg)
-                instrument_key = instrument_rows['instrument_key'][0]
-                instrument_key_list.append(instrument_key)
+            instrument_key_list = self._resolve_instrument_keys(request_data)
 
             CHUNK_SIZE = 750
-            chunks = [instrument_key_list[i:i + CHUNK_SIZE] 
-                     for i in range(0, len(instrument_key_list), CHUNK_SIZE)]
-            
-            combined_response = {}
-            
-            for chunk in chunks:
+
+            async def fetch_chunk(chunk: List[str]) -> Dict[str, Any]:
                 main_instrument_key = ",".join(chunk)
                 
                 url = f'{self.BASE_URL}/market-quote/ltp'
@@ -122,33 +201,36 @@ class UpstoxBroker(BaseBroker):
                 }
                 params = {'instrument_key': main_instrument_key}
 
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url=url, headers=headers, params=params) as response:
-                        if response.status == 200:
-                            ltp_response = await response.json()
-                            if ltp_response['status'] == 'success':
-                                if 'data' in ltp_response:
-                                    chunk_data = await self.convert_quote(response_data=ltp_response['data'])
-                                    combined_response.update(chunk_data)
-                                else:
-                                    error_msg = f'LTP response data missing for: {params}'
-                                    self.logger.error(error_msg)
-                                    raise ValueError(error_msg)
+                session = self._get_session()
+                async with session.get(url=url, headers=headers, params=params) as response:
+                    if response.status == 200:
+                        ltp_response = await response.json()
+                        if ltp_response['status'] == 'success':
+                            if 'data' in ltp_response:
+                                return self._by_instrument_key(ltp_response['data'])
                             else:
-                                error_msg = f'LTP response retrieval unsuccessful. Details: {ltp_response}'
+                                error_msg = f'LTP response data missing for: {params}'
                                 self.logger.error(error_msg)
-                                raise Exception(error_msg)
+                                raise ValueError(error_msg)
                         else:
-                            error_text = await response.text()
-                            error_msg = f'Failed to retrieve LTP response: {response.status} - {error_text}, Headers: {headers}, Params: {params}'
+                            error_msg = f'LTP response retrieval unsuccessful. Details: {ltp_response}'
                             self.logger.error(error_msg)
                             raise Exception(error_msg)
-                            
-                # Rate limiting - wait 1 second between chunks
-                if chunks.index(chunk) < len(chunks) - 1:  # Don't wait after the last chunk
-                    await asyncio.sleep(1)
-                    
-            return combined_response
+                    else:
+                        error_text = await response.text()
+                        error_msg = f'Failed to retrieve LTP response: {response.status} - {error_text}, Headers: {headers}, Params: {params}'
+                        self.logger.error(error_msg)
+                        raise self._upstream_error(response, error_msg)
+
+            failures = {} if errors is not None else None
+            quotes = await self._fetch_quotes(
+                "ltp", instrument_key_list, fetch_chunk, chunk_size=CHUNK_SIZE,
+                quote_type="ltp", batchable=True, max_age=max_age, book_modes=("ltpc", "full"),
+                errors=failures
+            )
+            if failures:
+                errors.update(self._request_errors(request_data, instrument_key_list, failures))
+            return await self.convert_quote(response_data=quotes)
 
         except Exception as e:
             self.logger.error(f'Exception during LTP response retrieval: {e}')
@@ -157,22 +239,31 @@ class UpstoxBroker(BaseBroker):
     async def ohlc_quote(
             self,
             request_data: List[Dict[str, str]],
-            interval: str = "1d"  # Added interval parameter with a default
+            interval: str = "1d",  # Added interval parameter with a default
+            max_age: Optional[float] = None,
+            errors: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:   
         """
         Get OHLC quotes for multiple instruments.
         Handles chunking of requests to respect API limits (max 500 instruments per request, using chunks of 450).
-        Rate limited to 1 request per second.
+        Chunks are sent concurrently within the endpoint's rate limits.
+        Small requests are merged with concurrent ones when micro-batching is enabled.
 
         Args:
             request_data (List[Dict[str, str]]): List of dictionaries, each containing
                 instrument identifiers like 'exchange_token', 'exchange', 'instrument_type'.
             interval (str): Interval for OHLC data. Possible values: '1d', 'I1', 'I30'.
                             Defaults to '1d'.
+            max_age (Optional[float]): Maximum age in seconds of a cached quote.
+                Defaults to the OHLC cache TTL; 0 forces a fresh fetch.
+            errors (Optional[Dict[str, str]]): When given, instruments that could
+                not be fetched are recorded here (error message by exchange
+                token) and the others are returned, instead of failing the call.
 
         Returns:
             Dict[str, Any]: Dictionary containing OHLC quote data for each requested instrument,
-                            keyed by their original instrument_key (after conversion).
+                            keyed by their original instrument_key (after conversion),
+                            each with the quote's 'age' in seconds.
 
         Raises:
             ValueError: If any instrument identifiers are invalid or not found, or if interval is invalid.
@@ -185,34 +276,11 @@ class UpstoxBroker(BaseBroker):
                 self.logger.error(error_msg)
                 raise ValueError(error_msg)
 
-            instrument_key_list = []
-            for data in request_data:
-                exchange_token = data.get("exchange_token", "")
-                exchange = data.get("exchange", "NSE") 
-                instrument_type = data.get("instrument_type", "")
-                
-                instrument_rows = self.master_df.filter(
-                    (pl.col('exchange_token') == int(exchange_token)),
-                    (pl.col('exchange') == f"{exchange}_{instrument_type}"),
-                )
-                if instrument_rows.is_empty():
-                    error_msg = f'exchange_token: {exchange_token} not found in the upstox master file.'
-                    self.logger.error(error_msg)
-                    raise ValueError(error_msg)
-                instrument_key = instrument_rows['instrument_key'][0]
-                instrument_key_list.append(instrument_key)
+            instrument_key_list = self._resolve_instrument_keys(request_data)
 
             CHUNK_SIZE = 450
-            chunks = [
-                instrument_key_list[i:i + CHUNK_SIZE]
-                for i in range(0, len(instrument_key_list), CHUNK_SIZE)]
-
-            combined_response = {}
-            
-            for i, chunk in enumerate(chunks, 1): 
-                if not chunk: 
-                    continue
 
+            async def fetch_chunk(chunk: List[str]) -> Dict[str, Any]:
                 main_instrument_key = ",".join(chunk)
 
                 url = f'{self.BASE_URL}/market-quote/ohlc'
@@ -224,40 +292,37 @@ class UpstoxBroker(BaseBroker):
                     'instrument_key': main_instrument_key,
                     'interval': interval
                 }
-                self.logger.debug(f"Requesting OHLC for chunk {i}/{len(chunks)} with interval {interval}")
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url=url, headers=headers, params=params) as response:
-                        if response.status == 200:
-                            ohlc_api_response = await response.json()
-                            if ohlc_api_response.get('status') == 'success':
-                                if 'data' in ohlc_api_response:
-                                    chunk_data = await self.convert_quote(response_data=ohlc_api_response['data']) 
-                                    combined_response.update(chunk_data)
-                                else:
-                                    error_msg = f"OHLC response data missing for chunk {i}: {params}"
-                                    self.logger.error(error_msg)
-                                    raise ValueError(error_msg)
+                self.logger.debug(f"Requesting OHLC for {len(chunk)} instruments with interval {interval}")
+                session = self._get_session()
+                async with session.get(url=url, headers=headers, params=params) as response:
+                    if response.status == 200:
+                        ohlc_api_response = await response.json()
+                        if ohlc_api_response.get('status') == 'success':
+                            if 'data' in ohlc_api_response:
+                                return self._by_instrument_key(ohlc_api_response['data'])
                             else:
-                                error_msg = f"OHLC response retrieval unsuccessful for chunk {i}. Details: {ohlc_api_response}"
+                                error_msg = f"OHLC response data missing for chunk: {params}"
                                 self.logger.error(error_msg)
-                                raise Exception(error_msg)                                
-                        elif response.status == 429: # Rate limit
-                            self.logger.warning(f"Rate limit hit on ohlc_quote chunk {i}. Waiting 60s.")
-                            await asyncio.sleep(60)
-                            error_msg = f"Rate limit hit on ohlc_quote chunk {i} (not retried)."
-                            self.logger.error(error_msg)
-                            raise Exception(error_msg)
+                                raise ValueError(error_msg)
                         else:
-                            error_text = await response.text()
-                            error_msg = f"Failed to retrieve OHLC response for chunk {i}: HTTP {response.status} - {error_text}. Params: {params}"
+                            error_msg = f"OHLC response retrieval unsuccessful. Details: {ohlc_api_response}"
                             self.logger.error(error_msg)
-                            raise Exception(error_msg)            
-
-                # Rate limiting - wait 1 second between chunks
-                if i < len(chunks):  # Use 'i' from enumerate
-                    self.logger.debug(f"Waiting 1 second before next OHLC chunk...")
-                    await asyncio.sleep(1)
-
+                            raise Exception(error_msg)                                
+                    else:
+                        error_text = await response.text()
+                        error_msg = f"Failed to retrieve OHLC response: HTTP {response.status} - {error_text}. Params: {params}"
+                        self.logger.error(error_msg)
+                        raise self._upstream_error(response, error_msg)
+
+            failures = {} if errors is not None else None
+            quotes = await self._fetch_quotes(
+                "ohlc", instrument_key_list, fetch_chunk, chunk_size=CHUNK_SIZE,
+                quote_type="ohlc", request_key=("ohlc", interval), batchable=True, max_age=max_age,
+                errors=failures
+            )
+            if failures:
+                errors.update(self._request_errors(request_data, instrument_key_list, failures))
+            combined_response = await self.convert_quote(response_data=quotes)
             self.logger.info(f"Successfully retrieved OHLC quotes for {len(combined_response)} instruments.")
             return combined_response
 
@@ -270,51 +335,39 @@ class UpstoxBroker(BaseBroker):
 
     async def full_market_quote(
         self,
-        request_data: List[Dict[str, str]]
+        request_data: List[Dict[str, str]],
+        max_age: Optional[float] = None,
+        errors: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
         """
         Get full market quotes for multiple instruments.
+        Instruments streamed in full mode by the market data feed are answered from the quote book.
         Handles chunking of requests to respect API limits (max 500 instruments per request, using chunks of 450).
-        Rate limited to 1 request per second.
+        Chunks are sent concurrently within the endpoint's rate limits.
 
         Args:
             quote_request_data (List[Dict[str, str]]): List of dictionaries, each containing
                 instrument identifiers like 'exchange_token', 'exchange', 'instrument_type'.
+            max_age (Optional[float]): Maximum age in seconds of a cached quote.
+                Defaults to the full quote cache TTL; 0 forces a fresh fetch.
+            errors (Optional[Dict[str, str]]): When given, instruments that could
+                not be fetched are recorded here (error message by exchange
+                token) and the others are returned, instead of failing the call.
 
         Returns:
             Dict[str, Any]: Dictionary containing full market quote data for each requested instrument,
-                            keyed by their original instrument_key.
+                            keyed by their original instrument_key, each with the quote's 'age' in seconds.
 
         Raises:
             ValueError: If any instrument identifiers are invalid or not found.
             Exception: If quote retrieval fails for any chunk.
         """
         try:
-            instrument_key_list = []
-            for data in request_data:
-                exchange_token = data.get("exchange_token", "")
-                exchange = data.get("exchange", "NSE") 
-                instrument_type = data.get("instrument_type", "")
-
-                instrument_rows = self.master_df.filter(
-                    (pl.col('exchange_token') == int(exchange_token)),
-                    (pl.col('exchange') == f"{exchange}_{instrument_type}"),
-                )
-                if instrument_rows.is_empty():
-                    error_msg = f'exchange_token: {exchange_token} not found in the upstox master file.'
-                    self.logger.error(error_msg)
-                    raise ValueError(error_msg)
-                instrument_key = instrument_rows['instrument_key'][0]
-                instrument_key_list.append(instrument_key)
+            instrument_key_list = self._resolve_instrument_keys(request_data)
 
             CHUNK_SIZE = 450
-            chunks = [
-                instrument_key_list[i:i + CHUNK_SIZE]
-                for i in range(0, len(instrument_key_list), CHUNK_SIZE)]
 
-            combined_response = {}
-            
-            for chunk in chunks:
+            async def fetch_chunk(chunk: List[str]) -> Dict[str, Any]:
                 main_instrument_key = ",".join(chunk)
 
                 url = f'{self.BASE_URL}/market-quote/quotes'
@@ -324,33 +377,35 @@ class UpstoxBroker(BaseBroker):
                 }
                 params = {'instrument_key': main_instrument_key}
 
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url=url, headers=headers, params=params) as response:
-                        if response.status == 200:
-                            quote_api_response = await response.json()
-                            if quote_api_response.get('status') == 'success':
-                                if 'data' in quote_api_response:
-                                    chunk_data = await self.convert_quote(response_data=quote_api_response['data'])
-                                    combined_response.update(chunk_data)
-                                else:
-                                    error_msg = f"Full market quote response data missing for: {params}"
-                                    self.logger.error(error_msg)
-                                    raise ValueError(error_msg)
+                session = self._get_session()
+                async with session.get(url=url, headers=headers, params=params) as response:
+                    if response.status == 200:
+                        quote_api_response = await response.json()
+                        if quote_api_response.get('status') == 'success':
+                            if 'data' in quote_api_response:
+                                return self._by_instrument_key(quote_api_response['data'])
                             else:
-                                error_msg = f"Full market quote response retrieval unsuccessful. Details: {quote_api_response}"
+                                error_msg = f"Full market quote response data missing for: {params}"
                                 self.logger.error(error_msg)
-                                raise Exception(error_msg)                                
+                                raise ValueError(error_msg)
                         else:
-                            error_text = await response.text()
-                            error_msg = f"Failed to retrieve full market quote response: {response.status} - {error_text}, Headers: {headers}, Params: {params}"
+                            error_msg = f"Full market quote response retrieval unsuccessful. Details: {quote_api_response}"
                             self.logger.error(error_msg)
-                            raise Exception(error_msg)
-                
-                # Rate limiting - wait 1 second between chunks
-                if chunks.index(chunk) < len(chunks) - 1:  # Don't wait after the last chunk
-                    await asyncio.sleep(1)
-
-            return combined_response
+                            raise Exception(error_msg)                                
+                    else:
+                        error_text = await response.text()
+                        error_msg = f"Failed to retrieve full market quote response: {response.status} - {error_text}, Headers: {headers}, Params: {params}"
+                        self.logger.error(error_msg)
+                        raise self._upstream_error(response, error_msg)
+
+            failures = {} if errors is not None else None
+            quotes = await self._fetch_quotes(
+                "quotes", instrument_key_list, fetch_chunk, chunk_size=CHUNK_SIZE,
+                quote_type="full", max_age=max_age, book_modes=("full",), errors=failures
+            )
+            if failures:
+                errors.update(self._request_errors(request_data, instrument_key_list, failures))
+            return await self.convert_quote(response_data=quotes)
 
         except ValueError as ve:
             self.logger.error(f"ValueError in full_market_quote: {ve}")
@@ -359,41 +414,54 @@ class UpstoxBroker(BaseBroker):
             self.logger.error(f"Exception during full market quote retrieval: {e}")
             raise
 
+    @staticmethod
+    def _by_instrument_key(response_data: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Re-key a market quote response by instrument key.
+
+        Upstox keys quote data by 'EXCHANGE:SYMBOL'; the instrument key the
+        quote was requested with is in its 'instrument_token' field.
+
+        Args:
+            response_data (Dict[str, Dict[str, Any]]): The response's 'data' field.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: The quotes keyed by instrument key.
+        """
+        return {value.get('instrument_token', key): value for key, value in response_data.items()}
+
     async def convert_quote(self, response_data: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
         """
         Converts instrument tokens in the quote data to exchange tokens.
 
+        Instruments are enriched through the reverse instrument_key index in a
+        single pass over the response.
+
         Args:
             ltp_response_data (dict): A dictionary where each value contains quote data with an 'instrument_token' key.
 
         Returns:
-            dict: A dictionary with trading symbols as keys and quote data as values.
+            dict: A dictionary with exchange tokens as keys and quote data as values.
 
         Raises:
             Exception: If an error occurs during the conversion process.
         """
         output_dict = {}
+        reverse_index = self.instrument_key_reverse_index
         for ltp_data, value in response_data.items():
-            instrument_key = value['instrument_token']
+            instrument_key = value.get('instrument_token')
             if instrument_key is None:
                 self.logger.error(f"Missing 'instrument_token' in quote data for key {ltp_data}")
                 continue
-            try:
-                temp_df = self.master_df.filter(
-                    pl.col('instrument_key') == instrument_key
-                )
-                value["trading_symbol"] = temp_df["tradingsymbol"][0]
-                value["instrument_type"] = temp_df["exchange"][0].split("_")[1] 
-                if temp_df.is_empty():
-                    self.logger.error(f"No matching instrument for token {instrument_key}")
-                    continue
-                new_key = temp_df['exchange_token'][0]
-                output_dict[new_key] = value
-
-            except Exception as e:
-                self.logger.error(f"Error converting instrument token {instrument_key}: {e}")
-                raise
-        
+            instrument = reverse_index.get(instrument_key)
+            if instrument is None:
+                self.logger.error(f"No matching instrument for token {instrument_key}")
+                continue
+            exchange_token, trading_symbol, _, instrument_type = instrument
+            value["trading_symbol"] = trading_symbol
+            value["instrument_type"] = instrument_type
+            output_dict[exchange_token] = value
+
         return output_dict
 
     async def historical_data(
@@ -407,14 +475,16 @@ class UpstoxBroker(BaseBroker):
             ) -> List[Dict[str, Any]]:
         """
         Get historical candle data for a specified instrument.
-        Handles chunking of requests to respect API limits (max 1000 days per request).
-        Rate limited to 1 request per second.
+        The date range is split into the fewest requests the API's range limit
+        for the interval allows (HISTORY_WINDOW_DAYS), fetched concurrently and
+        merged in date order (see BaseBroker._fetch_history). Until the API
+        publishes today's daily candle, it is built from the full market quote.
         
         Args:
             exchange (str): Exchange name (e.g., 'NSE', 'BSE').
             exchange_token (str): Exchange token for the instrument.
             instrument_type (str): Type of instrument (e.g., 'EQ', 'FUT').
-            interval (str): Time interval for candles (e.g., '1minute', '1day').
+            interval (str): Time interval for candles (e.g., '1minute', 'day').
             from_date (str): Start date in 'YYYY-MM-DD' format.
             to_date (str): End date in 'YYYY-MM-DD' format.
             
@@ -424,217 +494,114 @@ class UpstoxBroker(BaseBroker):
         """
         try:
             # Validate instrument exists
-            instrument_rows = self.master_df.filter(
-                (pl.col('exchange_token') == int(exchange_token)),
-                (pl.col('exchange') == f"{exchange}_{instrument_type}"),
-            )
-            if instrument_rows.is_empty():
-                error_msg = f"exchange_token: {exchange_token} not found in upstox master file."
-                self.logger.error(error_msg)
-                raise ValueError(error_msg)
-            instrument_key = instrument_rows['instrument_key'][0]
-
-            # Split date range into chunks of 1000 days
-            from_dt = datetime.strptime(from_date, "%Y-%m-%d")
-            to_dt = datetime.strptime(to_date, "%Y-%m-%d")
-            date_chunks = []
-            chunk_start = from_dt
-            
-            while chunk_start < to_dt:
-                chunk_end = min(chunk_start + timedelta(days=999), to_dt)
-                date_chunks.append((
-                    chunk_start.strftime("%Y-%m-%d"),
-                    chunk_end.strftime("%Y-%m-%d")
-                ))
-                chunk_start = chunk_end + timedelta(days=1)
-
-            self.logger.info(f'Processing {len(date_chunks)} chunks for historical data')
-            combined_df = None
-
-            for i, (chunk_from, chunk_to) in enumerate(date_chunks, 1):
-                url = f'{self.BASE_URL}/historical-candle/{instrument_key}/{interval}/{chunk_to}/{chunk_from}'
+            instrument_key = self._resolve_instrument_keys([{
+                "exchange_token": exchange_token,
+                "exchange": exchange,
+                "instrument_type": instrument_type,
+            }])[0]
+
+            async def fetch_window(window_from: str, window_to: str) -> List[List[Any]]:
+                url = f'{self.BASE_URL}/historical-candle/{instrument_key}/{interval}/{window_to}/{window_from}'
                 headers = {
                     'Accept': 'application/json'
                 }
                 params = {
                     'instrument_key': instrument_key,
                     'interval': interval,
-                    'from_date': chunk_from,
-                    'to_date': chunk_to
+                    'from_date': window_from,
+                    'to_date': window_to
                 }
 
-                self.logger.debug(f'Processing chunk {i} of {len(date_chunks)} ({chunk_from} to {chunk_to})')
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url=url, headers=headers, params=params) as response:
-                        if response.status == 200:
-                            hist_response = await response.json()
-                            if hist_response.get('status') == 'success':
-                                if 'data' in hist_response:
-                                    chunk_df = await self._convert_to_polars_df(
-                                        data=hist_response['data'],
-                                        exchange=exchange,
-                                        exchange_token=exchange_token,
-                                        instrument_type=instrument_type,
-                                        interval=interval,
-                                        from_date=chunk_from,
-                                        to_date=chunk_to
-                                    )
-                                    if not chunk_df.is_empty():
-                                        if combined_df is None:
-                                            combined_df = chunk_df
-                                        else:
-                                            combined_df = pl.concat([combined_df, chunk_df])
-                                else:
-                                    self.logger.warning(f'No data for chunk {i} ({chunk_from} to {chunk_to})')
-                            else:
-                                self.logger.warning(f'Unsuccessful response for chunk {i}: {hist_response}')
+                session = self._get_session()
+                async with session.get(url=url, headers=headers, params=params) as response:
+                    if response.status == 200:
+                        hist_response = await response.json()
+                        if hist_response.get('status') == 'success':
+                            if 'data' not in hist_response:
+                                self.logger.warning(f'No data for chunk {window_from} to {window_to}')
+                                return []
+                            return hist_response['data'].get('candles', [])
                         else:
-                            error_text = await response.text()
-                            self.logger.warning(f'Failed to retrieve chunk {i}: {response.status} - {error_text}')
-
-                # Rate limiting - wait 1 second between chunks
-                if i < len(date_chunks):  # Don't wait after the last chunk
-                    await asyncio.sleep(1)
-
-            # Return sorted results if we have data
-            if combined_df is not None and not combined_df.is_empty():
-                self.logger.info(f'Successfully processed {len(date_chunks)} chunks')
-                # Ensure only required columns in correct order
-                combined_df = combined_df.select([
-                    "datetime", "open", "high", "low", "close", "volume", "oi"
-                ])
-                combined_df = combined_df.with_columns([
-                    pl.col("open").cast(pl.Float64),
-                    pl.col("high").cast(pl.Float64),
-                    pl.col("low").cast(pl.Float64),
-                    pl.col("close").cast(pl.Float64),
-                    pl.col("volume").cast(pl.Int64),
-                    pl.col("oi").cast(pl.Int64)
-                ]).sort('datetime')
-                
-                return combined_df.to_dicts()
-            else:
-                self.logger.warning(f'No historical data found for any chunk')
-                return []
+                            error_msg = f'Unsuccessful response for chunk {window_from} to {window_to}: {hist_response}'
+                            self.logger.error(error_msg)
+                            raise Exception(error_msg)
+                    else:
+                        error_text = await response.text()
+                        error_msg = f'Failed to retrieve chunk {window_from} to {window_to}: {response.status} - {error_text}'
+                        self.logger.error(error_msg)
+                        raise self._upstream_error(response, error_msg)
+
+            candles = await self._fetch_history(exchange, instrument_key, interval, from_date, to_date, fetch_window)
+            if interval == "day":
+                candles = await self._add_quoted_session_candle(
+                    candles, exchange, exchange_token, instrument_type, from_date, to_date
+                )
+            return candles
 
         except Exception as e:
             self.logger.error(f'Exception while retrieving historical data: {e}')  
             raise
 
-    async def _convert_to_polars_df(
+    async def _add_quoted_session_candle(
             self,
-            data: dict,
+            candles: List[Dict[str, Any]],
+            exchange: str,
             exchange_token: str,
             instrument_type: str,
-            exchange: str,
-            interval: str,
             from_date: str,
             to_date: str
-            ) -> pl.DataFrame:
+            ) -> List[Dict[str, Any]]:
         """
-        Converts provided candle data to a Polars DataFrame with a timezone-adjusted datetime column.
-        
+        Add today's daily candle from the full market quote when the historical
+        API has not published it yet and it is not built from live ticks.
+
         Args:
-            data (dict): Dictionary containing candle data with datetime and OHLC values.
-            exchange_token (str): The exchange token of the instrument.
-            instrument_type (str): Type of instrument (e.g., 'EQ', 'FUT').
+            candles (List[Dict[str, Any]]): Daily candles of the range, oldest first.
             exchange (str): Exchange name (e.g., 'NSE', 'BSE').
-            interval (str): The interval for the historical data (e.g., '1minute', '5minute', '1day').
-            from_date (str): The start date for the historical data in 'YYYY-MM-DD' format.
-            to_date (str): The end date for the historical data in 'YYYY-MM-DD' format.
+            exchange_token (str): Exchange token for the instrument.
+            instrument_type (str): Type of instrument (e.g., 'EQ', 'FUT').
+            from_date (str): Start date in 'YYYY-MM-DD' format.
+            to_date (str): End date in 'YYYY-MM-DD' format.
 
         Returns:
-            pl.DataFrame: Polars DataFrame with columns: datetime, open, high, low, close, volume, oi
+            List[Dict[str, Any]]: The candles, with today's candle appended when
+                today is in the range and its session has opened.
         """
-        candles = data.get('candles', [])
-        if candles:
-            data_dict = {
-                "datetime": [item[0] for item in candles],
-                "open": [item[1] for item in candles],
-                "high": [item[2] for item in candles],
-                "low": [item[3] for item in candles],
-                "close": [item[4] for item in candles],
-                "volume": [item[5] for item in candles],
-                "oi": [item[6] for item in candles],
-            }
-            df = pl.DataFrame(data_dict)
-            df = df.with_columns([
-                pl.col("datetime")
-                .str.strptime(pl.Datetime)
-                .dt.convert_time_zone("Asia/Kolkata")
-                .dt.strftime("%Y-%m-%d %H:%M:%S"),
-                pl.col("open").cast(pl.Float64),
-                pl.col("high").cast(pl.Float64),
-                pl.col("low").cast(pl.Float64),
-                pl.col("close").cast(pl.Float64),
-                pl.col("volume").cast(pl.Int64),
-                pl.col("oi").cast(pl.Int64)
-            ])
-
-            # Check if we need today's data
-            if to_date == datetime.now().strftime("%Y-%m-%d"):
-                today_date = datetime.now().strftime("%Y-%m-%d")
-                has_todays_data = df.filter(
-                    pl.col("datetime").str.contains(today_date)
-                ).height > 0
-
-                if not has_todays_data:
-                    todays_mkt_quote = await self.full_market_quote(
-                        exchange_token=exchange_token, 
-                        exchange=exchange, 
-                        instrument_type=instrument_type
-                    )
-                    if todays_mkt_quote.get('ohlc'):
-                        if todays_mkt_quote.get('timestamp'):  # Validate timestamp exists
-                            row = {
-                                'datetime': todays_mkt_quote['timestamp'],
-                                'open': todays_mkt_quote['ohlc']['open'],
-                                'high': todays_mkt_quote['ohlc']['high'],
-                                'low': todays_mkt_quote['ohlc']['low'],
-                                'close': todays_mkt_quote['ohlc']['close'],
-                                'volume': todays_mkt_quote['volume'],
-                                'oi': todays_mkt_quote['oi'],
-                            }
-
-                            todays_df = pl.DataFrame(row)
-                            todays_df = todays_df.with_columns([
-                                pl.col('datetime')
-                                .str.strptime(pl.Datetime)
-                                .dt.convert_time_zone("Asia/Kolkata")
-                                .dt.strftime("%Y-%m-%d %H:%M:%S"),
-                                pl.col("open").cast(pl.Float64),
-                                pl.col("high").cast(pl.Float64),
-                                pl.col("low").cast(pl.Float64),
-                                pl.col("close").cast(pl.Float64),
-                                pl.col("volume").cast(pl.Int64),
-                                pl.col("oi").cast(pl.Int64)
-                            ])
-                            
-                            df = pl.concat([df, todays_df])
-                        else:
-                            self.logger.warning(f"Current day's timestamp missing for exchange token: {exchange_token}")
-                    else:
-                        self.logger.warning(f"Current day's full market quote not available for exchange token: {exchange_token}")
-                else:
-                    self.logger.debug(f"Current day's data already exists in historical data for exchange token: {exchange_token}")
-
-            # Ensure only required columns in correct order
-            df = df.select([
-                "datetime", "open", "high", "low", "close", "volume", "oi"
-            ]).sort('datetime')
-            
-            return df
-        else:
-            self.logger.warning(f"Historical data for exchange token: {exchange_token} from: {from_date} to: {to_date} at interval: {interval} not found.")
-            return pl.DataFrame(schema={
-                "datetime": str,
-                "open": float,
-                "high": float,
-                "low": float,
-                "close": float,
-                "volume": int,
-                "oi": int
-            })
+        now = datetime.now(EXCHANGE_TIMEZONE)
+        today = now.date().isoformat()
+        if not from_date <= today <= to_date or not self.market_calendar.is_trading_day(exchange, now.date()):
+            return candles
+        session = self.market_calendar.session(exchange, now.date())
+        if session is not None and now.time() < session[0]:
+            return candles
+        if any(candle["datetime"].startswith(today) for candle in candles):
+            self.logger.debug(f"Current day's data already exists in historical data for exchange token: {exchange_token}")
+            return candles
+
+        try:
+            quotes = await self.full_market_quote([{
+                "exchange_token": exchange_token,
+                "exchange": exchange,
+                "instrument_type": instrument_type,
+            }])
+        except Exception as e:
+            self.logger.warning(f"Current day's full market quote not available for exchange token: {exchange_token}: {e}")
+            return candles
+        quote = quotes.get(int(exchange_token)) or {}
+        ohlc = quote.get('ohlc')
+        if not ohlc:
+            self.logger.warning(f"Current day's full market quote not available for exchange token: {exchange_token}")
+            return candles
+
+        return candles + [{
+            'datetime': f"{today} 00:00:00",
+            'open': float(ohlc['open']),
+            'high': float(ohlc['high']),
+            'low': float(ohlc['low']),
+            'close': float(ohlc['close']),
+            'volume': int(quote.get('volume') or 0),
+            'oi': int(quote.get('oi') or 0),
+        }]
 
     async def fetch_access_token(self) -> str:
         """
@@ -0,0 +1,183 @@
+"""
+Upstox market data feed module.
+
+This module contains the UpstoxMarketFeed class that streams Upstox's protobuf
+market data feed into a QuoteBook, and the functions that decode feed frames
+into the REST quote format.
+"""
+
+import json
+import uuid
+import aiohttp
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ..base.master_cache import EXCHANGE_TIMEZONE
+from ..base.market_feed import MarketFeed
+from .proto import MarketDataFeedV3_pb2 as feed_pb
+
+
+def _timestamp(epoch_ms: int) -> Optional[str]:
+    if not epoch_ms:
+        return None
+    return datetime.fromtimestamp(epoch_ms / 1000, EXCHANGE_TIMEZONE).isoformat()
+
+
+def _ltpc_fields(ltpc: feed_pb.LTPC) -> Dict[str, Any]:
+    return {
+        "last_price": ltpc.ltp,
+        "last_trade_time": str(ltpc.ltt) if ltpc.ltt else None,
+        "ltq": ltpc.ltq,
+        "cp": ltpc.cp,
+        "net_change": ltpc.ltp - ltpc.cp if ltpc.cp else None,
+        "timestamp": _timestamp(ltpc.ltt),
+    }
+
+
+def _daily_ohlc(market_ohlc: feed_pb.MarketOHLC) -> Optional[Dict[str, float]]:
+    for candle in market_ohlc.ohlc:
+        if candle.interval == "1d":
+            return {"open": candle.open, "high": candle.high, "low": candle.low, "close": candle.close}
+    return None
+
+
+def decode_feed(instrument_key: str, feed: feed_pb.Feed) -> Optional[Dict[str, Any]]:
+    """
+    Convert one instrument's feed message to the REST quote format.
+
+    Args:
+        instrument_key (str): The instrument key the feed is for.
+        feed (feed_pb.Feed): The decoded feed message.
+
+    Returns:
+        Optional[Dict[str, Any]]: The quote, or None for an empty message.
+    """
+    union = feed.WhichOneof("FeedUnion")
+    if union == "ltpc":
+        return {"instrument_token": instrument_key, **_ltpc_fields(feed.ltpc)}
+
+    if union == "firstLevelWithGreeks":
+        first_level = feed.firstLevelWithGreeks
+        return {
+            "instrument_token": instrument_key,
+            **_ltpc_fields(first_level.ltpc),
+            "volume": first_level.vtt,
+            "oi": first_level.oi,
+        }
+
+    if union == "fullFeed":
+        full_feed = feed.fullFeed
+        if full_feed.WhichOneof("FullFeedUnion") == "indexFF":
+            index_feed = full_feed.indexFF
+            return {
+                "instrument_token": instrument_key,
+                **_ltpc_fields(index_feed.ltpc),
+                "ohlc": _daily_ohlc(index_feed.marketOHLC),
+            }
+        market_feed = full_feed.marketFF
+        levels = market_feed.marketLevel.bidAskQuote
+        return {
+            "instrument_token": instrument_key,
+            **_ltpc_fields(market_feed.ltpc),
+            "ohlc": _daily_ohlc(market_feed.marketOHLC),
+            "depth": {
+                "buy": [{"quantity": level.bidQ, "price": level.bidP} for level in levels],
+                "sell": [{"quantity": level.askQ, "price": level.askP} for level in levels],
+            },
+            "volume": market_feed.vtt,
+            "average_price": market_feed.atp,
+            "oi": market_feed.oi,
+            "total_buy_quantity": market_feed.tbq,
+            "total_sell_quantity": market_feed.tsq,
+        }
+    return None
+
+
+def decode_frame(frame: bytes) -> Dict[str, Dict[str, Any]]:
+    """
+    Decode a binary feed frame into quotes.
+
+    Args:
+        frame (bytes): A serialized FeedResponse.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Quotes keyed by instrument key; empty for
+            market status frames.
+    """
+    response = feed_pb.FeedResponse.FromString(frame)
+    quotes = {}
+    for instrument_key, feed in response.feeds.items():
+        quote = decode_feed(instrument_key, feed)
+        if quote is not None:
+            quotes[instrument_key] = quote
+    return quotes
+
+
+class UpstoxMarketFeed(MarketFeed):
+    """
+    Upstox V3 market data feed.
+
+    Each connection is authorized through the REST API, which returns a
+    single-use WebSocket URL. Subscription requests are JSON sent as binary
+    frames; quotes arrive as protobuf FeedResponse frames.
+    """
+
+    MODES = {
+        "ltpc": "ltpc",
+        "option_greeks": "ltpc",
+        "full": "full",
+        "full_d30": "full",
+    }
+
+    # Standard plan limits of the V3 feed.
+    MAX_INSTRUMENTS = {
+        "ltpc": 5000,
+        "option_greeks": 3000,
+        "full": 2000,
+        "full_d30": 50,
+    }
+    MAX_CONNECTIONS = 2
+
+    AUTHORIZE_PATH = "/feed/market-data-feed/authorize"
+
+    async def _connect_url(self) -> str:
+        """
+        Get an authorized WebSocket URL for the feed.
+
+        Returns:
+            str: The authorized feed URL.
+
+        Raises:
+            Exception: If authorization fails.
+        """
+        await self.broker.rate_governor.acquire("feed_authorize")
+        headers = {
+            'Authorization': f'Bearer {self.broker.access_token}',
+            'Accept': 'application/json'
+        }
+        session = self.broker._get_session()
+        async with session.get(self.broker.BASE_URL_V3 + self.AUTHORIZE_PATH, headers=headers) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                raise self.broker._upstream_error(
+                    response, f"Market data feed authorization failed: {response.status} - {error_text}"
+                )
+            authorize_response = await response.json()
+            return authorize_response["data"]["authorized_redirect_uri"]
+
+    async def _send_subscription(
+        self,
+        ws: aiohttp.ClientWebSocketResponse,
+        method: str,
+        instrument_keys: List[str]
+    ) -> None:
+        message = {
+            "guid": uuid.uuid4().hex,
+            "method": method,
+            "data": {"mode": self.mode, "instrumentKeys": instrument_keys},
+        }
+        # The feed only accepts binary frames.
+        await ws.send_bytes(json.dumps(message).encode())
+
+    def _decode(self, frame: bytes) -> Dict[str, Dict[str, Any]]:
+        return decode_frame(frame)
@@ -11,13 +11,34 @@ from typing import Dict, List, Any, Optional
 import io
 from kiteconnect import KiteConnect
 from ..base.broker import BaseBroker
+from ..base.instrument_index import InstrumentIndex
+from ..base.instrument_search import InstrumentSearchIndex
+from ..base.option_chain import OptionChainIndex
 from .token_rotator import ZerodhaTokenRotator
+from .ticker import ZerodhaTicker
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
 
 
+# Columns of the Kite instrument master and their types.
+ZERODHA_MASTER_SCHEMA = {
+    "instrument_token": pl.Int64,
+    "exchange_token": pl.Int64,
+    "tradingsymbol": pl.Utf8,
+    "name": pl.Utf8,
+    "last_price": pl.Float64,
+    "expiry": pl.Utf8,
+    "strike": pl.Float64,
+    "tick_size": pl.Float64,
+    "lot_size": pl.Int64,
+    "instrument_type": pl.Utf8,
+    "segment": pl.Utf8,
+    "exchange": pl.Utf8,
+}
+
+
 class ZerodhaBroker(BaseBroker):
     """
     Broker implementation for Zerodha (Kite Connect) API.
@@ -27,6 +48,40 @@ class ZerodhaBroker(BaseBroker):
     """
     BASE_URL = "https://api.kite.trade/"
     ZERODHA_API_KEY = os.getenv("ZERODHA_API_KEY")
+    SEGMENT_COLUMN = "segment"
+    MASTER_KEY_COLUMN = "instrument_token"
+    MARKET_FEED = ZerodhaTicker
+
+    # Kite Connect limits: quote endpoints 1/s, historical 3/s, everything else 10/s.
+    RATE_LIMITS = {
+        "quote": [(1, 1)],
+        "historical": [(3, 1)],
+        "default": [(10, 1)],
+    }
+
+    # Longest date range of one historical candle request per interval.
+    HISTORY_WINDOW_DAYS = {
+        "minute": 60,
+        "3minute": 100,
+        "5minute": 100,
+        "10minute": 100,
+        "15minute": 200,
+        "30minute": 200,
+        "60minute": 400,
+        "day": 2000,
+    }
+
+    # Master segment (Upstox naming) -> (Kite instruments exchange, Kite segments)
+    SEGMENT_MAP = {
+        "NSE_EQ": ("NSE", ["NSE"]),
+        "NSE_INDEX": ("NSE", ["INDICES"]),
+        "NSE_FO": ("NFO", ["NFO-FUT", "NFO-OPT"]),
+        "BSE_EQ": ("BSE", ["BSE"]),
+        "BSE_INDEX": ("BSE", ["INDICES"]),
+        "BSE_FO": ("BFO", ["BFO-FUT", "BFO-OPT"]),
+        "MCX_FO": ("MCX", ["MCX-FUT", "MCX-OPT"]),
+        "NCD_FO": ("CDS", ["CDS-FUT", "CDS-OPT"]),
+    }
 
     def _get_broker_name(self) -> str:
         """
@@ -49,10 +104,12 @@ class ZerodhaBroker(BaseBroker):
             self.logger.info('Initializing ZerodhaBroker')
             # Fetch a fresh access token via token rotator
             self.access_token = await self.fetch_access_token()
-            # Load instrument master data
-            self.master_data = await self._get_zerodha_master_data()
-            # Store as Polars DataFrame for fast filtering
-            self.master_df = pl.DataFrame(data=self.master_data)
+            # Load instrument master data as a Polars DataFrame
+            self.master_df = await self._get_zerodha_master_data()
+            self._build_master_indexes()
+            self._master_loaded()
+            # Stream configured instruments over the Kite ticker
+            await self._start_configured_market_feed()
 
         except Exception as e:
             self.logger.error(f"Initialization failed: {e}")
@@ -60,8 +117,11 @@ class ZerodhaBroker(BaseBroker):
 
     async def _get_zerodha_master_data(self) -> pl.DataFrame:
         """
-        Fetch the daily gzipped CSV of all instruments from Zerodha,
-        decompress and parse it into a Polars DataFrame.
+        Fetch the daily CSV of all instruments from Zerodha and parse it into
+        a Polars DataFrame. When master segments are configured, only the
+        per-exchange instrument files covering them are fetched, concurrently,
+        and filtered to those segments. The parsed files are served from the
+        local master cache when they are current for the trading date.
 
         Returns:
             pl.DataFrame: DataFrame containing instrument_token, exchange_token,
@@ -69,154 +129,430 @@ class ZerodhaBroker(BaseBroker):
             lot_size, instrument_type, segment, exchange.
 
         Raises:
+            ValueError: If a configured segment has no Kite equivalent.
             Exception: On HTTP or parsing errors.
         """
         try:
-            url = self.BASE_URL + 'instruments'
             headers = {
                 "Authorization": f"token {self.ZERODHA_API_KEY}:{self.access_token}",
                 "X-Kite-Version": "3",
             }
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url=url, headers=headers) as response:
-                    response.raise_for_status()
-                    csv_bytes = await response.read()
-
-            # Parse CSV into Polars, overriding strike type to Float
-            df = pl.read_csv(
-                io.BytesIO(csv_bytes),
-                schema_overrides={
-                    "strike": pl.Float64
-                }
+            segments = self._master_segments()
+            if segments is None:
+                files = {None: None}
+            else:
+                unknown_segments = [segment for segment in segments if segment not in self.SEGMENT_MAP]
+                if unknown_segments:
+                    raise ValueError(f"Unsupported master segment(s) for Zerodha: {unknown_segments}")
+                files = {}
+                for segment in segments:
+                    kite_exchange, kite_segments = self.SEGMENT_MAP[segment]
+                    files.setdefault(kite_exchange, []).extend(kite_segments)
+
+            async def load(kite_exchange: Optional[str], kite_segments: Optional[List[str]]) -> pl.DataFrame:
+                url = self.BASE_URL + 'instruments'
+                snapshot_name = "zerodha_instruments"
+                if kite_exchange is not None:
+                    url += f"/{kite_exchange}"
+                    snapshot_name += f"_{kite_exchange}_" + "-".join(sorted(kite_segments))
+                segment_filter = None if kite_segments is None else pl.col("segment").is_in(kite_segments)
+
+                async def parse(response: aiohttp.ClientResponse) -> pl.DataFrame:
+                    return await self._read_master_csv(
+                        response,
+                        schema=ZERODHA_MASTER_SCHEMA,
+                        row_filter=segment_filter
+                    )
+
+                return await self.master_cache.load(
+                    name=snapshot_name,
+                    url=url,
+                    parse=parse,
+                    headers=headers,
+                    session=self._get_session()
+                )
+
+            frames = await asyncio.gather(
+                *(load(kite_exchange, kite_segments) for kite_exchange, kite_segments in files.items())
             )
-            return df
+            return pl.concat(frames) if len(frames) > 1 else frames[0]
 
         except Exception as e:
             self.logger.exception(e)
             raise
 
-    async def ltp_quote(self, request_data: List[Dict[str, str]]) -> Dict[str, Any]:
+    def _build_master_indexes(self) -> None:
+        """
+        Build the lookup structures derived from the master data.
+
+        Called once per master load, so request-time lookups never scan master_df.
+        """
+        self.tradingsymbol_index = InstrumentIndex(
+            self.master_df,
+            key_columns=("exchange_token", "exchange"),
+            value_columns="tradingsymbol"
+        )
+        self.instrument_token_index = InstrumentIndex(
+            self.master_df.with_columns(
+                (pl.col("exchange") + ":" + pl.col("tradingsymbol")).alias("instrument_key")
+            ),
+            key_columns="instrument_key",
+            value_columns="instrument_token"
+        )
+        self.instrument_token_reverse_index = InstrumentIndex(
+            self.master_df,
+            key_columns="instrument_token",
+            value_columns=("exchange_token", "tradingsymbol", "segment", "instrument_type")
+        )
+        self.search_index = InstrumentSearchIndex(self.master_df, segment_column=self.SEGMENT_COLUMN)
+        self.option_chain_index = OptionChainIndex(
+            self.master_df,
+            option_type_column="instrument_type",
+            request_exchange=pl.col("exchange"),
+            request_instrument_type=pl.col("instrument_type")
+        )
+
+    def _resolve_instrument_keys(self, request_data: List[Dict[str, str]]) -> List[str]:
+        """
+        Resolve request identifiers to Kite "exchange:tradingsymbol" keys in a single pass.
+
+        Args:
+            request_data (List[Dict[str, str]]): List of dicts each containing
+                exchange_token and exchange.
+
+        Returns:
+            List[str]: Instrument keys in request order.
+
+        Raises:
+            ValueError: If any exchange_token is not found; all unknown tokens are reported.
+        """
+        lookup_keys = []
+        for data in request_data:
+            exchange_token = data.get("exchange_token", "")
+            exchange = data.get("exchange", "NSE")
+            try:
+                exchange_token = int(exchange_token)
+            except (TypeError, ValueError):
+                pass
+            lookup_keys.append((exchange_token, exchange))
+
+        trading_symbols, missing = self.tradingsymbol_index.resolve(lookup_keys)
+        if missing:
+            missing_tokens = ", ".join(f"{token} ({exchange})" for token, exchange in missing)
+            error_msg = f"exchange_token(s) not found in master data: {missing_tokens}"
+            self.logger.error(error_msg)
+            raise ValueError(error_msg)
+        return [
+            f"{exchange}:{trading_symbol}"
+            for (_, exchange), trading_symbol in zip(lookup_keys, trading_symbols)
+        ]
+
+    async def ltp_quote(
+        self,
+        request_data: List[Dict[str, str]],
+        max_age: Optional[float] = None,
+        errors: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
         """
         Retrieve the latest traded price (LTP) for a set of instruments.
+        Instruments streamed by the Kite ticker are answered from the quote book.
+        Chunks are sent concurrently within the quote endpoint's rate limit.
+        Small requests are merged with concurrent ones when micro-batching is enabled.
 
         Args:
             request_data (List[Dict[str, str]]): List of dicts each containing:
                 - exchange_token: str
                 - exchange: str
                 - instrument_type: str
+            max_age (Optional[float]): Maximum age in seconds of a cached quote.
+                Defaults to the LTP cache TTL; 0 forces a fresh fetch.
+            errors (Optional[Dict[str, str]]): When given, instruments that could
+                not be fetched are recorded here (error message by exchange
+                token) and the others are returned, instead of failing the call.
 
         Returns:
-            Dict[str, Any]: Mapping of "exchange:tradingsymbol" to LTP info.
+            Dict[str, Any]: Mapping of exchange_token to LTP info, each with the
+                quote's 'age' in seconds.
 
         Raises:
             ValueError: If an exchange_token is not found in master data.
             Exception: On HTTP failures or API errors.
         """
         try:
-            instrument_key_list = []
             # Map each request to an instrument key
-            for data in request_data:
-                exchange_token = data.get("exchange_token", "")
-                exchange = data.get("exchange", "NSE")
-                instrument_rows = self.master_df.filter(
-                    (pl.col('exchange_token') == int(exchange_token)) &
-                    (pl.col('exchange') == exchange)
-                )
-               
-                if instrument_rows.is_empty():
-                    error_msg = f"exchange_token: {exchange_token} not found in master data."
-                    self.logger.error(error_msg)
-                    raise ValueError(error_msg)
-                trading_symbol = instrument_rows['tradingsymbol'][0]
-                instrument_key_list.append(f"{exchange}:{trading_symbol}")
-              
+            instrument_key_list = self._resolve_instrument_keys(request_data)
 
             # Chunk requests to avoid URL length limits
             CHUNK_SIZE = 750
-            combined_response = {}
-            for chunk in [instrument_key_list[i:i+CHUNK_SIZE] for i in range(0, len(instrument_key_list), CHUNK_SIZE)]:
+
+            async def fetch_chunk(chunk: List[str]) -> Dict[str, Any]:
                 params =[('i', key) for key in chunk]
                 url = f"{self.BASE_URL}quote/ltp"
                 headers = {
                     "Authorization": f"token {self.ZERODHA_API_KEY}:{self.access_token}",
                     "X-Kite-Version": "3",
                     }
-                print(params)
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url=url, headers=headers, params=params) as response:
-                        if response.status != 200:
-                            text = await response.text()
-                            raise Exception(f"LTP HTTP {response.status}: {text}")
-                        resp_json = await response.json()
-                        if resp_json.get('status') != 'success' or 'data' not in resp_json:
-                            raise Exception(f"LTP API error: {resp_json}")
-                        return resp_json['data']
-                await asyncio.sleep(1)
-            return combined_response
+                session = self._get_session()
+                async with session.get(url=url, headers=headers, params=params) as response:
+                    if response.status != 200:
+                        text = await response.text()
+                        raise self._upstream_error(response, f"LTP HTTP {response.status}: {text}")
+                    resp_json = await response.json()
+                    if resp_json.get('status') != 'success' or 'data' not in resp_json:
+                        raise Exception(f"LTP API error: {resp_json}")
+                    # Kite keys quote data by the "exchange:tradingsymbol" it was requested with.
+                    return resp_json['data']
+
+            failures = {} if errors is not None else None
+            quotes = await self._fetch_quotes(
+                "quote", instrument_key_list, fetch_chunk, chunk_size=CHUNK_SIZE,
+                quote_type="ltp", request_key="ltp", batchable=True, max_age=max_age,
+                book_modes=("ltp", "quote", "full"), errors=failures
+            )
+            if failures:
+                errors.update(self._request_errors(request_data, instrument_key_list, failures))
+            return await self.convert_quote(response_data=quotes)
 
         except Exception as e:
             self.logger.error(f"Exception during LTP response retrieval: {e}")
             raise
+
+    async def ohlc_quote(
+        self,
+        request_data: List[Dict[str, str]],
+        interval: str = "1d",
+        max_age: Optional[float] = None,
+        errors: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Retrieve the day's OHLC and last traded price for a set of instruments.
+        Chunks are sent concurrently within the quote endpoint's rate limit.
+        Small requests are merged with concurrent ones when micro-batching is enabled.
+
+        Args:
+            request_data (List[Dict[str, str]]): List of dicts each containing:
+                - exchange_token: str
+                - exchange: str
+                - instrument_type: str
+            interval (str): OHLC interval. Kite only provides the day's OHLC, '1d'.
+            max_age (Optional[float]): Maximum age in seconds of a cached quote.
+                Defaults to the OHLC cache TTL; 0 forces a fresh fetch.
+            errors (Optional[Dict[str, str]]): When given, instruments that could
+                not be fetched are recorded here (error message by exchange
+                token) and the others are returned, instead of failing the call.
+
+        Returns:
+            Dict[str, Any]: Mapping of exchange_token to OHLC info, each with the
+                quote's 'age' in seconds.
+
+        Raises:
+            ValueError: If an exchange_token is not found in master data, or the
+                interval is not '1d'.
+            Exception: On HTTP failures or API errors.
+        """
+        try:
+            if interval != "1d":
+                raise ValueError(f"Invalid interval: {interval}. Valid intervals are: ['1d']")
+
+            instrument_key_list = self._resolve_instrument_keys(request_data)
+
+            # Chunk requests to avoid URL length limits
+            CHUNK_SIZE = 750
+
+            async def fetch_chunk(chunk: List[str]) -> Dict[str, Any]:
+                params = [('i', key) for key in chunk]
+                url = f"{self.BASE_URL}quote/ohlc"
+                headers = {
+                    "Authorization": f"token {self.ZERODHA_API_KEY}:{self.access_token}",
+                    "X-Kite-Version": "3",
+                    }
+                session = self._get_session()
+                async with session.get(url=url, headers=headers, params=params) as response:
+                    if response.status != 200:
+                        text = await response.text()
+                        raise self._upstream_error(response, f"OHLC HTTP {response.status}: {text}")
+                    resp_json = await response.json()
+                    if resp_json.get('status') != 'success' or 'data' not in resp_json:
+                        raise Exception(f"OHLC API error: {resp_json}")
+                    return resp_json['data']
+
+            failures = {} if errors is not None else None
+            quotes = await self._fetch_quotes(
+                "quote", instrument_key_list, fetch_chunk, chunk_size=CHUNK_SIZE,
+                quote_type="ohlc", request_key=("ohlc", interval), batchable=True, max_age=max_age,
+                errors=failures
+            )
+            if failures:
+                errors.update(self._request_errors(request_data, instrument_key_list, failures))
+            return await self.convert_quote(response_data=quotes)
+
+        except Exception as e:
+            self.logger.error(f"Exception during OHLC quote retrieval: {e}")
+            raise
+
     async def historical_data(
         self, exchange, exchange_token, instrument_type, interval, from_date, to_date
-    ):
+    ) -> List[Dict[str, Any]]:
         """
-        Proxy to BaseBroker.historical_data for fetching historical candles.
+        Get historical candle data for an instrument from the Kite historical API.
+        The date range is split into the fewest requests Kite's range limit for
+        the interval allows (HISTORY_WINDOW_DAYS), fetched concurrently and
+        merged in date order (see BaseBroker._fetch_history).
+
+        Args:
+            exchange (str): Exchange name (e.g., 'NSE', 'BSE').
+            exchange_token (str): Exchange token for the instrument.
+            instrument_type (str): Type of instrument (e.g., 'EQ', 'FUT').
+            interval (str): Kite candle interval (e.g., 'minute', '15minute', 'day').
+            from_date (str): Start date in 'YYYY-MM-DD' format.
+            to_date (str): End date in 'YYYY-MM-DD' format.
 
         Returns:
-            pl.DataFrame: Candle data frame.
+            List[Dict[str, Any]]: Candles with datetime, open, high, low, close,
+                volume, oi fields, oldest first.
+
+        Raises:
+            ValueError: If the instrument, the dates or the interval are invalid.
+            Exception: On HTTP failures or API errors.
         """
-        return await super().historical_data(
-            exchange, exchange_token, instrument_type, interval, from_date, to_date
-        )
-    
+        try:
+            instrument_key = self._resolve_instrument_keys([{
+                "exchange_token": exchange_token,
+                "exchange": exchange,
+                "instrument_type": instrument_type,
+            }])[0]
+            instrument_token = self.instrument_token_index.get(instrument_key)
+            if instrument_token is None:
+                raise ValueError(f"instrument_token not found in master data: {instrument_key}")
+
+            async def fetch_window(window_from: str, window_to: str) -> List[List[Any]]:
+                url = f"{self.BASE_URL}instruments/historical/{instrument_token}/{interval}"
+                headers = {
+                    "Authorization": f"token {self.ZERODHA_API_KEY}:{self.access_token}",
+                    "X-Kite-Version": "3",
+                    }
+                params = {
+                    "from": f"{window_from} 00:00:00",
+                    "to": f"{window_to} 23:59:59",
+                    "oi": 1,
+                }
+                session = self._get_session()
+                async with session.get(url=url, headers=headers, params=params) as response:
+                    if response.status != 200:
+                        text = await response.text()
+                        raise self._upstream_error(
+                            response, f"Historical HTTP {response.status} for {window_from} to {window_to}: {text}"
+                        )
+                    resp_json = await response.json()
+                    if resp_json.get('status') != 'success' or 'data' not in resp_json:
+                        raise Exception(f"Historical API error: {resp_json}")
+                    return resp_json['data'].get('candles', [])
+
+            return await self._fetch_history(exchange, instrument_key, interval, from_date, to_date, fetch_window)
+
+        except Exception as e:
+            self.logger.error(f"Exception while retrieving historical data: {e}")
+            raise
+
     async def convert_quote(self, response_data: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
         """
         Converts instrument tokens in the quote data to exchange tokens.
 
+        Instruments are enriched through the reverse instrument_token index in a
+        single pass over the response.
+
         Args:
             ltp_response_data (dict): A dictionary where each value contains quote data with an 'instrument_token' key.
 
         Returns:
-            dict: A dictionary with trading symbols as keys and quote data as values.
+            dict: A dictionary with exchange tokens as keys and quote data as values.
 
         Raises:
             Exception: If an error occurs during the conversion process.
         """
         output_dict = {}
+        reverse_index = self.instrument_token_reverse_index
         for ltp_data, value in response_data.items():
-            instrument_key = value['']
-            if instrument_key is None:
+            instrument_token = value.get('instrument_token')
+            if instrument_token is None:
                 self.logger.error(f"Missing 'instrument_token' in quote data for key {ltp_data}")
                 continue
-            try:
-                temp_df = self.master_df.filter(
-                    pl.col('exchange_token') == instrument_key
-                )
-                value["tradingsymbol"] = temp_df["tradingsymbol"][0]
-                value["instrument_type"] = temp_df["exchange"][0].split("_")[1] 
-                if temp_df.is_empty():
-                    self.logger.error(f"No matching instrument for token {instrument_key}")
-                    continue
-                new_key = temp_df['exchange_token'][0]
-                output_dict[new_key] = value
-
-            except Exception as e:
-                self.logger.error(f"Error converting instrument token {instrument_key}: {e}")
-                raise
-        
+            instrument = reverse_index.get(instrument_token)
+            if instrument is None:
+                self.logger.error(f"No matching instrument for token {instrument_token}")
+                continue
+            exchange_token, trading_symbol, _, instrument_type = instrument
+            value["tradingsymbol"] = trading_symbol
+            value["instrument_type"] = instrument_type
+            output_dict[exchange_token] = value
+
         return output_dict
 
-    async def full_market_quote(self, exchange_token, exchange, instrument_type):
+    async def full_market_quote(
+        self,
+        request_data: List[Dict[str, str]],
+        max_age: Optional[float] = None,
+        errors: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
         """
-        Proxy to BaseBroker.full_market_quote for fetching intraday OHLC and volume.
+        Retrieve full market quotes (OHLC, volume, OI, depth) for a set of instruments.
+        Instruments streamed in full mode by the Kite ticker are answered from the quote book.
+        Chunks (the quote API takes up to 500 instruments) are sent concurrently
+        within the quote endpoint's rate limit.
+
+        Args:
+            request_data (List[Dict[str, str]]): List of dicts each containing:
+                - exchange_token: str
+                - exchange: str
+                - instrument_type: str
+            max_age (Optional[float]): Maximum age in seconds of a cached quote.
+                Defaults to the full quote cache TTL; 0 forces a fresh fetch.
+            errors (Optional[Dict[str, str]]): When given, instruments that could
+                not be fetched are recorded here (error message by exchange
+                token) and the others are returned, instead of failing the call.
 
         Returns:
-            dict: Market quote data including 'ohlc', 'volume', 'oi', 'timestamp'.
+            Dict[str, Any]: Mapping of exchange_token to full quote data, each
+                with the quote's 'age' in seconds.
+
+        Raises:
+            ValueError: If an exchange_token is not found in master data.
+            Exception: On HTTP failures or API errors.
         """
-        return await super().full_market_quote(
-            exchange_token, exchange, instrument_type
-        )
+        try:
+            instrument_key_list = self._resolve_instrument_keys(request_data)
+
+            CHUNK_SIZE = 450
+
+            async def fetch_chunk(chunk: List[str]) -> Dict[str, Any]:
+                params = [('i', key) for key in chunk]
+                url = f"{self.BASE_URL}quote"
+                headers = {
+                    "Authorization": f"token {self.ZERODHA_API_KEY}:{self.access_token}",
+                    "X-Kite-Version": "3",
+                    }
+                session = self._get_session()
+                async with session.get(url=url, headers=headers, params=params) as response:
+                    if response.status != 200:
+                        text = await response.text()
+                        raise self._upstream_error(response, f"Quote HTTP {response.status}: {text}")
+                    resp_json = await response.json()
+                    if resp_json.get('status') != 'success' or 'data' not in resp_json:
+                        raise Exception(f"Quote API error: {resp_json}")
+                    return resp_json['data']
+
+            failures = {} if errors is not None else None
+            quotes = await self._fetch_quotes(
+                "quote", instrument_key_list, fetch_chunk, chunk_size=CHUNK_SIZE,
+                quote_type="full", max_age=max_age, book_modes=("full",), errors=failures
+            )
+            if failures:
+                errors.update(self._request_errors(request_data, instrument_key_list, failures))
+            return await self.convert_quote(response_data=quotes)
+
+        except Exception as e:
+            self.logger.error(f"Exception during full market quote retrieval: {e}")
+            raise
 
     async def fetch_access_token(self) -> str:
         """
@@ -0,0 +1,330 @@
+"""
+Zerodha ticker module.
+
+This module contains the ZerodhaTicker class that streams the Kite Connect
+WebSocket ticker into a QuoteBook, and the vectorized decoder for its binary
+tick packets.
+"""
+
+import json
+import aiohttp
+import numpy as np
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
+
+from ..base.master_cache import EXCHANGE_TIMEZONE
+from ..base.market_feed import MarketFeed
+
+
+# Packet length -> ticker mode. Index packets (28, 32 bytes) carry no trade
+# or depth fields.
+PACKET_MODES = {
+    8: "ltp",
+    28: "quote",
+    32: "full",
+    44: "quote",
+    184: "full",
+}
+
+# Prices are sent as integers; divisor per exchange segment (the low byte of
+# the instrument token). CDS is quoted to 7 decimals, BCD to 4, all else to 2.
+_PRICE_DIVISORS = np.full(256, 100.0)
+_PRICE_DIVISORS[3] = 10000000.0
+_PRICE_DIVISORS[6] = 10000.0
+
+_DEPTH_LEVELS = 5
+_UTC_OFFSET = int(datetime(2000, 1, 1, tzinfo=EXCHANGE_TIMEZONE).utcoffset().total_seconds())
+
+
+def _packet_words(message: bytes) -> Dict[int, np.ndarray]:
+    """
+    Split a ticker message into packets, grouped by packet length.
+
+    A message is a big-endian packet count followed by (length, packet)
+    pairs. When all packets have the same length, which is the case unless
+    instruments are subscribed in different modes, each group is a zero-copy
+    strided view over the message.
+
+    Args:
+        message (bytes): A binary ticker message.
+
+    Returns:
+        Dict[int, np.ndarray]: Per packet length, a (packets, length / 4)
+            matrix of big-endian unsigned 32-bit words. Empty for heartbeats.
+
+    Raises:
+        ValueError: If the message is truncated.
+    """
+    if len(message) < 4:
+        return {}
+    count = int.from_bytes(message[0:2], "big")
+    first_length = int.from_bytes(message[2:4], "big")
+    stride = first_length + 2
+    if first_length % 4 == 0 and len(message) == 2 + count * stride:
+        lengths = np.ndarray((count,), dtype=">u2", buffer=message, offset=2, strides=(stride,))
+        if (lengths == first_length).all():
+            words = np.ndarray(
+                (count, first_length // 4), dtype=">u4", buffer=message, offset=4, strides=(stride, 4)
+            )
+            return {first_length: words}
+
+    # Mixed packet lengths: locate the packets, then gather each length's packets.
+    starts: Dict[int, List[int]] = {}
+    position = 2
+    for _ in range(count):
+        length = int.from_bytes(message[position:position + 2], "big")
+        if position + 2 + length > len(message):
+            raise ValueError(f"Truncated ticker message: packet at {position} overruns {len(message)} bytes")
+        starts.setdefault(length, []).append(position + 2)
+        position += 2 + length
+
+    raw = np.frombuffer(message, dtype=np.uint8)
+    groups = {}
+    for length, offsets in starts.items():
+        if length % 4:
+            continue
+        index = np.asarray(offsets)[:, None] + np.arange(length)
+        groups[length] = raw[index].view(">u4")
+    return groups
+
+
+def _timestamps(epoch_seconds: np.ndarray) -> np.ndarray:
+    """
+    Format epoch seconds as exchange-time 'YYYY-MM-DD HH:MM:SS' strings.
+    """
+    local = (epoch_seconds.astype(np.int64) + _UTC_OFFSET).astype("datetime64[s]")
+    return np.char.replace(np.datetime_as_string(local), "T", " ")
+
+
+def _decode_packets(length: int, words: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Decode packets of one length into columns.
+
+    Args:
+        length (int): Packet length in bytes, a PACKET_MODES key.
+        words (np.ndarray): (packets, length / 4) big-endian word matrix.
+
+    Returns:
+        Dict[str, np.ndarray]: Columns named after the Kite quote fields.
+    """
+    tokens = words[:, 0].astype(np.int64)
+    divisors = _PRICE_DIVISORS[tokens & 0xFF]
+    columns = {
+        "instrument_token": tokens,
+        "last_price": words[:, 1] / divisors,
+    }
+    if length in (28, 32):
+        columns["high"] = words[:, 2] / divisors
+        columns["low"] = words[:, 3] / divisors
+        columns["open"] = words[:, 4] / divisors
+        columns["close"] = words[:, 5] / divisors
+        columns["net_change"] = columns["last_price"] - columns["close"]
+        if length == 32:
+            columns["timestamp"] = words[:, 7]
+    elif length in (44, 184):
+        columns["last_quantity"] = words[:, 2].astype(np.int64)
+        columns["average_price"] = words[:, 3] / divisors
+        columns["volume"] = words[:, 4].astype(np.int64)
+        columns["buy_quantity"] = words[:, 5].astype(np.int64)
+        columns["sell_quantity"] = words[:, 6].astype(np.int64)
+        columns["open"] = words[:, 7] / divisors
+        columns["high"] = words[:, 8] / divisors
+        columns["low"] = words[:, 9] / divisors
+        columns["close"] = words[:, 10] / divisors
+        columns["net_change"] = columns["last_price"] - columns["close"]
+        if length == 184:
+            columns["last_trade_time"] = words[:, 11]
+            columns["oi"] = words[:, 12].astype(np.int64)
+            columns["oi_day_high"] = words[:, 13].astype(np.int64)
+            columns["oi_day_low"] = words[:, 14].astype(np.int64)
+            columns["timestamp"] = words[:, 15]
+            # 10 levels (5 bids, then 5 asks) of quantity, price and a 16-bit
+            # order count padded to a word.
+            depth = words[:, 16:46].reshape(-1, 2 * _DEPTH_LEVELS, 3)
+            columns["depth_quantity"] = depth[:, :, 0].astype(np.int64)
+            columns["depth_price"] = depth[:, :, 1] / divisors[:, None]
+            columns["depth_orders"] = (depth[:, :, 2] >> 16).astype(np.int64)
+    return columns
+
+
+def decode_message(message: bytes) -> List[Tuple[str, Dict[str, np.ndarray]]]:
+    """
+    Decode a binary ticker message into columnar tick batches.
+
+    Packets are unpacked in bulk per packet length; no per-field Python work
+    is done. Timestamps are left as epoch seconds.
+
+    Args:
+        message (bytes): A binary ticker message.
+
+    Returns:
+        List[Tuple[str, Dict[str, np.ndarray]]]: (mode, columns) per packet
+            layout in the message, in the Kite quote field names. Empty for
+            heartbeats.
+
+    Raises:
+        ValueError: If the message is truncated.
+    """
+    batches = []
+    for length, words in _packet_words(message).items():
+        mode = PACKET_MODES.get(length)
+        if mode is not None:
+            batches.append((mode, _decode_packets(length, words)))
+    return batches
+
+
+def batch_quotes(columns: Dict[str, np.ndarray]) -> Dict[int, Dict[str, Any]]:
+    """
+    Convert a decoded tick batch to quotes in the Kite REST quote format.
+
+    Args:
+        columns (Dict[str, np.ndarray]): Columns from decode_message.
+
+    Returns:
+        Dict[int, Dict[str, Any]]: Quotes keyed by instrument token; the last
+            tick of an instrument in the batch wins.
+    """
+    tokens = columns["instrument_token"].tolist()
+    last_prices = columns["last_price"].tolist()
+    if "close" not in columns:
+        return {
+            token: {"instrument_token": token, "last_price": last_price}
+            for token, last_price in zip(tokens, last_prices)
+        }
+
+    rows = [tokens, last_prices] + [
+        columns[name].tolist() for name in ("open", "high", "low", "close", "net_change")
+    ]
+    quotes = {
+        token: {
+            "instrument_token": token,
+            "last_price": last_price,
+            "ohlc": {"open": open_, "high": high, "low": low, "close": close},
+            "net_change": net_change,
+        }
+        for token, last_price, open_, high, low, close, net_change in zip(*rows)
+    }
+
+    if "timestamp" in columns:
+        for token, timestamp in zip(tokens, _timestamps(columns["timestamp"]).tolist()):
+            quotes[token]["timestamp"] = timestamp
+
+    if "volume" in columns:
+        fields = ["last_quantity", "average_price", "volume", "buy_quantity", "sell_quantity"]
+        if "oi" in columns:
+            fields += ["oi", "oi_day_high", "oi_day_low"]
+        values = [columns[name].tolist() for name in fields]
+        for token, *row in zip(tokens, *values):
+            quotes[token].update(zip(fields, row))
+
+    if "last_trade_time" in columns:
+        last_trade_times = _timestamps(columns["last_trade_time"]).tolist()
+        quantities = columns["depth_quantity"].tolist()
+        prices = columns["depth_price"].tolist()
+        orders = columns["depth_orders"].tolist()
+        for token, last_trade_time, level_quantities, level_prices, level_orders in zip(
+            tokens, last_trade_times, quantities, prices, orders
+        ):
+            levels = [
+                {"price": price, "quantity": quantity, "orders": order_count}
+                for quantity, price, order_count in zip(level_quantities, level_prices, level_orders)
+            ]
+            quote = quotes[token]
+            quote["last_trade_time"] = last_trade_time
+            quote["depth"] = {"buy": levels[:_DEPTH_LEVELS], "sell": levels[_DEPTH_LEVELS:]}
+    return quotes
+
+
+class ZerodhaTicker(MarketFeed):
+    """
+    Kite Connect WebSocket ticker.
+
+    Instruments are subscribed by instrument token and set to the feed's mode;
+    ticks arrive as binary messages of packed big-endian packets and are
+    decoded in bulk with decode_message. Quotes are kept in the book under the
+    broker's 'EXCHANGE:TRADINGSYMBOL' instrument keys.
+    """
+
+    MODES = {
+        "ltp": "ltp",
+        "quote": "quote",
+        "full": "full",
+    }
+
+    # Kite Connect allows 3000 instruments per connection and 3 connections per API key.
+    MAX_INSTRUMENTS = {
+        "ltp": 3000,
+        "quote": 3000,
+        "full": 3000,
+    }
+    MAX_CONNECTIONS = 3
+
+    WS_URL = "wss://ws.kite.trade"
+
+    def __init__(self, broker: Any, quote_book: Any, mode: str = "full"):
+        super().__init__(broker, quote_book, mode)
+        self._tokens: Dict[str, int] = {}
+        self._keys_by_token: Dict[int, str] = {}
+
+    async def subscribe(self, instrument_keys: Iterable[str]) -> None:
+        """
+        Subscribe instruments to the ticker.
+
+        Args:
+            instrument_keys (Iterable[str]): 'EXCHANGE:TRADINGSYMBOL' instrument keys.
+
+        Raises:
+            ValueError: If an instrument key is not in the master data.
+        """
+        instrument_keys = list(instrument_keys)
+        token_index = self.broker.instrument_token_index
+        tokens, missing = token_index.resolve(instrument_keys)
+        if missing:
+            raise ValueError(f"Instrument key(s) not found in master data: {missing}")
+        for instrument_key, token in zip(instrument_keys, tokens):
+            self._tokens[instrument_key] = token
+            self._keys_by_token[token] = instrument_key
+        await super().subscribe(instrument_keys)
+
+    async def unsubscribe(self, instrument_keys: Iterable[str]) -> None:
+        instrument_keys = [key for key in instrument_keys if key in self.subscriptions]
+        await super().unsubscribe(instrument_keys)
+        for instrument_key in instrument_keys:
+            self._keys_by_token.pop(self._tokens.pop(instrument_key), None)
+
+    async def _connect_url(self) -> str:
+        return f"{self.WS_URL}?api_key={self.broker.ZERODHA_API_KEY}&access_token={self.broker.access_token}"
+
+    async def _send_subscription(
+        self,
+        ws: aiohttp.ClientWebSocketResponse,
+        method: str,
+        instrument_keys: List[str]
+    ) -> None:
+        tokens = [self._tokens[key] for key in instrument_keys]
+        if method == "sub":
+            await ws.send_str(json.dumps({"a": "subscribe", "v": tokens}))
+            await ws.send_str(json.dumps({"a": "mode", "v": [self.mode, tokens]}))
+        else:
+            await ws.send_str(json.dumps({"a": "unsubscribe", "v": tokens}))
+
+    def _decode(self, frame: bytes) -> Dict[str, Dict[str, Any]]:
+        keys_by_token = self._keys_by_token
+        quotes = {}
+        for _, columns in decode_message(frame):
+            for token, quote in batch_quotes(columns).items():
+                instrument_key = keys_by_token.get(token)
+                if instrument_key is not None:
+                    quotes[instrument_key] = quote
+        return quotes
+
+    def _on_text(self, text: str) -> None:
+        """
+        Log ticker errors; order updates and other messages are ignored.
+        """
+        try:
+            message = json.loads(text)
+        except ValueError:
+            return
+        if message.get("type") == "error":
+            self.logger.warning(f"Zerodha ticker error: {message.get('data')}")
@@ -8,11 +8,14 @@ and middleware for the broker-agnostic data endpoints system.
 import os
 import json
 import boto3
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from api.endpoints import router as api_router
 from services.token_rotation_service import TokenRotationService
+from services.broker_pool import BrokerPool
+from services.quote_stream import QuoteStreamService
 from logger import get_logger
 
 
@@ -45,7 +48,9 @@ app.include_router(api_router, prefix="/api/v1", tags=["data"])
 # Broker configuration
 secrets_client = boto3.client("secretsmanager")
 
-upstox_config_secret = secrets_client.get_secret_value(SecretId="my_upstox_config")
+UPSTOX_CONFIG_SECRET_NAME = os.getenv("UPSTOX_CONFIG_SECRET_NAME", "my_upstox_config")
+
+upstox_config_secret = secrets_client.get_secret_value(SecretId=UPSTOX_CONFIG_SECRET_NAME)
 zerodha_config_secret = secrets_client.get_secret_value(SecretId="my_zerodha_config")
 
 upstox_config_json = json.loads(upstox_config_secret["SecretString"])
@@ -58,29 +63,58 @@ broker_config = {
     # "dhan": dhan_config_json
 }
 
+# Brokers served by the API, keyed by broker type
+api_broker_config = {
+    "upstox": upstox_config_json,
+    "zerodha": zerodha_config_json
+}
+
 # Token rotation service
 token_rotation_service = None
 
+# Pool of initialized broker instances shared by all requests
+broker_pool = None
+
+# Shared upstream sources of the quote streaming endpoints
+quote_stream_service = None
+
 @app.on_event("startup")
 async def startup_event():
     """
     Initialize services on application startup.
     
     This function is called when the FastAPI application starts up.
-    It initializes the token rotation service and starts it in a background task.
+    It warms up the broker pool, so no request pays the broker initialization
+    cost, then starts the token rotation service in a background task.
     """
-    global token_rotation_service
+    global token_rotation_service, broker_pool, quote_stream_service
     
     logger.info("Starting application")
     
+    # Build and initialize the shared broker instances
+    broker_pool = BrokerPool(brokers=api_broker_config)
+    await broker_pool.initialize()
+    app.state.broker_pool = broker_pool
+    
+    # Keep the master refresh task so shutdown can stop it before closing the pool
+    app.state.broker_pool_task = asyncio.create_task(broker_pool.start())
+
+    # Quote streams poll each broker for all their clients, as often as the
+    # fastest client takes updates and at least once per interval
+    quote_stream_service = QuoteStreamService(
+        broker_pool=broker_pool,
+        poll_interval=float(os.getenv("QUOTE_STREAM_POLL_INTERVAL", "1.0"))
+    )
+    app.state.quote_stream_service = quote_stream_service
+    
     # Initialize token rotation service
     token_rotation_service = TokenRotationService(
         brokers=broker_config,
-        health_check_interval=300  # 5 seconds
+        health_check_interval=300,  # 5 seconds
+        broker_pool=broker_pool
     )
     
     # Start token rotation service in background
-    import asyncio
     asyncio.create_task(token_rotation_service.start())
     
     logger.info("Application startup complete")
@@ -95,7 +129,20 @@ async def shutdown_event():
     """
     logger.info("Shutting down application")
     
-    # Add any cleanup operations here
+    # Stop the quote streams' polling before closing the brokers
+    if quote_stream_service is not None:
+        await quote_stream_service.close()
+
+    # Stop refreshing the pooled brokers, then close their HTTP sessions
+    broker_pool_task = getattr(app.state, "broker_pool_task", None)
+    if broker_pool_task is not None:
+        broker_pool_task.cancel()
+        try:
+            await broker_pool_task
+        except asyncio.CancelledError:
+            pass
+    if broker_pool is not None:
+        await broker_pool.close()
     
     logger.info("Application shutdown complete")
 
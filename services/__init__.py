@@ -5,5 +5,6 @@ This module initializes the service components for the broker-agnostic data endp
 """
 
 from .token_rotation_service import TokenRotationService
+from .broker_pool import BrokerPool
 
-__all__ = ['TokenRotationService']
+__all__ = ['TokenRotationService', 'BrokerPool']
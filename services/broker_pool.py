@@ -0,0 +1,303 @@
+"""
+Broker pool service module.
+
+This module contains the BrokerPool class that keeps a process-wide registry
+of initialized broker instances, so API requests never pay the cost of
+fetching tokens or downloading master data.
+"""
+
+import asyncio
+from typing import Dict, Any, Optional, Set, Tuple
+
+from brokers.factory import BrokerFactory
+from brokers.base.broker import BaseBroker
+from brokers.base.master_cache import current_trading_date
+from logger import get_logger
+
+
+class BrokerPool:
+    """
+    Registry of long-lived, initialized broker instances.
+
+    Instances are keyed by (broker_type, account_name). They are built once at
+    startup and handed out to every request. Refreshing an instance builds and
+    initializes a replacement in the background and swaps it in only once it is
+    ready, so in-flight and new requests keep using the previous instance
+    until then.
+
+    Attributes:
+        logger (logging.Logger): Logger instance for the pool.
+        configs (Dict[Tuple[str, str], Dict[str, Any]]): Broker configuration
+            keyed by (broker_type, account_name).
+        broker_instances (Dict[Tuple[str, str], BaseBroker]): Initialized brokers
+            keyed by (broker_type, account_name).
+    """
+
+    DEFAULT_ACCOUNT = "default"
+
+    # Seconds a replaced instance stays open for requests already holding it.
+    RETIRE_GRACE_PERIOD = 60
+
+    def __init__(self, brokers: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Initialize the broker pool.
+
+        Args:
+            brokers (Optional[Dict[str, Dict[str, Any]]]): Configuration for the
+                default account of each broker. Format: {broker_type: config}.
+                Additional accounts can be added with `register`.
+        """
+        self.logger = get_logger(
+            name="BrokerPool",
+            log_group="DataPipeline",
+            log_stream="broker_pool"
+        )
+        self.configs: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.broker_instances: Dict[Tuple[str, str], BaseBroker] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+        self._retiring: Set[asyncio.Task] = set()
+
+        for broker_type, config in (brokers or {}).items():
+            self.register(broker_type, config)
+
+    @classmethod
+    def _key(cls, broker_type: str, account_name: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Build the registry key for a broker account.
+
+        Args:
+            broker_type (str): The type of broker (e.g., 'upstox', 'zerodha').
+            account_name (Optional[str]): The account name. Defaults to the default account.
+
+        Returns:
+            Tuple[str, str]: Normalized (broker_type, account_name) key.
+        """
+        return broker_type.lower(), account_name or cls.DEFAULT_ACCOUNT
+
+    def register(self, broker_type: str, config: Dict[str, Any], account_name: Optional[str] = None) -> None:
+        """
+        Register the configuration for a broker account.
+
+        The instance itself is built by `initialize`, `refresh` or on first use.
+
+        Args:
+            broker_type (str): The type of broker.
+            config (Dict[str, Any]): Configuration dictionary for the broker.
+            account_name (Optional[str]): The account name. Defaults to the default account.
+        """
+        key = self._key(broker_type, account_name)
+        self.configs[key] = config
+        self._locks.setdefault(key, asyncio.Lock())
+
+    async def initialize(self) -> None:
+        """
+        Build and initialize every registered broker account concurrently.
+
+        Failures are logged and do not stop other brokers from starting; a failed
+        account is retried on its first request.
+        """
+        self.logger.info(f"Initializing broker pool for {len(self.configs)} account(s)")
+        results = await asyncio.gather(
+            *(self.refresh(broker_type, account_name) for broker_type, account_name in self.configs),
+            return_exceptions=True
+        )
+        for (broker_type, account_name), result in zip(list(self.configs), results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Failed to initialize {broker_type}/{account_name} broker: {result}")
+
+    async def get(self, broker_type: str, account_name: Optional[str] = None) -> BaseBroker:
+        """
+        Get the initialized broker instance for an account.
+
+        Args:
+            broker_type (str): The type of broker.
+            account_name (Optional[str]): The account name. Defaults to the default account.
+
+        Returns:
+            BaseBroker: The pooled, initialized broker instance.
+
+        Raises:
+            ValueError: If no configuration is registered for the account.
+            Exception: If the broker has to be built and initialization fails.
+        """
+        key = self._key(broker_type, account_name)
+        broker = self.broker_instances.get(key)
+        if broker is not None:
+            return broker
+
+        if key not in self.configs:
+            raise ValueError(f"Broker '{key[0]}' with account '{key[1]}' is not configured")
+
+        # Cold path: the account failed to start up. Only one request builds it.
+        async with self._locks[key]:
+            broker = self.broker_instances.get(key)
+            if broker is None:
+                broker = await self._build(key)
+                self.broker_instances[key] = broker
+            return broker
+
+    async def refresh(self, broker_type: str, account_name: Optional[str] = None) -> BaseBroker:
+        """
+        Build a fresh instance for an account and swap it into the pool.
+
+        The current instance keeps serving requests until the replacement is
+        fully initialized.
+
+        Args:
+            broker_type (str): The type of broker.
+            account_name (Optional[str]): The account name. Defaults to the default account.
+
+        Returns:
+            BaseBroker: The newly initialized broker instance.
+
+        Raises:
+            ValueError: If no configuration is registered for the account.
+            Exception: If initialization of the replacement fails.
+        """
+        key = self._key(broker_type, account_name)
+        if key not in self.configs:
+            raise ValueError(f"Broker '{key[0]}' with account '{key[1]}' is not configured")
+
+        async with self._locks[key]:
+            broker = await self._build(key)
+            previous = self.replace(broker_type, broker, account_name)
+            if previous is not None:
+                self._retire(previous)
+            return broker
+
+    async def refresh_token(self, broker_type: str, account_name: Optional[str] = None) -> BaseBroker:
+        """
+        Load a rotated access token into the pooled instance of an account.
+
+        Unlike `refresh`, the instance is kept, together with its master data,
+        quote cache, tick store and market data feed subscriptions. An account
+        without a pooled instance is built instead.
+
+        Args:
+            broker_type (str): The type of broker.
+            account_name (Optional[str]): The account name. Defaults to the default account.
+
+        Returns:
+            BaseBroker: The pooled broker instance.
+
+        Raises:
+            ValueError: If no configuration is registered for the account.
+            Exception: If fetching the token or building the instance fails.
+        """
+        key = self._key(broker_type, account_name)
+        if key not in self.configs:
+            raise ValueError(f"Broker '{key[0]}' with account '{key[1]}' is not configured")
+
+        async with self._locks[key]:
+            broker = self.broker_instances.get(key)
+            if broker is None:
+                broker = await self._build(key)
+                self.broker_instances[key] = broker
+            else:
+                await broker.refresh_access_token()
+                self.logger.info(f"Refreshed access token of {key[0]}/{key[1]} broker.")
+            return broker
+
+    def replace(self, broker_type: str, broker: BaseBroker, account_name: Optional[str] = None) -> Optional[BaseBroker]:
+        """
+        Swap an already initialized broker instance into the pool.
+
+        Args:
+            broker_type (str): The type of broker.
+            broker (BaseBroker): The initialized broker instance.
+            account_name (Optional[str]): The account name. Defaults to the default account.
+
+        Returns:
+            Optional[BaseBroker]: The instance that was replaced, if any.
+        """
+        key = self._key(broker_type, account_name)
+        previous = self.broker_instances.get(key)
+        self.broker_instances[key] = broker
+        self.logger.info(f"Swapped in new {key[0]}/{key[1]} broker instance.")
+        return previous
+
+    async def refresh_all(self) -> None:
+        """
+        Refresh every registered broker account, e.g. after the daily master update.
+        """
+        for broker_type, account_name in list(self.configs):
+            try:
+                await self.refresh(broker_type, account_name)
+            except Exception as e:
+                self.logger.error(f"Failed to refresh {broker_type}/{account_name} broker: {e}")
+
+    def _retire(self, broker: BaseBroker) -> None:
+        """
+        Close a replaced broker once requests that still hold it have finished.
+
+        Args:
+            broker (BaseBroker): The broker instance that was swapped out.
+        """
+        async def close_later():
+            await asyncio.sleep(self.RETIRE_GRACE_PERIOD)
+            try:
+                await broker.close()
+            except Exception as e:
+                self.logger.warning(f"Error closing retired {broker.broker_name} broker: {e}")
+
+        task = asyncio.create_task(close_later())
+        self._retiring.add(task)
+        task.add_done_callback(self._retiring.discard)
+
+    async def close(self) -> None:
+        """
+        Close every pooled broker, e.g. from the application's shutdown hook.
+        """
+        for task in list(self._retiring):
+            task.cancel()
+        brokers = list(self.broker_instances.values())
+        self.broker_instances.clear()
+        for broker in brokers:
+            try:
+                await broker.close()
+            except Exception as e:
+                self.logger.warning(f"Error closing {broker.broker_name} broker: {e}")
+
+    async def start(self, check_interval: int = 300) -> None:
+        """
+        Keep pooled brokers on the current instrument master.
+
+        Refreshes every account whenever the exchange trading date rolls over,
+        so the daily master is loaded in the background rather than by a request.
+
+        Args:
+            check_interval (int): Interval in seconds between trading date checks.
+        """
+        trading_date = current_trading_date()
+        while True:
+            await asyncio.sleep(check_interval)
+            if current_trading_date() != trading_date:
+                trading_date = current_trading_date()
+                self.logger.info(f"Trading date rolled over to {trading_date}, refreshing brokers")
+                await self.refresh_all()
+
+    async def _build(self, key: Tuple[str, str]) -> BaseBroker:
+        """
+        Create and initialize a broker instance for a registry key.
+
+        Args:
+            key (Tuple[str, str]): The (broker_type, account_name) key.
+
+        Returns:
+            BaseBroker: The initialized broker instance.
+        """
+        broker_type, account_name = key
+        logger = get_logger(
+            name=f"{broker_type.capitalize()}Broker",
+            log_group="DataPipeline",
+            log_stream="broker"
+        )
+        # The account name keys the broker's process-wide rate governor.
+        broker = BrokerFactory.create_broker(
+            broker_type=broker_type,
+            config={**self.configs[key], "account_name": account_name},
+            logger=logger
+        )
+        await broker.initialize()
+        self.logger.info(f"Initialized {broker_type}/{account_name} broker.")
+        return broker
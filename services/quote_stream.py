@@ -0,0 +1,441 @@
+"""
+Quote streaming service module.
+
+This module contains the QuoteStreamService class that pushes conflated quote
+updates to streaming API clients from one shared upstream source per broker
+account and quote type.
+"""
+
+import time
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from services.broker_pool import BrokerPool
+from logger import get_logger
+
+
+# Quote type -> broker method polled for it.
+QUOTE_STREAM_METHODS = {
+    "ltp": "ltp_quote",
+    "full": "full_market_quote",
+}
+
+# Request identity of an instrument: (exchange_token, exchange, instrument_type).
+InstrumentId = Tuple[str, str, str]
+
+
+def _instrument_id(instrument: Dict[str, str]) -> InstrumentId:
+    return (
+        str(instrument.get("exchange_token", "")),
+        instrument.get("exchange", "NSE"),
+        instrument.get("instrument_type", ""),
+    )
+
+
+def _instrument_request(instrument_id: InstrumentId) -> Dict[str, str]:
+    exchange_token, exchange, instrument_type = instrument_id
+    return {"exchange_token": exchange_token, "exchange": exchange, "instrument_type": instrument_type}
+
+
+def _instrument_label(instrument_id: InstrumentId) -> str:
+    """
+    Format an instrument as 'EXCHANGE:INSTRUMENT_TYPE:EXCHANGE_TOKEN', the
+    form streaming clients name it in.
+    """
+    exchange_token, exchange, instrument_type = instrument_id
+    return f"{exchange}:{instrument_type}:{exchange_token}"
+
+
+def _token_batches(instrument_ids: List[InstrumentId]) -> List[Dict[str, InstrumentId]]:
+    """
+    Split instruments into batches without a repeated exchange token.
+
+    Brokers key quotes by exchange token, which instruments of different
+    exchanges or segments can share (e.g. NSE and BSE); quoting each batch
+    separately keeps every quote attributable to its instrument.
+
+    Returns:
+        List[Dict[str, InstrumentId]]: Per batch, the instruments by exchange token.
+    """
+    batches: List[Dict[str, InstrumentId]] = []
+    for instrument_id in dict.fromkeys(instrument_ids):
+        for batch in batches:
+            if instrument_id[0] not in batch:
+                batch[instrument_id[0]] = instrument_id
+                break
+        else:
+            batches.append({instrument_id[0]: instrument_id})
+    return batches
+
+
+class QuoteStream:
+    """
+    One client's conflated view of quote updates.
+
+    Updates are kept as the latest quote per instrument until the client takes
+    them, so a slow client skips intermediate updates instead of buffering
+    them: memory is bounded by the number of instruments it watches. Takes are
+    spaced at least 1 / `max_rate` seconds apart.
+
+    Attributes:
+        instruments (List[Dict[str, str]]): The instruments watched.
+        max_rate (float): Maximum updates per second delivered to the client.
+        dropped (int): Intermediate updates skipped by conflation.
+    """
+
+    def __init__(self, instruments: List[Dict[str, str]], max_rate: float):
+        """
+        Initialize the stream.
+
+        Args:
+            instruments (List[Dict[str, str]]): The instruments watched.
+            max_rate (float): Maximum updates per second delivered to the client.
+        """
+        self.instruments = instruments
+        self.max_rate = max_rate
+        self.dropped = 0
+        self.instrument_ids: Set[InstrumentId] = set(map(_instrument_id, instruments))
+        self._pending: Dict[InstrumentId, Any] = {}
+        self._ready = asyncio.Event()
+        self._last_take = 0.0
+
+    def push(self, quotes: Dict[InstrumentId, Any]) -> None:
+        """
+        Offer changed quotes; only watched ones are kept.
+
+        Args:
+            quotes (Dict[InstrumentId, Any]): Changed quotes keyed by
+                (exchange_token, exchange, instrument_type).
+        """
+        for instrument_id in self.instrument_ids.intersection(quotes):
+            if instrument_id in self._pending:
+                self.dropped += 1
+            self._pending[instrument_id] = quotes[instrument_id]
+        if self._pending:
+            self._ready.set()
+
+    async def next(self) -> Dict[str, Any]:
+        """
+        Wait for the next conflated update.
+
+        Returns:
+            Dict[str, Any]: The latest quote of every instrument that changed
+                since the previous update, keyed by
+                'EXCHANGE:INSTRUMENT_TYPE:EXCHANGE_TOKEN'.
+        """
+        await self._ready.wait()
+        wait = self._last_take + 1 / self.max_rate - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        update, self._pending = self._pending, {}
+        self._ready.clear()
+        self._last_take = time.monotonic()
+        return {_instrument_label(instrument_id): quote for instrument_id, quote in update.items()}
+
+
+class _QuoteHub:
+    """
+    Shared upstream source for one broker account and quote type.
+
+    Polls the broker for the union of the instruments its streams watch and
+    pushes the quotes that changed. It polls as often as its fastest stream
+    takes updates, and at least once per `poll_interval`; polls accept cached
+    quotes no older than the poll spacing, so the broker's quote cache TTL does
+    not cap the update rate. The instruments are held on the broker
+    (acquire_instruments), so their ticks are recorded and, when the broker
+    streams a market data feed, polls are answered from its quote book
+    however long ago a quote last changed.
+    """
+
+    def __init__(
+        self,
+        broker_pool: BrokerPool,
+        broker_type: str,
+        account_name: Optional[str],
+        quote_type: str,
+        poll_interval: float,
+        logger
+    ):
+        self.broker_pool = broker_pool
+        self.broker_type = broker_type
+        self.account_name = account_name
+        self.method = QUOTE_STREAM_METHODS[quote_type]
+        self.poll_interval = poll_interval
+        self.logger = logger
+        self.streams: Set[QuoteStream] = set()
+        self._refcounts: Dict[InstrumentId, int] = {}
+        self._last: Dict[InstrumentId, Dict[str, Any]] = {}
+        self._held_broker = None
+        self._held_keys: List[str] = []
+        self._task: Optional[asyncio.Task] = None
+        # Set when a stream is added, so the poll wait is recomputed.
+        self._rescheduled = asyncio.Event()
+
+    async def add(self, stream: QuoteStream) -> None:
+        """
+        Start serving a stream, sending it the current quotes first. If its
+        instruments cannot be held on the broker, the hub is left unchanged.
+
+        Raises:
+            ValueError: If an instrument is unknown to the broker.
+        """
+        broker = await self.broker_pool.get(self.broker_type, self.account_name)
+        snapshot = await self._quotes(broker, list(map(_instrument_id, stream.instruments)))
+
+        new_instruments = False
+        for instrument in stream.instruments:
+            instrument_id = _instrument_id(instrument)
+            new_instruments |= instrument_id not in self._refcounts
+            self._refcounts[instrument_id] = self._refcounts.get(instrument_id, 0) + 1
+        if new_instruments:
+            try:
+                await self._hold_instruments(broker, force=True)
+            except BaseException:
+                self._unref(stream)
+                raise
+        changed = self._changed(snapshot)
+        for other in self.streams:
+            other.push(changed)
+        self.streams.add(stream)
+        stream.push(snapshot)
+        self._rescheduled.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def remove(self, stream: QuoteStream) -> None:
+        """
+        Stop serving a stream; the hub stops once it serves none.
+        """
+        if stream not in self.streams:
+            return
+        self.streams.discard(stream)
+        self._unref(stream)
+        if not self.streams:
+            await self.close()
+        elif self._held_broker is not None:
+            await self._hold_instruments(self._held_broker, force=True)
+
+    def _unref(self, stream: QuoteStream) -> None:
+        """
+        Drop a stream's references to its instruments.
+        """
+        for instrument in stream.instruments:
+            instrument_id = _instrument_id(instrument)
+            count = self._refcounts.get(instrument_id, 0) - 1
+            if count > 0:
+                self._refcounts[instrument_id] = count
+            else:
+                self._refcounts.pop(instrument_id, None)
+                self._last.pop(instrument_id, None)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self._release_instruments()
+
+    async def _quotes(
+        self,
+        broker,
+        instrument_ids: List[InstrumentId],
+        max_age: Optional[float] = None
+    ) -> Dict[InstrumentId, Dict[str, Any]]:
+        """
+        Quote instruments, in one broker call per batch of distinct exchange tokens.
+        """
+        batches = _token_batches(instrument_ids)
+        results = await asyncio.gather(*(
+            getattr(broker, self.method)(
+                request_data=list(map(_instrument_request, batch.values())),
+                max_age=max_age
+            )
+            for batch in batches
+        ))
+        quotes = {}
+        for batch, result in zip(batches, results):
+            for exchange_token, quote in result.items():
+                instrument_id = batch.get(str(exchange_token))
+                if instrument_id is not None:
+                    quotes[instrument_id] = quote
+        return quotes
+
+    async def _hold_instruments(self, broker, force: bool = False) -> None:
+        """
+        Hold the watched instruments on the broker, moving them when the pool
+        has swapped in a new broker instance.
+        """
+        if broker is self._held_broker and not force:
+            return
+        keys = []
+        if self._refcounts:
+            keys = await broker.acquire_instruments(list(map(_instrument_request, self._refcounts)))
+        await self._release_instruments()
+        self._held_broker, self._held_keys = broker, keys
+
+    async def _release_instruments(self) -> None:
+        if self._held_broker is not None:
+            await self._held_broker.release_instruments(self._held_keys)
+        self._held_broker, self._held_keys = None, []
+
+    async def _run(self) -> None:
+        """
+        Poll the broker for the watched instruments and push changed quotes.
+        """
+        loop = asyncio.get_running_loop()
+        last_poll = loop.time()
+        while True:
+            self._rescheduled.clear()
+            wait = last_poll + self._interval() - loop.time()
+            if wait > 0:
+                try:
+                    await asyncio.wait_for(self._rescheduled.wait(), wait)
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+            last_poll = loop.time()
+            try:
+                broker = await self.broker_pool.get(self.broker_type, self.account_name)
+                await self._hold_instruments(broker)
+                # The quote book is answered from regardless of age; it only
+                # changes when the feed ticks.
+                max_age = None if getattr(broker, "has_market_feed", False) else self._interval()
+                quotes = await self._quotes(broker, list(self._refcounts), max_age)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning(f"Quote stream poll for {self.broker_type} {self.method} failed: {e}")
+                continue
+
+            changed = self._changed(quotes)
+            if changed:
+                for stream in list(self.streams):
+                    stream.push(changed)
+
+    def _interval(self) -> float:
+        """
+        Get the time until the next poll: the shortest update spacing of the
+        streams, capped at poll_interval.
+        """
+        fastest = max((stream.max_rate for stream in self.streams), default=0)
+        return min(self.poll_interval, 1 / fastest) if fastest else self.poll_interval
+
+    def _changed(self, quotes: Dict[InstrumentId, Dict[str, Any]]) -> Dict[InstrumentId, Dict[str, Any]]:
+        """
+        Record the latest quotes and return those that changed, ignoring their age.
+        """
+        changed = {}
+        for instrument_id, quote in quotes.items():
+            fields = {key: value for key, value in quote.items() if key != "age"}
+            if self._last.get(instrument_id) != fields:
+                self._last[instrument_id] = fields
+                changed[instrument_id] = quote
+        return changed
+
+
+class QuoteStreamService:
+    """
+    Server-push quote streams for API clients.
+
+    Clients watching the same broker account and quote type share one hub,
+    which polls the broker for all of them as often as its fastest client
+    takes updates (at least once per `poll_interval`), so upstream and quote
+    work does not grow with the number of viewers. Each
+    client receives conflated updates through its own QuoteStream.
+
+    Attributes:
+        broker_pool (BrokerPool): Pool the hubs get their broker instances from.
+        poll_interval (float): Longest time in seconds between polls of a hub.
+        max_rate (float): Upper bound on a client's requested update rate.
+    """
+
+    def __init__(self, broker_pool: BrokerPool, poll_interval: float = 1.0, max_rate: float = 10.0):
+        """
+        Initialize the service.
+
+        Args:
+            broker_pool (BrokerPool): Pool the hubs get their broker instances from.
+            poll_interval (float): Longest time in seconds between polls of a hub.
+            max_rate (float): Upper bound on a client's requested update rate.
+        """
+        self.logger = get_logger(
+            name="QuoteStreamService",
+            log_group="DataPipeline",
+            log_stream="quote_stream"
+        )
+        self.broker_pool = broker_pool
+        self.poll_interval = poll_interval
+        self.max_rate = max_rate
+        self._hubs: Dict[Tuple[str, Optional[str], str], _QuoteHub] = {}
+        self._stream_hubs: Dict[QuoteStream, _QuoteHub] = {}
+
+    async def subscribe(
+        self,
+        broker_type: str,
+        account_name: Optional[str],
+        quote_type: str,
+        instruments: List[Dict[str, str]],
+        max_rate: float
+    ) -> QuoteStream:
+        """
+        Open a quote stream.
+
+        Args:
+            broker_type (str): The type of broker.
+            account_name (Optional[str]): The account name. Defaults to the default account.
+            quote_type (str): A QUOTE_STREAM_METHODS key.
+            instruments (List[Dict[str, str]]): Instrument identifiers, as for the quote endpoints.
+            max_rate (float): Maximum updates per second, capped at the service's max_rate.
+
+        Returns:
+            QuoteStream: The stream; its first update is the current quotes.
+
+        Raises:
+            ValueError: If the broker is not configured, the quote type is
+                unknown, no instruments are given or an instrument is unknown.
+        """
+        if quote_type not in QUOTE_STREAM_METHODS:
+            raise ValueError(f"Invalid quote type: {quote_type}. Valid types are: {list(QUOTE_STREAM_METHODS)}")
+        if not instruments:
+            raise ValueError("No instruments to stream")
+
+        key = (broker_type.lower(), account_name, quote_type)
+        hub = self._hubs.get(key)
+        if hub is None:
+            hub = _QuoteHub(self.broker_pool, broker_type, account_name, quote_type, self.poll_interval, self.logger)
+            self._hubs[key] = hub
+
+        stream = QuoteStream(instruments, max_rate=min(max_rate, self.max_rate))
+        try:
+            await hub.add(stream)
+        except BaseException:
+            if not hub.streams:
+                self._hubs.pop(key, None)
+            raise
+        self._stream_hubs[stream] = hub
+        return stream
+
+    async def unsubscribe(self, stream: QuoteStream) -> None:
+        """
+        Close a quote stream.
+
+        Args:
+            stream (QuoteStream): A stream returned by subscribe.
+        """
+        hub = self._stream_hubs.pop(stream, None)
+        if hub is None:
+            return
+        await hub.remove(stream)
+        if not hub.streams:
+            for key, value in list(self._hubs.items()):
+                if value is hub:
+                    del self._hubs[key]
+
+    async def close(self) -> None:
+        """
+        Stop every hub, e.g. from the application's shutdown hook.
+        """
+        hubs = list(self._hubs.values())
+        self._hubs.clear()
+        self._stream_hubs.clear()
+        for hub in hubs:
+            await hub.close()
@@ -14,6 +14,7 @@ from typing import Dict, Any, Optional, List
 
 from brokers.factory import BrokerFactory
 from brokers.base.broker import BaseBroker
+from services.broker_pool import BrokerPool
 from logger import get_logger
 
 
@@ -30,7 +31,12 @@ class TokenRotationService:
         health_check_interval (int): Interval in seconds between health checks.
     """
     
-    def __init__(self, brokers: Dict[str, Dict[str, Any]], health_check_interval: int = 5):
+    def __init__(
+        self,
+        brokers: Dict[str, Dict[str, Any]],
+        health_check_interval: int = 5,
+        broker_pool: Optional[BrokerPool] = None
+    ):
         """
         Initialize the token rotation service.
         
@@ -38,6 +44,9 @@ class TokenRotationService:
             brokers (Dict[str, Dict[str, Any]]): Configuration for different brokers.
                 Format: {broker_type: {account_name: account_config, ...}, ...}
             health_check_interval (int): Interval in seconds between health checks.
+            broker_pool (Optional[BrokerPool]): Shared broker pool. When given, the
+                service checks the pooled instances and refreshes them after a
+                rotation instead of keeping its own copies.
         """
         self.logger = get_logger(
             name="TokenRotationService",
@@ -46,6 +55,7 @@ class TokenRotationService:
         )
         self.brokers = brokers
         self.health_check_interval = health_check_interval
+        self.broker_pool = broker_pool
         self.broker_instances = {}
     
     async def initialize(self):
@@ -57,19 +67,21 @@ class TokenRotationService:
         self.logger.info("Initializing token rotation service")
         for broker_type, config in self.brokers.items():
             try:
-                
-                logger = get_logger(
-                    name=f"{broker_type.capitalize()}Broker",
-                    log_group="DataPipeline",
-                    log_stream=f"broker"
-                )
+                if self.broker_pool is not None:
+                    broker = await self.broker_pool.get(broker_type)
+                else:
+                    logger = get_logger(
+                        name=f"{broker_type.capitalize()}Broker",
+                        log_group="DataPipeline",
+                        log_stream=f"broker"
+                    )
 
-                broker = BrokerFactory.create_broker(
-                    broker_type=broker_type,
-                    config=config,
-                    logger=logger
-                )
-                await broker.initialize()
+                    broker = BrokerFactory.create_broker(
+                        broker_type=broker_type,
+                        config=config,
+                        logger=logger
+                    )
+                    await broker.initialize()
                 self.broker_instances[broker_type] = {}
                 self.broker_instances[broker_type]["object"] = broker
                 self.broker_instances[broker_type]["config"] = config
@@ -107,6 +119,8 @@ class TokenRotationService:
         
         for broker_type, broker_dict in self.broker_instances.items():
             try:
+                if self.broker_pool is not None:
+                    broker_dict["object"] = await self.broker_pool.get(broker_type)
                 is_healthy = await self.check_token_health(broker_dict.get("object"))
                 if not is_healthy:
                     self.logger.warning(f"Token for {broker_type} broker is unhealthy, rotating")
@@ -176,8 +190,11 @@ class TokenRotationService:
             if result.get("statusCode") == 200:
                 self.logger.info(f"Token rotation successful for {broker_type} broker.")
                 
-                # Reinitialize the broker with the new token
-                await broker_object.initialize()
+                # Load the new token, keeping the pooled broker's state
+                if self.broker_pool is not None:
+                    broker_dict["object"] = await self.broker_pool.refresh_token(broker_type)
+                else:
+                    await broker_object.initialize()
                 return True
             else:
                 self.logger.error(f"Token rotation failed for {broker_type} broker: {result.get('body')}")
@@ -0,0 +1,86 @@
+"""
+Tests for the /master-data endpoint's full response and opt-in paging.
+"""
+
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from api.endpoints import get_master_data
+from tests.upstox.test_market_feed import make_broker
+
+
+async def master_data(broker, **params):
+    query = {
+        "segment": None,
+        "instrument_type": None,
+        "underlying": None,
+        "expiry": None,
+        "columns": None,
+        "cursor": None,
+        "limit": None,
+        "format": "json",
+    }
+    query.update(params)
+    return await get_master_data(broker=broker, **query)
+
+
+@pytest.mark.asyncio
+async def test_plain_request_returns_the_full_master():
+    broker = make_broker(port=0)
+    response = await master_data(broker)
+    assert response == {"status": "success", "data": broker.master_df.to_dicts()}
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_through_the_master():
+    broker = make_broker(port=0)
+    first = await master_data(broker, limit=1, columns="tradingsymbol")
+    assert first["data"] == [{"tradingsymbol": "RELIANCE"}]
+    assert first["next_cursor"] is not None
+
+    second = await master_data(broker, limit=1, cursor=first["next_cursor"], columns="tradingsymbol")
+    assert second["data"] == [{"tradingsymbol": "TCS"}]
+    assert second["next_cursor"] is None
+
+    # A cursor alone pages with the default page size.
+    rest = await master_data(broker, cursor=first["next_cursor"], columns="tradingsymbol")
+    assert rest == {"status": "success", "data": [{"tradingsymbol": "TCS"}], "next_cursor": None}
+
+
+@pytest.mark.asyncio
+async def test_streamed_formats_start_at_the_cursor():
+    broker = make_broker(port=0)
+    first = await master_data(broker, limit=1)
+    response = await master_data(broker, cursor=first["next_cursor"], columns="tradingsymbol", format="ndjson")
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    assert [json.loads(line) for line in body.decode().splitlines()] == [{"tradingsymbol": "TCS"}]
+
+
+@pytest.mark.asyncio
+async def test_malformed_cursor_is_rejected():
+    broker = make_broker(port=0)
+    with pytest.raises(HTTPException) as error:
+        await master_data(broker, cursor="-1")
+    assert error.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_cursor_of_a_replaced_master_is_rejected():
+    broker = make_broker(port=0)
+    broker.master_trading_date = "2026-10-15"
+    cursor = (await master_data(broker, limit=1))["next_cursor"]
+
+    broker.master_trading_date = "2026-10-16"
+    with pytest.raises(HTTPException) as error:
+        await master_data(broker, cursor=cursor)
+    assert error.value.status_code == 400
+    assert "Stale cursor" in error.value.detail
+
+    # The same trading date, but the cursor's last instrument is gone.
+    broker.master_trading_date = "2026-10-15"
+    broker.master_df = broker.master_df.tail(1)
+    with pytest.raises(HTTPException) as error:
+        await master_data(broker, cursor=cursor)
+    assert "Stale cursor" in error.value.detail
@@ -0,0 +1,88 @@
+"""
+Tests for the quote streaming WebSocket endpoint.
+"""
+
+import json
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import pytest
+from fastapi import WebSocketDisconnect
+
+import services.quote_stream
+from api.endpoints import stream_quotes_ws
+from services.quote_stream import QuoteStreamService
+from tests.services.test_quote_stream import INSTRUMENTS, CountingBroker, StaticPool
+
+
+class FakeWebSocket:
+    """
+    WebSocket stand-in receiving scripted client messages, then disconnecting
+    once the test lets it go.
+    """
+
+    def __init__(self, service, messages):
+        self.app = SimpleNamespace(state=SimpleNamespace(quote_stream_service=service))
+        self.incoming = list(messages)
+        self.sent = []
+        self.closed = asyncio.Event()
+        self.fail_sends = False
+
+    async def accept(self):
+        pass
+
+    async def receive_text(self):
+        if self.incoming:
+            return self.incoming.pop(0)
+        await self.closed.wait()
+        raise WebSocketDisconnect(code=1000)
+
+    async def send_text(self, text):
+        if self.fail_sends:
+            raise RuntimeError("connection reset")
+        self.sent.append(json.loads(text))
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(services.quote_stream, "get_logger", lambda name, **_: logging.getLogger(name))
+    return QuoteStreamService(StaticPool(CountingBroker()), poll_interval=0.02)
+
+
+@pytest.mark.asyncio
+async def test_malformed_messages_get_error_frames(service):
+    subscription = json.dumps({"instruments": INSTRUMENTS[:1], "max_rate": 10})
+    websocket = FakeWebSocket(service, ["not json", "[1, 2]", '{"max_rate": 99}', subscription])
+    handler = asyncio.ensure_future(stream_quotes_ws(websocket, broker_type="upstox", account_name=None))
+
+    for _ in range(100):
+        if any(message["status"] == "success" for message in websocket.sent):
+            break
+        await asyncio.sleep(0.01)
+    errors = [message for message in websocket.sent if message["status"] == "error"]
+    assert len(errors) == 3
+    assert "JSON object" in errors[1]["detail"]
+    assert set(websocket.sent[3]["data"]) == {"NSE:EQ:2885"}
+
+    websocket.closed.set()
+    await asyncio.wait_for(handler, 1)
+    assert service._hubs == {}
+
+
+@pytest.mark.asyncio
+async def test_failed_sender_is_reaped_on_disconnect(service, caplog):
+    subscription = json.dumps({"instruments": INSTRUMENTS, "max_rate": 10})
+    websocket = FakeWebSocket(service, [subscription])
+    websocket.fail_sends = True
+    handler = asyncio.ensure_future(stream_quotes_ws(websocket, broker_type="upstox", account_name=None))
+    await asyncio.sleep(0.05)
+
+    websocket.closed.set()
+    with caplog.at_level(logging.WARNING):
+        await asyncio.wait_for(handler, 1)
+    assert "connection reset" in caplog.text
+    assert service._hubs == {}
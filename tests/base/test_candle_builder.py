@@ -0,0 +1,84 @@
+"""
+Tests for the tick-to-candle aggregation.
+"""
+
+from datetime import datetime
+
+from brokers.base.candle_builder import SESSION_INTERVAL, CandleBuilder, candle_interval
+from brokers.base.master_cache import EXCHANGE_TIMEZONE
+from brokers.base.market_calendar import MarketCalendar
+from brokers.base.tick_store import TickStore
+
+
+def at(day: str, clock: str) -> float:
+    return datetime.fromisoformat(f"{day}T{clock}").replace(tzinfo=EXCHANGE_TIMEZONE).timestamp()
+
+
+def make_store() -> TickStore:
+    builder = CandleBuilder(
+        intervals=[60, 300, SESSION_INTERVAL],
+        calendar=MarketCalendar(),
+        exchange_of=lambda key: key.split("|")[0],
+    )
+    return TickStore(capacity=64, max_instruments=4, candles=builder)
+
+
+def test_interval_names():
+    assert candle_interval("1minute") == candle_interval("minute") == 60
+    assert candle_interval("15minute") == 900
+    assert candle_interval("day") == SESSION_INTERVAL
+    assert candle_interval("week") is None
+
+
+def test_ticks_fold_into_session_aligned_candles():
+    store = make_store()
+    day = "2026-10-15"
+    store.track(["NSE_EQ|A", "NSE_FO|B"], timestamp=at(day, "09:00:00"))
+
+    # Pre-open ticks are not folded.
+    store.record({"NSE_EQ|A": {"last_price": 99.0, "volume": 0}}, timestamp=at(day, "09:10:00"))
+    ticks = [
+        ("09:15:05", 100.0, 10), ("09:15:40", 102.0, 25), ("09:16:10", 101.0, 30),
+        ("09:19:59", 98.0, 60), ("09:20:00", 99.0, 70),
+    ]
+    for clock, price, volume in ticks:
+        store.record(
+            {"NSE_EQ|A": {"last_price": price, "volume": volume}, "NSE_FO|B": {"last_price": price * 2, "oi": 5}},
+            timestamp=at(day, clock),
+        )
+
+    minute = store.session_candles("NSE_EQ|A", 60)
+    assert minute["datetime"].tolist() == [
+        "2026-10-15 09:15:00", "2026-10-15 09:16:00", "2026-10-15 09:19:00", "2026-10-15 09:20:00",
+    ]
+    assert minute["open"].tolist() == [100.0, 101.0, 98.0, 99.0]
+    assert minute["high"].tolist() == [102.0, 101.0, 98.0, 99.0]
+    assert minute["close"].tolist() == [102.0, 101.0, 98.0, 99.0]
+    assert minute["volume"].tolist() == [25.0, 5.0, 30.0, 10.0]
+
+    five = store.session_candles("NSE_EQ|A", 300)
+    assert five["datetime"].tolist() == ["2026-10-15 09:15:00", "2026-10-15 09:20:00"]
+    assert five["low"].tolist() == [98.0, 99.0]
+    assert five["volume"].tolist() == [60.0, 10.0]
+
+    daily = store.session_candles("NSE_EQ|A", SESSION_INTERVAL)
+    assert daily["datetime"].tolist() == ["2026-10-15 00:00:00"]
+    assert (daily["open"][0], daily["high"][0], daily["low"][0], daily["close"][0]) == (100.0, 102.0, 98.0, 99.0)
+    assert daily["volume"][0] == 70.0
+    assert store.session_candles("NSE_FO|B", 60)["oi"].tolist() == [5.0, 5.0, 5.0, 5.0]
+
+    # Post-close ticks are ignored; the next session starts afresh.
+    store.record({"NSE_EQ|A": {"last_price": 80.0, "volume": 90}}, timestamp=at(day, "15:45:00"))
+    assert store.session_candles("NSE_EQ|A", SESSION_INTERVAL)["close"][0] == 99.0
+    store.record({"NSE_EQ|A": {"last_price": 97.0, "volume": 4}}, timestamp=at("2026-10-16", "09:15:01"))
+    assert store.session_candles("NSE_EQ|A", 60)["datetime"].tolist() == ["2026-10-16 09:15:00"]
+    assert store.session_candles("NSE_EQ|A", 60)["volume"].tolist() == [4.0]
+
+
+def test_instruments_tracked_mid_session_have_no_candles():
+    store = make_store()
+    day = "2026-10-15"
+    store.track(["NSE_EQ|A"], timestamp=at(day, "10:00:00"))
+    store.record({"NSE_EQ|A": {"last_price": 100.0, "volume": 1000}}, timestamp=at(day, "10:00:01"))
+    assert store.session_candles("NSE_EQ|A", 60) is None
+    assert store.session_candles("NSE_EQ|A", 900) is None
@@ -0,0 +1,66 @@
+"""
+Tests for the concurrent dispatch of request chunks under per-endpoint rate limits.
+"""
+
+import asyncio
+import logging
+import time
+
+import pytest
+
+from brokers.upstox.broker import UpstoxBroker
+
+
+def make_broker(account_name, rate_limits):
+    return UpstoxBroker(
+        config={"account_name": account_name, "rate_limits": rate_limits},
+        logger=logging.getLogger("test_chunk_dispatch"),
+    )
+
+
+class Upstream:
+    """
+    Records when each chunk is sent, and answers after a delay.
+    """
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.started = time.monotonic()
+        self.sent = {}
+
+    async def fetch(self, chunk):
+        self.sent[chunk[0]] = time.monotonic() - self.started
+        await asyncio.sleep(self.delay)
+        return {key: key.upper() for key in chunk}
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_sent_concurrently_as_the_bucket_allows():
+    # Bursts of two, refilling at ten per second.
+    broker = make_broker("dispatch-burst-test", {"ltp": [(2, 0.2)]})
+    upstream = Upstream()
+    result = await broker._gather_chunks("ltp", [["a"], ["b", "c"], ["d"], ["e"]], upstream.fetch)
+
+    assert result == {"a": "A", "b": "B", "c": "C", "d": "D", "e": "E"}
+    # The burst goes out at once, without waiting for the first answer.
+    assert upstream.sent["b"] < upstream.delay
+    assert 0.07 <= upstream.sent["d"] < 0.15
+    assert 0.17 <= upstream.sent["e"] < 0.3
+
+
+@pytest.mark.asyncio
+async def test_endpoints_are_limited_independently():
+    broker = make_broker("dispatch-endpoint-test", {"ltp": [(1, 1)], "ohlc": [(5, 1)]})
+    upstream = Upstream(delay=0)
+    ltp = asyncio.ensure_future(broker._gather_chunks("ltp", [["a"], ["b"]], upstream.fetch))
+    await asyncio.sleep(0.01)
+
+    # The second LTP chunk waits a second; OHLC chunks do not queue behind it.
+    started = time.monotonic()
+    await broker._gather_chunks("ohlc", [["x"], ["y"]], upstream.fetch)
+    assert time.monotonic() - started < 0.1
+    assert "b" not in upstream.sent
+
+    ltp.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await ltp
@@ -0,0 +1,40 @@
+"""
+Tests for the historical request window planner.
+"""
+
+from datetime import date
+
+from brokers.base.history_planner import plan_history_windows
+from brokers.base.market_calendar import MarketCalendar
+
+
+def plan(from_day: str, to_day: str, max_days, holidays=None):
+    calendar = MarketCalendar(holidays)
+    windows = plan_history_windows(date.fromisoformat(from_day), date.fromisoformat(to_day), max_days, calendar, "NSE")
+    return [(start.isoformat(), end.isoformat()) for start, end in windows]
+
+
+def test_windows_are_maximal_and_trimmed_to_trading_days():
+    # Sat 2024-01-06 .. Sun 2024-03-03, 60-day windows.
+    assert plan("2024-01-06", "2024-03-03", 60) == [("2024-01-08", "2024-03-01")]
+    assert plan("2024-01-06", "2024-03-03", 30) == [
+        ("2024-01-08", "2024-02-06"),
+        ("2024-02-07", "2024-03-01"),
+    ]
+
+
+def test_window_ends_skip_holidays():
+    # 2024-03-08 to 2024-03-11 would otherwise end on a Friday holiday.
+    assert plan("2024-02-08", "2024-03-20", 30, holidays={"NSE": ["2024-03-08"]}) == [
+        ("2024-02-08", "2024-03-07"),
+        ("2024-03-11", "2024-03-20"),
+    ]
+
+
+def test_unbounded_and_empty_ranges():
+    assert plan("2015-01-01", "2023-12-31", None) == [("2015-01-01", "2023-12-29")]
+    assert plan("2024-01-06", "2024-01-07", 30) == []
+    assert plan("2024-01-08", "2024-01-08", 1) == [("2024-01-08", "2024-01-08")]
+    assert plan("2024-01-08", "2024-01-12", 1) == [
+        (f"2024-01-{day:02d}", f"2024-01-{day:02d}") for day in range(8, 13)
+    ]
@@ -0,0 +1,70 @@
+"""
+Tests for the hash index resolving request identifiers.
+"""
+
+import logging
+
+import polars as pl
+import pytest
+
+from brokers.base.instrument_index import InstrumentIndex
+from brokers.upstox.broker import UpstoxBroker
+
+
+MASTER = pl.DataFrame({
+    "exchange_token": [2885, 11536, 2885, 500325],
+    "exchange": ["NSE_EQ", "NSE_EQ", "NSE_EQ", "BSE_EQ"],
+    "tradingsymbol": ["RELIANCE", "TCS", "RELIANCE-DUP", "RELIANCE"],
+    "instrument_key": ["NSE_EQ|A", "NSE_EQ|B", "NSE_EQ|C", "BSE_EQ|A"],
+})
+
+
+def test_composite_keys_and_values():
+    index = InstrumentIndex(
+        MASTER, key_columns=("exchange_token", "exchange"), value_columns=("tradingsymbol", "instrument_key")
+    )
+    assert len(index) == 3
+    # The first row of a duplicated key wins.
+    assert index.get((2885, "NSE_EQ")) == ("RELIANCE", "NSE_EQ|A")
+    assert (500325, "BSE_EQ") in index
+    assert index.get((500325, "NSE_EQ"), "missing") == "missing"
+
+
+def test_bulk_resolve_reports_every_missing_key():
+    index = InstrumentIndex(MASTER, key_columns="instrument_key", value_columns="tradingsymbol")
+    values, missing = index.resolve(["NSE_EQ|B", "NSE_EQ|X", "BSE_EQ|A", "NSE_EQ|Y"])
+    assert values == ["TCS", "RELIANCE"]
+    assert missing == ["NSE_EQ|X", "NSE_EQ|Y"]
+
+
+def test_broker_rejects_requests_with_unknown_tokens():
+    broker = UpstoxBroker(config={}, logger=logging.getLogger("test_instrument_index"))
+    broker.master_df = pl.DataFrame(
+        {
+            "instrument_key": ["NSE_EQ|INE002A01018", "NSE_EQ|INE467B01029"],
+            "exchange_token": [2885, 11536],
+            "tradingsymbol": ["RELIANCE", "TCS"],
+            "name": ["RELIANCE", "TCS"],
+            "expiry": [None, None],
+            "strike": [None, None],
+            "tick_size": [0.05, 0.05],
+            "lot_size": [1, 1],
+            "instrument_type": ["EQ", "EQ"],
+            "option_type": [None, None],
+            "exchange": ["NSE_EQ", "NSE_EQ"],
+        },
+        schema_overrides={"expiry": pl.Utf8, "strike": pl.Float64, "option_type": pl.Utf8},
+    )
+    broker._build_master_indexes()
+    assert broker._resolve_instrument_keys([
+        {"exchange_token": "11536", "exchange": "NSE", "instrument_type": "EQ"},
+        {"exchange_token": 2885, "exchange": "NSE", "instrument_type": "EQ"},
+    ]) == ["NSE_EQ|INE467B01029", "NSE_EQ|INE002A01018"]
+
+    with pytest.raises(ValueError) as error:
+        broker._resolve_instrument_keys([
+            {"exchange_token": "2885", "exchange": "NSE", "instrument_type": "EQ"},
+            {"exchange_token": "1", "exchange": "NSE", "instrument_type": "EQ"},
+            {"exchange_token": "2885", "exchange": "BSE", "instrument_type": "EQ"},
+        ])
+    assert "1 (NSE_EQ)" in str(error.value) and "2885 (BSE_EQ)" in str(error.value)
@@ -0,0 +1,45 @@
+"""
+Tests for the instrument prefix and fuzzy search index.
+"""
+
+import polars as pl
+
+from brokers.base.instrument_search import InstrumentSearchIndex, normalize_search_key
+
+
+MASTER = pl.DataFrame({
+    "tradingsymbol": ["NIFTY 50", "NIFTY BANK", "NIFTY26OCTFUT", "RELIANCE", "RELINFRA", "RELIANCE26OCTFUT", "TCS"],
+    "name": ["Nifty 50", "Nifty Bank", "NIFTY", "RELIANCE INDUSTRIES", "RELIANCE INFRA", "RELIANCE", "TATA CONSULTANCY"],
+    "expiry": [None, None, "2026-10-27", None, None, "2026-10-27", None],
+    "exchange": ["NSE_INDEX", "NSE_INDEX", "NSE_FO", "NSE_EQ", "NSE_EQ", "NSE_FO", "NSE_EQ"],
+})
+
+
+def symbols(results):
+    return [row["tradingsymbol"] for row in results]
+
+
+def test_query_normalization():
+    assert normalize_search_key("Nifty-50 ") == normalize_search_key("NIFTY50") == "NIFTY50"
+
+
+def test_prefix_matches_are_ranked_by_key():
+    index = InstrumentSearchIndex(MASTER, segment_column="exchange")
+    assert symbols(index.search("nifty", fuzzy=False)) == ["NIFTY26OCTFUT", "NIFTY 50", "NIFTY BANK"]
+    assert symbols(index.search("nifty 50", fuzzy=False)) == ["NIFTY 50"]
+    # Names index only rows without an expiry.
+    assert symbols(index.search("reliance ind", fuzzy=False)) == ["RELIANCE"]
+    assert symbols(index.search("rel", limit=2, fuzzy=False)) == ["RELIANCE", "RELIANCE26OCTFUT"]
+    assert symbols(index.search("rel", segments=["NSE_EQ"], fuzzy=False)) == ["RELIANCE", "RELINFRA"]
+    assert index.search("---") == []
+
+
+def test_fuzzy_matches_top_up_prefix_matches():
+    index = InstrumentSearchIndex(MASTER, segment_column="exchange")
+    assert index.search("reliance infar", fuzzy=False) == []
+    # The closest key by trigram similarity ranks first.
+    assert symbols(index.search("reliance infar", limit=3)) == ["RELINFRA", "RELIANCE"]
+    assert symbols(index.search("nifti bank", limit=3)) == ["NIFTY BANK", "NIFTY 50"]
+    # Derivatives are not fuzzy matched, and segments still apply.
+    assert symbols(index.search("relaince", limit=3)) == ["RELIANCE"]
+    assert index.search("relaince", segments=["NSE_FO"]) == []
@@ -0,0 +1,54 @@
+"""
+Tests for exchange sessions, holidays and settle times.
+"""
+
+from datetime import date, datetime, time
+
+from brokers.base.master_cache import EXCHANGE_TIMEZONE
+from brokers.base.market_calendar import SESSION_SETTLE_TIME, MarketCalendar
+
+
+def at(day: str, clock: str) -> datetime:
+    return datetime.fromisoformat(f"{day}T{clock}").replace(tzinfo=EXCHANGE_TIMEZONE)
+
+
+def test_weekends_and_holidays_are_not_trading_days():
+    calendar = MarketCalendar()
+    assert calendar.is_trading_day("NSE_FO", date(2026, 10, 19))
+    # Dussehra (a lunar holiday), Gandhi Jayanti and a Saturday.
+    assert not calendar.is_trading_day("NSE_FO", date(2026, 10, 20))
+    assert not calendar.is_trading_day("NFO", date(2026, 10, 2))
+    assert not calendar.is_trading_day("NSE", date(2026, 10, 17))
+    # Unknown exchanges are always open.
+    assert calendar.is_trading_day("XYZ", date(2026, 10, 17))
+
+
+def test_configured_holidays_are_added():
+    calendar = MarketCalendar({"BSE": ["2026-10-19"]})
+    assert not calendar.is_trading_day("NSE_EQ", date(2026, 10, 19))
+    assert calendar.is_trading_day("MCX_FO", date(2026, 10, 19))
+
+
+def test_settle_time_after_the_close():
+    calendar = MarketCalendar()
+    assert calendar.settled_since("NSE", at("2026-10-16", "15:00:00")) is None
+    # Closed, but prices are still settling.
+    assert calendar.settled_since("NSE", at("2026-10-16", "15:45:00")) is None
+    assert calendar.settled_since("NSE", at("2026-10-16", "16:00:00")) == at("2026-10-16", "15:30:00") + SESSION_SETTLE_TIME
+    # Friday's session stays settled over the weekend, Monday's over the Dussehra holiday.
+    assert calendar.settled_since("NSE", at("2026-10-18", "11:00:00")) == at("2026-10-16", "16:00:00")
+    assert calendar.settled_since("NSE", at("2026-10-20", "11:00:00")) == at("2026-10-19", "16:00:00")
+
+    assert not calendar.is_session_settled("NSE", date(2026, 10, 16), at("2026-10-16", "15:59:00"))
+    assert calendar.is_session_settled("NSE", date(2026, 10, 16), at("2026-10-16", "16:00:00"))
+    assert calendar.is_session_settled("NSE", date(2026, 10, 20), at("2026-10-20", "10:00:00"))
+    assert not calendar.is_session_settled("XYZ", date(2026, 10, 1), at("2026-10-16", "16:00:00"))
+
+
+def test_mcx_trades_only_in_the_evening_on_exchange_holidays():
+    calendar = MarketCalendar()
+    assert calendar.is_trading_day("MCX_FO", date(2026, 10, 20))
+    assert calendar.session("MCX_FO", date(2026, 10, 20)) == (time(17, 0), time(23, 30))
+    assert calendar.session("MCX_FO", date(2026, 10, 19)) == (time(9, 0), time(23, 30))
+    assert not calendar.is_open("MCX_FO", at("2026-10-20", "10:00:00"))
+    assert calendar.is_open("MCX_FO", at("2026-10-20", "17:30:00"))
@@ -0,0 +1,99 @@
+"""
+Tests for the on-disk instrument master cache.
+"""
+
+import io
+import json
+import logging
+from datetime import date, datetime
+
+import polars as pl
+import pytest
+from aiohttp import web
+
+from brokers.base.master_cache import EXCHANGE_TIMEZONE, MasterCache, current_trading_date
+from tests.local_server import LocalServer
+
+
+MASTER_CSV = "exchange_token,tradingsymbol\n2885,RELIANCE\n11536,TCS\n"
+
+
+class MasterServer(LocalServer):
+    """
+    Serves an instrument file with an ETag, honouring If-None-Match.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.failing = False
+
+    async def master(self, request):
+        self.requests.append(dict(request.headers))
+        if self.failing:
+            return web.Response(status=500, text="down")
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(text=MASTER_CSV, headers={"ETag": '"v1"'})
+
+    def add_routes(self, router):
+        router.add_get("/master.csv", self.master)
+
+    async def __aenter__(self):
+        await super().__aenter__()
+        self.url = f"http://127.0.0.1:{self.port}/master.csv"
+        return self
+
+
+async def parse(response) -> pl.DataFrame:
+    return pl.read_csv(io.BytesIO(await response.read()))
+
+
+def age_snapshot(cache: MasterCache, name: str) -> None:
+    meta_path = cache._meta_path(name)
+    meta = json.loads(meta_path.read_text())
+    meta["trading_date"] = "2000-01-03"
+    meta_path.write_text(json.dumps(meta))
+
+
+def test_trading_date_rolls_over_at_publish_time_on_weekdays():
+    at = lambda value: datetime.fromisoformat(value).replace(tzinfo=EXCHANGE_TIMEZONE)
+    assert current_trading_date(at("2026-10-15T07:00:00")) == date(2026, 10, 14)
+    assert current_trading_date(at("2026-10-15T08:00:00")) == date(2026, 10, 15)
+    assert current_trading_date(at("2026-10-19T07:00:00")) == date(2026, 10, 16)
+    assert current_trading_date(at("2026-10-18T12:00:00")) == date(2026, 10, 16)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_revalidated_with_the_etag(tmp_path):
+    cache = MasterCache(logger=logging.getLogger("test_master_cache"), cache_dir=str(tmp_path))
+    async with MasterServer() as server:
+        first = await cache.load("upstox_NSE", server.url, parse)
+        assert first["tradingsymbol"].to_list() == ["RELIANCE", "TCS"]
+
+        # Current for today: served from disk without a request.
+        assert (await cache.load("upstox_NSE", server.url, parse)).equals(first)
+        assert len(server.requests) == 1
+
+        # A new trading date revalidates; the 304 reuses the snapshot.
+        age_snapshot(cache, "upstox_NSE")
+        assert (await cache.load("upstox_NSE", server.url, parse)).equals(first)
+        assert len(server.requests) == 2
+        assert server.requests[1]["If-None-Match"] == '"v1"'
+        meta = json.loads(cache._meta_path("upstox_NSE").read_text())
+        assert meta["trading_date"] == current_trading_date().isoformat()
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_falls_back_to_the_stale_snapshot(tmp_path):
+    cache = MasterCache(logger=logging.getLogger("test_master_cache"), cache_dir=str(tmp_path))
+    async with MasterServer() as server:
+        first = await cache.load("upstox_NSE", server.url, parse)
+        age_snapshot(cache, "upstox_NSE")
+        server.failing = True
+        assert (await cache.load("upstox_NSE", server.url, parse)).equals(first)
+
+        # Without a snapshot the failure surfaces.
+        with pytest.raises(Exception):
+            await cache.load("upstox_BSE", server.url.replace("master", "missing"), parse)
+        with pytest.raises(Exception):
+            await cache.load("upstox_MCX", server.url, parse)
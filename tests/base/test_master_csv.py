@@ -0,0 +1,54 @@
+"""
+Tests for the streamed, projected parse of instrument master files.
+"""
+
+import gzip
+
+import polars as pl
+import pytest
+
+from brokers.base.broker import BaseBroker
+
+
+CSV = (
+    "instrument_key,exchange_token,tradingsymbol,last_price,exchange\n"
+    "NSE_EQ|INE002A01018,2885,RELIANCE,1400.5,NSE_EQ\n"
+    "NSE_FO|43919,43919,NIFTY26OCT25000CE,120.0,NSE_FO\n"
+    "BSE_EQ|INE002A01018,500325,RELIANCE,1400.0,BSE_EQ\n"
+)
+
+SCHEMA = {"instrument_key": pl.Utf8, "exchange_token": pl.Int64, "exchange": pl.Utf8}
+
+
+class Content:
+    def __init__(self, body: bytes, chunk_size: int):
+        self.body = body
+        self.chunk_size = chunk_size
+
+    async def iter_chunked(self, _):
+        for offset in range(0, len(self.body), self.chunk_size):
+            yield self.body[offset:offset + self.chunk_size]
+
+
+class Response:
+    """
+    Response whose body arrives in small chunks, split mid-row.
+    """
+
+    def __init__(self, body: bytes, chunk_size: int = 7):
+        self.content = Content(body, chunk_size)
+
+
+@pytest.mark.asyncio
+async def test_gzip_body_is_decompressed_and_projected():
+    df = await BaseBroker._read_master_csv(Response(gzip.compress(CSV.encode())), schema=SCHEMA, compressed=True)
+
+    assert df.columns == ["instrument_key", "exchange_token", "exchange"]
+    assert df.schema == SCHEMA
+    assert df["exchange_token"].to_list() == [2885, 43919, 500325]
+
+
+@pytest.mark.asyncio
+async def test_plain_body_is_parsed():
+    df = await BaseBroker._read_master_csv(Response(CSV.encode()), schema={"tradingsymbol": pl.Utf8})
+    assert df["tradingsymbol"].to_list() == ["RELIANCE", "NIFTY26OCT25000CE", "RELIANCE"]
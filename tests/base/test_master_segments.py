@@ -0,0 +1,111 @@
+"""
+Tests for loading only the master files and rows of the configured segments.
+"""
+
+import gzip
+import logging
+
+import polars as pl
+import pytest
+
+from brokers.base.broker import BaseBroker
+from brokers.upstox.broker import UpstoxBroker
+from brokers.zerodha.broker import ZerodhaBroker
+from tests.base.test_master_csv import CSV, SCHEMA, Response
+
+
+UPSTOX_HEADER = "instrument_key,exchange_token,tradingsymbol,name,expiry,strike,tick_size,lot_size,instrument_type,option_type,exchange\n"
+
+UPSTOX_FILES = {
+    "NSE": UPSTOX_HEADER
+    + "NSE_EQ|INE002A01018,2885,RELIANCE,RELIANCE,,,0.05,1,EQ,,NSE_EQ\n"
+    + "NSE_INDEX|Nifty 50,26000,NIFTY,NIFTY,,,0.05,1,INDEX,,NSE_INDEX\n"
+    + "NSE_FO|43919,43919,NIFTY26OCT25000CE,NIFTY,2026-10-27,25000.0,0.05,75,CE,CE,NSE_FO\n",
+    "BSE": UPSTOX_HEADER
+    + "BSE_EQ|INE002A01018,500325,RELIANCE,RELIANCE,,,0.05,1,EQ,,BSE_EQ\n",
+}
+
+ZERODHA_HEADER = "instrument_token,exchange_token,tradingsymbol,name,last_price,expiry,strike,tick_size,lot_size,instrument_type,segment,exchange\n"
+
+ZERODHA_FILES = {
+    "NSE": ZERODHA_HEADER
+    + "738561,2885,RELIANCE,RELIANCE,0,,0,0.05,1,EQ,NSE,NSE\n"
+    + "256265,1001,NIFTY 50,NIFTY 50,0,,0,0,0,EQ,INDICES,NSE\n",
+    "NFO": ZERODHA_HEADER
+    + "12345,48,NIFTY26OCTFUT,NIFTY,0,2026-10-27,0,0.05,75,FUT,NFO-FUT,NFO\n"
+    + "12346,49,NIFTY26OCT25000CE,NIFTY,0,2026-10-27,25000,0.05,75,CE,NFO-OPT,NFO\n",
+}
+
+
+class MasterFiles:
+    """
+    Stands in for the master cache, serving instrument files by the last
+    part of their URL and recording which were loaded.
+    """
+
+    def __init__(self, files, compressed):
+        self.files = files
+        self.compressed = compressed
+        self.loaded = {}
+
+    async def load(self, name, url, parse, **_):
+        file_name = url.rsplit("/", 1)[-1].split(".")[0]
+        self.loaded[file_name] = name
+        body = self.files[file_name].encode()
+        return await parse(Response(gzip.compress(body) if self.compressed else body))
+
+
+@pytest.mark.asyncio
+async def test_row_filter_is_applied_while_parsing():
+    df = await BaseBroker._read_master_csv(
+        Response(gzip.compress(CSV.encode())),
+        schema=SCHEMA,
+        compressed=True,
+        row_filter=pl.col("exchange").is_in(["NSE_EQ", "BSE_EQ"])
+    )
+    assert df["exchange_token"].to_list() == [2885, 500325]
+
+
+@pytest.mark.asyncio
+async def test_upstox_loads_the_exchange_files_of_the_configured_segments():
+    broker = UpstoxBroker(
+        config={"master_segments": "nse_fo, NSE_EQ,BSE_EQ"},
+        logger=logging.getLogger("test_master_segments"),
+    )
+    broker.master_cache = MasterFiles(UPSTOX_FILES, compressed=True)
+    df = await broker._get_upstox_master_data()
+
+    assert broker._master_segments() == ["BSE_EQ", "NSE_EQ", "NSE_FO"]
+    assert broker.master_cache.loaded == {"NSE": "upstox_NSE_NSE_EQ-NSE_FO", "BSE": "upstox_BSE_BSE_EQ"}
+    # The index rows of the NSE file are filtered out while parsing.
+    assert sorted(df["instrument_key"].to_list()) == [
+        "BSE_EQ|INE002A01018", "NSE_EQ|INE002A01018", "NSE_FO|43919"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_zerodha_maps_segments_to_kite_exchange_files():
+    broker = ZerodhaBroker(
+        config={"master_segments": ["NSE_EQ", "NSE_FO"]},
+        logger=logging.getLogger("test_master_segments"),
+    )
+    broker.master_cache = MasterFiles(ZERODHA_FILES, compressed=False)
+    df = await broker._get_zerodha_master_data()
+
+    assert broker.master_cache.loaded == {
+        "NSE": "zerodha_instruments_NSE_NSE",
+        "NFO": "zerodha_instruments_NFO_NFO-FUT-NFO-OPT",
+    }
+    assert sorted(df["segment"].to_list()) == ["NFO-FUT", "NFO-OPT", "NSE"]
+
+
+@pytest.mark.asyncio
+async def test_zerodha_rejects_segments_without_a_kite_file():
+    broker = ZerodhaBroker(
+        config={"master_segments": ["NSE_EQ", "NSE_COM"]},
+        logger=logging.getLogger("test_master_segments"),
+    )
+    broker.master_cache = MasterFiles(ZERODHA_FILES, compressed=False)
+    with pytest.raises(ValueError, match="NSE_COM"):
+        await broker._get_zerodha_master_data()
+    assert broker.master_cache.loaded == {}
@@ -0,0 +1,63 @@
+"""
+Tests for the merging of concurrent quote lookups into batches.
+"""
+
+import asyncio
+
+import pytest
+
+from brokers.base.micro_batch import MicroBatcher
+
+
+class Upstream:
+    """
+    Batch fetch recording the keys of every call.
+    """
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    async def fetch(self, keys):
+        self.calls.append(keys)
+        if self.error is not None:
+            raise self.error
+        return {key: key.lower() for key in keys if key != "MISSING"}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_a_batch_and_get_their_own_keys():
+    batcher, upstream = MicroBatcher(window=0.01, max_size=10), Upstream()
+    results = await asyncio.gather(
+        batcher.submit(["A", "B"], upstream.fetch),
+        batcher.submit(["B", "C", "MISSING"], upstream.fetch),
+    )
+
+    assert upstream.calls == [["A", "B", "C", "MISSING"]]
+    assert results == [{"A": "a", "B": "b"}, {"B": "b", "C": "c"}]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_sent_without_waiting_for_the_window():
+    batcher, upstream = MicroBatcher(window=10, max_size=3), Upstream()
+    first = asyncio.ensure_future(batcher.submit(["A", "B"], upstream.fetch))
+    second = asyncio.ensure_future(batcher.submit(["C", "D"], upstream.fetch))
+    third = asyncio.ensure_future(batcher.submit(["E"], upstream.fetch))
+
+    # The second caller overflows the first batch, the third fills its own.
+    assert await asyncio.wait_for(asyncio.gather(first, second, third), 1) == [
+        {"A": "a", "B": "b"}, {"C": "c", "D": "d"}, {"E": "e"}
+    ]
+    assert upstream.calls == [["A", "B"], ["C", "D", "E"]]
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller_of_the_batch():
+    batcher, upstream = MicroBatcher(window=0.01, max_size=10), Upstream(RuntimeError("503"))
+    results = await asyncio.gather(
+        batcher.submit(["A"], upstream.fetch),
+        batcher.submit(["B"], upstream.fetch),
+        return_exceptions=True,
+    )
+    assert [str(result) for result in results] == ["503", "503"]
+    assert len(upstream.calls) == 1
@@ -0,0 +1,62 @@
+"""
+Tests for the precomputed option chain index.
+"""
+
+import polars as pl
+
+from brokers.base.option_chain import OptionChainIndex
+
+
+MASTER = pl.DataFrame({
+    "name": ["NIFTY"] * 6 + ["BANKNIFTY", "NIFTY"],
+    "expiry": ["2026-11-24", "2026-10-27", "2026-10-27", "2026-10-27", "2026-10-27", "2026-11-24", "2026-10-27", "2026-10-27"],
+    "strike": [25000.0, 25100.0, 25000.0, 25000.0, 24900.0, 25000.0, 56000.0, None],
+    "option_type": ["CE", "CE", "PE", "CE", "PE", "PE", "CE", None],
+    "exchange_token": [6, 5, 4, 3, 2, 1, 7, 8],
+    "tradingsymbol": ["N-NOV-25000CE", "N-25100CE", "N-25000PE", "N-25000CE", "N-24900PE", "N-NOV-25000PE", "BN-56000CE", "N-FUT"],
+    "lot_size": [75] * 7 + [75],
+    "exchange": ["NSE_FO"] * 8,
+})
+
+
+def make_index() -> OptionChainIndex:
+    return OptionChainIndex(
+        MASTER,
+        option_type_column="option_type",
+        request_exchange=pl.col("exchange").str.split("_").list.get(0),
+        request_instrument_type=pl.col("exchange").str.split("_").list.get(1),
+    )
+
+
+def test_chains_are_sorted_by_expiry_and_strike():
+    index = make_index()
+    assert index.underlyings() == ["BANKNIFTY", "NIFTY"]
+    assert index.expiries("NIFTY") == ["2026-10-27", "2026-11-24"]
+    assert index.expiries("FINNIFTY") == []
+
+    strikes = index.chain("NIFTY", "2026-10-27")["2026-10-27"]
+    assert [row["strike"] for row in strikes] == [24900.0, 25000.0, 25100.0]
+    assert index.chain("NIFTY", "2026-12-29") == {}
+
+
+def test_legs_pair_calls_and_puts_per_strike():
+    strikes = make_index().chain("NIFTY")["2026-10-27"]
+    assert strikes[0]["CE"] is None
+    assert strikes[0]["PE"]["tradingsymbol"] == "N-24900PE"
+    assert strikes[1]["CE"] == {
+        "exchange_token": 3, "tradingsymbol": "N-25000CE", "lot_size": 75,
+        "exchange": "NSE", "instrument_type": "FO",
+    }
+    assert strikes[1]["PE"]["exchange_token"] == 4
+    assert strikes[2]["PE"] is None
+
+
+def test_quote_requests_cover_every_listed_leg():
+    index = make_index()
+    requests = index.quote_requests(index.chain("NIFTY", "2026-10-27"))
+    assert requests == [
+        {"exchange_token": "2", "exchange": "NSE", "instrument_type": "FO"},
+        {"exchange_token": "3", "exchange": "NSE", "instrument_type": "FO"},
+        {"exchange_token": "4", "exchange": "NSE", "instrument_type": "FO"},
+        {"exchange_token": "5", "exchange": "NSE", "instrument_type": "FO"},
+    ]
@@ -0,0 +1,55 @@
+"""
+Tests for the per-instrument quote cache.
+"""
+
+import brokers.base.quote_cache
+from brokers.base.quote_cache import QuoteCache
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+def test_partial_hits_report_what_is_missing(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(brokers.base.quote_cache, "time", clock)
+    cache = QuoteCache(max_entries=10)
+    cache.put_many("ltp", {"A": 1, "B": 2})
+
+    hits, missing = cache.get_many("ltp", ["A", "C", "B"], max_age=1)
+    assert hits == {"A": (1, 0.0), "B": (2, 0.0)}
+    assert missing == ["C"]
+
+    # Quote types are cached separately.
+    assert cache.get_many(("ohlc", "1d"), ["A"], max_age=1) == ({}, ["A"])
+
+
+def test_max_age_decides_what_is_fresh(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(brokers.base.quote_cache, "time", clock)
+    cache = QuoteCache(max_entries=10)
+    cache.put_many("ltp", {"A": 1})
+    clock.now += 2
+
+    assert cache.get_many("ltp", ["A"], max_age=5) == ({"A": (1, 2.0)}, [])
+    assert cache.get_many("ltp", ["A"], max_age=1) == ({}, ["A"])
+
+    cache.put_many("ltp", {"A": 3})
+    assert cache.get_many("ltp", ["A"], max_age=0) == ({"A": (3, 0.0)}, [])
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = QuoteCache(max_entries=2)
+    cache.put_many("ltp", {"A": 1, "B": 2})
+    # Reading A makes B the least recently used.
+    cache.get_many("ltp", ["A"], max_age=60)
+    cache.put_many("ltp", {"C": 3})
+
+    assert len(cache) == 2
+    hits, missing = cache.get_many("ltp", ["A", "B", "C"], max_age=60)
+    assert set(hits) == {"A", "C"}
+    assert missing == ["B"]
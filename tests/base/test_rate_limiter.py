@@ -0,0 +1,74 @@
+"""
+Tests for the multi-window rate limiter and the per-account rate governor.
+"""
+
+import time
+import asyncio
+
+import pytest
+
+from brokers.base.rate_limiter import RateGovernor, RateLimiter
+
+
+@pytest.mark.asyncio
+async def test_every_window_is_enforced():
+    # Bursts of 2 per 50ms, but only 3 per 300ms.
+    limiter = RateLimiter([(2, 0.05), (3, 0.3)])
+    started = time.monotonic()
+    admitted = []
+    for _ in range(4):
+        await limiter.acquire()
+        admitted.append(time.monotonic() - started)
+
+    assert admitted[1] < 0.02
+    assert 0.02 <= admitted[2] < 0.1
+    # The fourth call waits on the slower window.
+    assert admitted[3] >= 0.09
+    assert limiter.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_callers_are_admitted_round_robin():
+    limiter = RateLimiter([(1, 0.01)])
+    order = []
+
+    async def call(caller):
+        await limiter.acquire(caller)
+        order.append(caller)
+
+    fan_out = [asyncio.ensure_future(call("chunked")) for _ in range(5)]
+    await asyncio.sleep(0)
+    single = asyncio.ensure_future(call("single"))
+    await asyncio.gather(*fan_out, single)
+
+    # The request queued last is not starved by the earlier fan-out.
+    assert order.index("single") <= 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_is_dropped():
+    limiter = RateLimiter([(1, 0.05)])
+    await limiter.acquire()
+    waiter = asyncio.ensure_future(limiter.acquire("a"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert limiter.pending == 0
+
+
+def test_governor_is_shared_per_account_and_follows_new_limits():
+    limits = {"quote": [(1, 1)], "default": [(10, 1)]}
+    governor = RateGovernor.for_account("Test", "governor-test", limits)
+    assert RateGovernor.for_account("test", "governor-test", limits) is governor
+    assert RateGovernor.for_account("test", "other-account", limits) is not governor
+
+    quote, default = governor.limiter("quote"), governor.limiter("historical")
+    assert default.limits == [(10, 1.0)]
+
+    reloaded = {"quote": [(2, 1)], "default": [(10, 1)]}
+    assert RateGovernor.for_account("test", "governor-test", reloaded) is governor
+    assert governor.limiter("quote") is not quote
+    assert governor.limiter("quote").limits == [(2, 1.0)]
+    # Unchanged endpoints keep their limiter and its queue.
+    assert governor.limiter("historical") is default
@@ -0,0 +1,80 @@
+"""
+Tests for the retry policy of transient upstream failures.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from brokers.base.retry import RetryableError, RetryPolicy, parse_retry_after
+
+
+class Flaky:
+    """
+    Call failing with the given errors before succeeding.
+    """
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 28 <= parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 30
+
+
+def test_backoff_is_jittered_and_honours_retry_after():
+    policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+    assert all(0 <= policy.backoff(10) <= 4.0 for _ in range(100))
+    assert all(0 <= policy.backoff(0) <= 1.0 for _ in range(100))
+    assert policy.backoff(0, retry_after=3.0) >= 3.0
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried():
+    retries = []
+    call = Flaky(RetryableError("503"), asyncio.TimeoutError())
+    policy = RetryPolicy(base_delay=0.001)
+    assert await policy.call(call, on_retry=lambda retry, error, delay: retries.append(retry)) == "ok"
+    assert call.calls == 3
+    assert retries == [1, 2]
+
+    # Other errors fail at once; attempts are bounded.
+    call = Flaky(ValueError("bad request"))
+    with pytest.raises(ValueError):
+        await policy.call(call)
+    assert call.calls == 1
+    call = Flaky(*[RetryableError("503")] * 5)
+    with pytest.raises(RetryableError):
+        await RetryPolicy(max_attempts=3, base_delay=0.001).call(call)
+    assert call.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_retry_after_past_the_deadline_gives_up():
+    loop = asyncio.get_running_loop()
+    policy = RetryPolicy(base_delay=0.001, deadline=0.5)
+    call = Flaky(RetryableError("429", retry_after=1.0))
+    started = loop.time()
+    with pytest.raises(RetryableError):
+        await policy.call(call)
+    # No retry was started, and the call did not wait for the Retry-After.
+    assert call.calls == 1
+    assert loop.time() - started < 0.1
+
+    call = Flaky(RetryableError("429", retry_after=0.05))
+    assert await policy.call(call) == "ok"
+    assert loop.time() - started >= 0.05
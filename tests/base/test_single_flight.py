@@ -0,0 +1,93 @@
+"""
+Tests for the coalescing of identical in-flight calls.
+"""
+
+import asyncio
+
+import pytest
+
+from brokers.base.single_flight import SingleFlight
+
+
+class Upstream:
+    """
+    Call that blocks until released, counting how often it is started.
+    """
+
+    def __init__(self):
+        self.started = 0
+        self.cancelled = 0
+        self.release = asyncio.Event()
+
+    def call(self, result):
+        async def fn():
+            self.started += 1
+            try:
+                await self.release.wait()
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return fn
+
+
+@pytest.mark.asyncio
+async def test_identical_calls_share_one_upstream_call():
+    flight, upstream = SingleFlight(), Upstream()
+    calls = [asyncio.ensure_future(flight.do("ltp", upstream.call({"a": 1}))) for _ in range(3)]
+    other = asyncio.ensure_future(flight.do("ohlc", upstream.call({"b": 2})))
+    await asyncio.sleep(0)
+    upstream.release.set()
+
+    assert await asyncio.gather(*calls) == [{"a": 1}] * 3
+    assert await other == {"b": 2}
+    assert upstream.started == 2
+    assert flight.coalesced == 2
+
+    # Nothing is cached once the call has finished.
+    await flight.do("ltp", upstream.call({"a": 3}))
+    assert upstream.started == 3
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller():
+    flight, upstream = SingleFlight(), Upstream()
+    calls = [asyncio.ensure_future(flight.do("ltp", upstream.call(RuntimeError("503")))) for _ in range(2)]
+    await asyncio.sleep(0)
+    upstream.release.set()
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    assert [str(result) for result in results] == ["503", "503"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_cancel_the_followers():
+    flight, upstream = SingleFlight(), Upstream()
+    leader = asyncio.ensure_future(flight.do("ltp", upstream.call("quote")))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(flight.do("ltp", upstream.call("unused")))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    upstream.release.set()
+    assert await follower == "quote"
+    assert upstream.started == 1 and upstream.cancelled == 0
+
+
+@pytest.mark.asyncio
+async def test_call_is_cancelled_once_every_caller_is():
+    flight, upstream = SingleFlight(), Upstream()
+    calls = [asyncio.ensure_future(flight.do("ltp", upstream.call("quote"))) for _ in range(2)]
+    await asyncio.sleep(0)
+    for call in calls:
+        call.cancel()
+    await asyncio.gather(*calls, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert upstream.cancelled == 1
+
+    # The key is free for a new call.
+    upstream.release.set()
+    assert await flight.do("ltp", upstream.call("fresh")) == "fresh"
@@ -0,0 +1,109 @@
+"""
+Tests for the reference-counted feed subscription manager.
+"""
+
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from brokers.base.market_feed import MarketFeed
+from brokers.base.quote_book import QuoteBook
+from brokers.base.subscription_manager import SubscriptionManager
+
+
+class RecordingFeed(MarketFeed):
+    """
+    Feed connection that records subscription requests instead of connecting.
+    """
+
+    MODES = {"full": "full"}
+
+    def __init__(self, broker, quote_book):
+        super().__init__(broker, quote_book, mode="full")
+        self.requests = []
+        self.started = False
+        self.closed = False
+
+    def start(self):
+        self.started = True
+
+    async def close(self):
+        self.closed = True
+        await super().close()
+
+    async def _send(self, method, instrument_keys):
+        self.requests.append((method, list(instrument_keys)))
+
+    async def _connect_url(self):
+        raise NotImplementedError
+
+    async def _send_subscription(self, ws, method, instrument_keys):
+        raise NotImplementedError
+
+    def _decode(self, frame):
+        return {}
+
+
+def make_manager(max_instruments=3, max_connections=2, grace_period=0.05):
+    broker = SimpleNamespace(logger=logging.getLogger("test_subscription_manager"))
+    book = QuoteBook()
+    return SubscriptionManager(
+        feed_factory=lambda: RecordingFeed(broker, book),
+        max_instruments=max_instruments,
+        max_connections=max_connections,
+        logger=broker.logger,
+        batch_window=0.01,
+        grace_period=grace_period,
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_acquires_are_batched():
+    manager = make_manager()
+    await asyncio.gather(manager.acquire(["A", "B"]), manager.acquire(["B", "C"]))
+    [feed] = manager.feeds
+    assert feed.started
+    assert feed.requests == [("sub", ["A", "B", "C"])]
+    assert manager.refcount("B") == 2
+    await manager.close()
+    assert feed.closed
+
+
+@pytest.mark.asyncio
+async def test_instruments_are_sharded_up_to_the_connection_limit():
+    manager = make_manager(max_instruments=2, max_connections=2)
+    await manager.acquire(["A", "B", "C", "D", "E"])
+    assert [feed.requests for feed in manager.feeds] == [[("sub", ["A", "B"])], [("sub", ["C", "D"])]]
+    assert manager.subscribed == {"A", "B", "C", "D"}
+
+    # Room freed by an unsubscription goes to the waiting instrument.
+    await manager.release(["A"])
+    await asyncio.sleep(0.1)
+    assert manager.feeds[0].requests[1:] == [("unsub", ["A"]), ("sub", ["E"])]
+    assert manager.subscribed == {"B", "C", "D", "E"}
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_release_waits_for_the_grace_period():
+    manager = make_manager(grace_period=0.1)
+    await manager.acquire(["A", "B"])
+    [feed] = manager.feeds
+
+    async with manager.subscription(["A"]):
+        pass
+    await manager.release(["A"])
+    await asyncio.sleep(0.03)
+    # Re-acquired within the grace period: nothing is sent.
+    await manager.acquire(["A"])
+    await asyncio.sleep(0.15)
+    assert feed.requests == [("sub", ["A", "B"])]
+
+    await manager.release(["A", "B"])
+    await asyncio.sleep(0.15)
+    assert feed.requests[1][0] == "unsub"
+    assert sorted(feed.requests[1][1]) == ["A", "B"]
+    # The emptied connection is closed.
+    assert feed.closed and manager.feeds == []
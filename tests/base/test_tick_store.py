@@ -0,0 +1,45 @@
+"""
+Tests for the array-backed tick ring buffers.
+"""
+
+import numpy as np
+
+from brokers.base.tick_store import TickStore
+
+
+def test_ring_keeps_the_latest_ticks_in_order():
+    store = TickStore(capacity=4, max_instruments=2)
+    store.track(["A"])
+    for tick in range(6):
+        store.record({"A": {"last_price": 100.0 + tick, "volume": 10 * tick}, "B": {"last_price": 1.0}}, timestamp=tick)
+
+    ticks = store.ticks("A")
+    assert ticks["timestamp"].tolist() == [2, 3, 4, 5]
+    assert ticks["last_price"].tolist() == [102.0, 103.0, 104.0, 105.0]
+    assert np.isnan(ticks["oi"]).all()
+    assert store.ticks("A", limit=2)["timestamp"].tolist() == [4, 5]
+    assert store.ticks("A", since=3)["timestamp"].tolist() == [4, 5]
+    assert store.ticks("B") is None
+
+
+def test_unchanged_quotes_are_not_recorded():
+    store = TickStore(capacity=8)
+    store.track(["A"])
+    assert store.record({"A": {"last_price": 1.0, "volume": 5}}, timestamp=1) == 1
+    assert store.record({"A": {"last_price": 1.0, "volume": 5, "age": 2.0}}, timestamp=2) == 0
+    assert store.record({"A": {"last_price": 1.0, "volume": 6}}, timestamp=3) == 1
+    assert store.ticks("A")["volume"].tolist() == [5.0, 6.0]
+
+
+def test_memory_is_bounded_and_rows_are_reused():
+    store = TickStore(capacity=16, max_instruments=20)
+    assert store.track([f"K{i}" for i in range(25)]) == [f"K{i}" for i in range(20, 25)]
+    assert len(store) == 20
+    allocated = store.nbytes
+    assert allocated <= 20 * 16 * 4 * 8 + 20 * 8
+
+    store.record({"K0": {"last_price": 1.0}}, timestamp=1)
+    store.untrack(["K0"])
+    store.track(["NEW"])
+    assert store.nbytes == allocated
+    assert store.ticks("NEW")["timestamp"].size == 0
@@ -0,0 +1,33 @@
+"""
+Local aiohttp server the broker tests point their clients at.
+"""
+
+from aiohttp import web
+
+
+class LocalServer:
+    """
+    Serves the routes added by `add_routes` on a free local port while used
+    as an async context manager.
+
+    Attributes:
+        port (int): The port the server listens on, once started.
+    """
+
+    # Longest request line accepted; quote chunks send long query strings.
+    MAX_LINE_SIZE = 1 << 16
+
+    def add_routes(self, router: web.UrlDispatcher) -> None:
+        raise NotImplementedError
+
+    async def __aenter__(self):
+        app = web.Application()
+        self.add_routes(app.router)
+        self.runner = web.AppRunner(app, max_line_size=self.MAX_LINE_SIZE)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", 0).start()
+        self.port = self.runner.addresses[0][1]
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.runner.cleanup()
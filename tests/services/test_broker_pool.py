@@ -0,0 +1,118 @@
+"""
+Tests for the pool of initialized broker instances.
+"""
+
+import asyncio
+import logging
+
+import pytest
+
+import services.broker_pool
+from services.broker_pool import BrokerPool
+
+
+class FakeBroker:
+    """
+    Broker stand-in whose initialization waits for the test to release it.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.broker_name = "Fake"
+        self.ready = asyncio.Event()
+        self.closed = False
+        self.access_token = None
+        self.token_refreshes = 0
+
+    async def initialize(self):
+        await self.ready.wait()
+
+    async def refresh_access_token(self):
+        self.token_refreshes += 1
+        self.access_token = f"token-{self.token_refreshes}"
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def built(monkeypatch):
+    built = []
+
+    def create_broker(broker_type, config, logger):
+        broker = FakeBroker(config)
+        built.append(broker)
+        return broker
+
+    monkeypatch.setattr(services.broker_pool, "get_logger", lambda name, **_: logging.getLogger(name))
+    monkeypatch.setattr(services.broker_pool.BrokerFactory, "create_broker", staticmethod(create_broker))
+    return built
+
+
+async def wait_built(built, count):
+    while len(built) < count:
+        await asyncio.sleep(0)
+    return built[count - 1]
+
+
+@pytest.mark.asyncio
+async def test_refresh_swaps_in_only_initialized_brokers(built):
+    pool = BrokerPool(brokers={"upstox": {"api_key": "x"}})
+    pool.RETIRE_GRACE_PERIOD = 0.01
+    initializing = asyncio.ensure_future(pool.initialize())
+    (await wait_built(built, 1)).ready.set()
+    await initializing
+    first = await pool.get("UPSTOX")
+    assert first is built[0]
+    assert first.config == {"api_key": "x", "account_name": "default"}
+
+    refreshing = asyncio.ensure_future(pool.refresh("upstox"))
+    second = await wait_built(built, 2)
+    # Requests keep getting the current instance until the new one is ready.
+    assert await pool.get("upstox") is first
+    second.ready.set()
+    assert await refreshing is second
+    assert await pool.get("upstox") is second
+
+    # The replaced instance is closed after the grace period.
+    assert not first.closed
+    await asyncio.sleep(0.05)
+    assert first.closed
+
+    await pool.close()
+    assert second.closed
+    assert pool.broker_instances == {}
+
+
+@pytest.mark.asyncio
+async def test_failed_account_is_built_once_on_first_use(built):
+    pool = BrokerPool()
+    pool.register("zerodha", {}, account_name="second")
+    with pytest.raises(ValueError):
+        await pool.get("zerodha")
+
+    requests = [asyncio.ensure_future(pool.get("zerodha", "second")) for _ in range(3)]
+    (await wait_built(built, 1)).ready.set()
+    assert await asyncio.gather(*requests) == [built[0]] * 3
+    assert len(built) == 1
+    assert built[0].config == {"account_name": "second"}
+    await pool.close()
+
+
+
+@pytest.mark.asyncio
+async def test_token_refresh_keeps_the_pooled_instance(built):
+    pool = BrokerPool(brokers={"upstox": {}})
+    initializing = asyncio.ensure_future(pool.initialize())
+    (await wait_built(built, 1)).ready.set()
+    await initializing
+
+    broker = await pool.get("upstox")
+    assert await pool.refresh_token("upstox") is broker
+    assert broker.access_token == "token-1"
+    assert await pool.get("upstox") is broker
+    assert len(built) == 1 and not broker.closed
+
+    with pytest.raises(ValueError):
+        await pool.refresh_token("zerodha")
+    await pool.close()
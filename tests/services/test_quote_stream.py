@@ -0,0 +1,174 @@
+"""
+Tests for the conflated quote streams.
+"""
+
+import asyncio
+import logging
+
+import pytest
+
+import services.quote_stream
+from services.quote_stream import QuoteStream, QuoteStreamService
+
+
+INSTRUMENTS = [
+    {"exchange_token": "2885", "exchange": "NSE", "instrument_type": "EQ"},
+    {"exchange_token": "11536", "exchange": "NSE", "instrument_type": "EQ"},
+]
+RELIANCE = ("2885", "NSE", "EQ")
+
+
+class CountingBroker:
+    """
+    Broker stand-in whose last prices move by one on every poll.
+    """
+
+    def __init__(self):
+        self.polls = 0
+        self.held = []
+        self.failing = set()
+        self.max_ages = []
+        self.has_market_feed = False
+
+    async def acquire_instruments(self, request_data):
+        keys = [instrument["exchange_token"] for instrument in request_data]
+        if self.failing.intersection(keys):
+            raise RuntimeError("feed subscription failed")
+        self.held.extend(keys)
+        return keys
+
+    async def release_instruments(self, instrument_keys):
+        for key in instrument_keys:
+            self.held.remove(key)
+
+    async def ltp_quote(self, request_data, max_age=None):
+        self.polls += 1
+        self.max_ages.append(max_age)
+        # Quotes are keyed by exchange token, whatever the exchange.
+        return {
+            instrument["exchange_token"]: {
+                "last_price": float(self.polls), "exchange": instrument["exchange"], "age": 0.0
+            }
+            for instrument in request_data
+        }
+
+
+class StaticPool:
+    def __init__(self, broker):
+        self.broker = broker
+
+    async def get(self, broker_type, account_name=None):
+        return self.broker
+
+
+@pytest.mark.asyncio
+async def test_slow_client_gets_the_latest_quote_only():
+    stream = QuoteStream(INSTRUMENTS, max_rate=100)
+    stream.push({RELIANCE: {"last_price": 1.0}, ("999", "NSE", "EQ"): {"last_price": 5.0}})
+    stream.push({RELIANCE: {"last_price": 2.0}})
+    assert await stream.next() == {"NSE:EQ:2885": {"last_price": 2.0}}
+    assert stream.dropped == 1
+
+    stream.push({("11536", "NSE", "EQ"): {"last_price": 3.0}})
+    started = asyncio.get_running_loop().time()
+    assert await stream.next() == {"NSE:EQ:11536": {"last_price": 3.0}}
+    # Takes are spaced by 1 / max_rate.
+    assert asyncio.get_running_loop().time() - started >= 0.009
+
+
+@pytest.mark.asyncio
+async def test_clients_share_one_poller(monkeypatch):
+    monkeypatch.setattr(services.quote_stream, "get_logger", lambda name, **_: logging.getLogger(name))
+    broker = CountingBroker()
+    service = QuoteStreamService(StaticPool(broker), poll_interval=0.02)
+    first = await service.subscribe("upstox", None, "ltp", INSTRUMENTS[:1], max_rate=100)
+    second = await service.subscribe("upstox", None, "ltp", INSTRUMENTS, max_rate=100)
+
+    assert set(await first.next()) == {"NSE:EQ:2885"}
+    assert set(await second.next()) == {"NSE:EQ:2885", "NSE:EQ:11536"}
+    polls = broker.polls
+    await asyncio.sleep(0.1)
+    # One poll per interval for both clients, not one per client.
+    assert broker.polls - polls <= 6
+    assert set(await first.next()) == {"NSE:EQ:2885"}
+
+    with pytest.raises(ValueError):
+        await service.subscribe("upstox", None, "depth", INSTRUMENTS, max_rate=1)
+
+    assert sorted(set(broker.held)) == ["11536", "2885"]
+
+    await service.unsubscribe(first)
+    await service.unsubscribe(second)
+    assert broker.held == []
+    polls = broker.polls
+    await asyncio.sleep(0.05)
+    assert broker.polls == polls
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_hub_polls_as_fast_as_its_fastest_client(monkeypatch):
+    monkeypatch.setattr(services.quote_stream, "get_logger", lambda name, **_: logging.getLogger(name))
+    broker = CountingBroker()
+    service = QuoteStreamService(StaticPool(broker), poll_interval=1.0, max_rate=50)
+    slow = await service.subscribe("upstox", None, "ltp", INSTRUMENTS, max_rate=1)
+    polls = broker.polls
+    await asyncio.sleep(0.2)
+    assert broker.polls == polls
+
+    fast = await service.subscribe("upstox", None, "ltp", INSTRUMENTS, max_rate=50)
+    polls = broker.polls
+    await asyncio.sleep(0.2)
+    assert broker.polls - polls >= 4
+    # Cached quotes older than the poll spacing are not accepted...
+    assert broker.max_ages[-1] == pytest.approx(0.02)
+
+    # ...unless they come from the live feed's quote book.
+    broker.has_market_feed = True
+    await asyncio.sleep(0.05)
+    assert broker.max_ages[-1] is None
+
+    await service.unsubscribe(fast)
+    await service.unsubscribe(slow)
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_hold_leaves_the_hub_unchanged(monkeypatch):
+    monkeypatch.setattr(services.quote_stream, "get_logger", lambda name, **_: logging.getLogger(name))
+    broker = CountingBroker()
+    broker.failing.add("11536")
+    service = QuoteStreamService(StaticPool(broker), poll_interval=0.02)
+
+    with pytest.raises(RuntimeError):
+        await service.subscribe("upstox", None, "ltp", INSTRUMENTS[1:], max_rate=100)
+    assert service._hubs == {}
+
+    first = await service.subscribe("upstox", None, "ltp", INSTRUMENTS[:1], max_rate=100)
+    with pytest.raises(RuntimeError):
+        await service.subscribe("upstox", None, "ltp", INSTRUMENTS, max_rate=100)
+    hub = service._stream_hubs[first]
+    assert hub.streams == {first}
+    assert list(hub._refcounts) == [("2885", "NSE", "EQ")]
+    assert broker.held == ["2885"]
+
+    await service.unsubscribe(first)
+    assert service._hubs == {} and broker.held == []
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_instruments_sharing_a_token_are_kept_apart(monkeypatch):
+    monkeypatch.setattr(services.quote_stream, "get_logger", lambda name, **_: logging.getLogger(name))
+    broker = CountingBroker()
+    service = QuoteStreamService(StaticPool(broker), poll_interval=0.02)
+    instruments = INSTRUMENTS + [{"exchange_token": "2885", "exchange": "BSE", "instrument_type": "EQ"}]
+    stream = await service.subscribe("upstox", None, "ltp", instruments, max_rate=100)
+
+    update = await stream.next()
+    assert set(update) == {"NSE:EQ:2885", "NSE:EQ:11536", "BSE:EQ:2885"}
+    assert update["NSE:EQ:2885"]["exchange"] == "NSE"
+    assert update["BSE:EQ:2885"]["exchange"] == "BSE"
+
+    await service.unsubscribe(stream)
+    await service.close()
@@ -0,0 +1,66 @@
+"""
+Tests for enriching Upstox quotes through the reverse instrument index.
+"""
+
+import logging
+
+import polars as pl
+import pytest
+
+from brokers.upstox.broker import UpstoxBroker
+
+
+def make_broker() -> UpstoxBroker:
+    broker = UpstoxBroker(config={}, logger=logging.getLogger("test_convert_quote"))
+    broker.master_df = pl.DataFrame(
+        {
+            "instrument_key": ["NSE_EQ|INE002A01018", "NSE_FO|43919", "NSE_INDEX|Nifty 50"],
+            "exchange_token": [2885, 43919, 26000],
+            "tradingsymbol": ["RELIANCE", "NIFTY26OCT25000CE", "NIFTY"],
+            "name": ["RELIANCE", "NIFTY", "NIFTY"],
+            "expiry": [None, "2026-10-27", None],
+            "strike": [None, 25000.0, None],
+            "tick_size": [0.05, 0.05, 0.05],
+            "lot_size": [1, 75, 1],
+            "instrument_type": ["EQ", "CE", "INDEX"],
+            "option_type": [None, "CE", None],
+            "exchange": ["NSE_EQ", "NSE_FO", "NSE_INDEX"],
+        },
+        schema_overrides={"expiry": pl.Utf8, "strike": pl.Float64, "option_type": pl.Utf8},
+    )
+    broker._build_master_indexes()
+    return broker
+
+
+@pytest.mark.asyncio
+async def test_quotes_are_keyed_by_exchange_token_and_enriched():
+    broker = make_broker()
+    quotes = await broker.convert_quote({
+        "NSE_EQ:RELIANCE": {"instrument_token": "NSE_EQ|INE002A01018", "last_price": 1400.0},
+        "NSE_FO:NIFTY26OCT25000CE": {"instrument_token": "NSE_FO|43919", "last_price": 120.5},
+    })
+
+    assert quotes == {
+        2885: {
+            "instrument_token": "NSE_EQ|INE002A01018", "last_price": 1400.0,
+            "trading_symbol": "RELIANCE", "instrument_type": "EQ",
+        },
+        # The request-side instrument type is the segment suffix, not the master's option type.
+        43919: {
+            "instrument_token": "NSE_FO|43919", "last_price": 120.5,
+            "trading_symbol": "NIFTY26OCT25000CE", "instrument_type": "FO",
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_unknown_and_keyless_quotes_are_skipped():
+    broker = make_broker()
+    quotes = await broker.convert_quote({
+        "NSE_EQ:GONE": {"instrument_token": "NSE_EQ|INE000000000", "last_price": 1.0},
+        "NSE_EQ:BROKEN": {"last_price": 2.0},
+        "NSE_INDEX:Nifty 50": {"instrument_token": "NSE_INDEX|Nifty 50", "last_price": 25000.0},
+    })
+
+    assert list(quotes) == [26000]
+    assert quotes[26000]["instrument_type"] == "INDEX"
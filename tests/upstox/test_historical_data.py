@@ -0,0 +1,118 @@
+"""
+Tests for the concurrent chunked Upstox historical data fetch.
+"""
+
+import asyncio
+import logging
+from datetime import date, timedelta
+
+import pytest
+from aiohttp import web
+
+import brokers.base.broker
+import brokers.upstox.broker
+from tests.local_server import LocalServer
+from tests.upstox.test_market_feed import SessionDatetime, make_broker
+
+
+class HistoryServer(LocalServer):
+    """
+    Serves one daily candle per requested chunk, failing chosen chunks
+    transiently the first time they are requested.
+    """
+
+    def __init__(self, flaky=(), delay=0.05):
+        self.flaky = set(flaky)
+        self.delay = delay
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+
+    async def history(self, request):
+        to_date, from_date = request.match_info["to"], request.match_info["from"]
+        self.requests.append((from_date, to_date))
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if from_date in self.flaky:
+            self.flaky.discard(from_date)
+            return web.Response(status=503, text="busy")
+        candle = [f"{from_date}T00:00:00+05:30", 1.0, 2.0, 0.5, 1.5, 100, 0]
+        return web.json_response({"status": "success", "data": {"candles": [candle]}})
+
+    async def quotes(self, request):
+        key = request.query["instrument_key"]
+        self.requests.append(("quotes", key))
+        quote = {
+            "instrument_token": key, "last_price": 1402.5, "volume": 5000, "oi": 0,
+            "ohlc": {"open": 1400.0, "high": 1410.0, "low": 1395.0, "close": 1402.5},
+        }
+        return web.json_response({"status": "success", "data": {"NSE_EQ:RELIANCE": quote}})
+
+    def add_routes(self, router):
+        router.add_get("/v2/historical-candle/{key}/{interval}/{to}/{from}", self.history)
+        router.add_get("/v2/market-quote/quotes", self.quotes)
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_fetched_concurrently_and_merged_in_order():
+    async with HistoryServer(flaky={"2024-01-31"}) as server:
+        broker = make_broker(server.port)
+        try:
+            candles = await broker.historical_data(
+                exchange="NSE", exchange_token="2885", instrument_type="EQ",
+                interval="1minute", from_date="2023-12-30", to_date="2024-03-31",
+            )
+        finally:
+            await broker.close()
+
+    # 30-day windows between trading days; the weekends at both ends are skipped.
+    windows = [("2024-01-01", "2024-01-30"), ("2024-01-31", "2024-02-29"), ("2024-03-01", "2024-03-29")]
+    assert [candle["datetime"] for candle in candles] == [f"{start} 00:00:00" for start, _ in windows]
+    assert server.max_active > 1
+    # The failed chunk alone was retried.
+    assert len(server.requests) == len(windows) + 1
+    assert [request for request in server.requests if request[0] == "2024-01-31"] == [windows[1], windows[1]]
+    assert sorted(set(server.requests)) == windows
+
+
+@pytest.mark.asyncio
+async def test_unsupported_interval_is_rejected():
+    async with HistoryServer() as server:
+        broker = make_broker(server.port)
+        try:
+            with pytest.raises(ValueError):
+                await broker.historical_data(
+                    exchange="NSE", exchange_token="2885", instrument_type="EQ",
+                    interval="7minute", from_date="2024-01-01", to_date="2024-01-31",
+                )
+        finally:
+            await broker.close()
+    assert server.requests == []
+
+
+@pytest.mark.asyncio
+async def test_todays_daily_candle_is_built_from_the_full_quote(monkeypatch):
+    monkeypatch.setattr(brokers.base.broker, "datetime", SessionDatetime)
+    monkeypatch.setattr(brokers.upstox.broker, "datetime", SessionDatetime)
+    async with HistoryServer(delay=0) as server:
+        broker = make_broker(server.port)
+        try:
+            request = dict(exchange="NSE", exchange_token="2885", instrument_type="EQ", interval="day")
+            candles = await broker.historical_data(**request, from_date="2026-10-14", to_date="2026-10-15")
+
+            # Ranges ending before today are left as published.
+            published = await broker.historical_data(**request, from_date="2026-10-13", to_date="2026-10-14")
+        finally:
+            await broker.close()
+
+    assert candles == [
+        {"datetime": "2026-10-14 00:00:00", "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 100, "oi": 0},
+        {"datetime": "2026-10-15 00:00:00", "open": 1400.0, "high": 1410.0, "low": 1395.0, "close": 1402.5,
+         "volume": 5000, "oi": 0},
+    ]
+    assert [candle["datetime"] for candle in published] == ["2026-10-13 00:00:00"]
+    assert [request for request in server.requests if request[0] == "quotes"] == [("quotes", "NSE_EQ|INE002A01018")]
@@ -0,0 +1,83 @@
+"""
+Tests for the broker's shared, pooled HTTP session.
+"""
+
+import logging
+
+import polars as pl
+import pytest
+from aiohttp import web
+
+from brokers.upstox.broker import UpstoxBroker
+from tests.local_server import LocalServer
+
+
+def make_broker(port: int) -> UpstoxBroker:
+    broker = UpstoxBroker(config={"account_name": "http-session-test"}, logger=logging.getLogger("test_http_session"))
+    broker.BASE_URL = f"http://127.0.0.1:{port}/v2"
+    broker.access_token = "token"
+    broker.master_df = pl.DataFrame(
+        {
+            "instrument_key": ["NSE_EQ|INE002A01018"],
+            "exchange_token": [2885],
+            "tradingsymbol": ["RELIANCE"],
+            "name": ["RELIANCE"],
+            "expiry": [None],
+            "strike": [None],
+            "tick_size": [0.05],
+            "lot_size": [1],
+            "instrument_type": ["EQ"],
+            "option_type": [None],
+            "exchange": ["NSE_EQ"],
+        },
+        schema_overrides={"expiry": pl.Utf8, "strike": pl.Float64, "option_type": pl.Utf8},
+    )
+    broker._build_master_indexes()
+    return broker
+
+
+class PeerServer(LocalServer):
+    """
+    Serves LTP quotes, recording the client address of every request.
+    """
+
+    def __init__(self):
+        self.peers = []
+
+    async def quotes(self, request):
+        self.peers.append(request.transport.get_extra_info("peername"))
+        keys = request.query["instrument_key"].split(",")
+        return web.json_response({
+            "status": "success",
+            "data": {f"NSE_EQ:{key}": {"instrument_token": key, "last_price": 1.0} for key in keys},
+        })
+
+    def add_routes(self, router):
+        router.add_get("/v2/market-quote/ltp", self.quotes)
+
+
+@pytest.mark.asyncio
+async def test_requests_reuse_one_session_and_connection():
+    request = [{"exchange_token": "2885", "exchange": "NSE", "instrument_type": "EQ"}]
+    async with PeerServer() as server:
+        broker = make_broker(server.port)
+        broker.config["http_pool_size"] = 7
+        session = broker._get_session()
+        assert broker._get_session() is session
+        assert session.connector.limit == 7
+        assert session.connector.limit_per_host == broker.HTTP_POOL_SIZE_PER_HOST
+
+        for _ in range(3):
+            await broker.ltp_quote(request, max_age=0)
+        assert len(server.peers) == 3
+        # Keep-alive: every call went over the same connection.
+        assert len(set(server.peers)) == 1
+
+        await broker.close()
+        assert session.closed
+        assert broker._session is None
+
+        # A closed broker opens a fresh session if it is used again.
+        await broker.ltp_quote(request, max_age=0)
+        assert broker._get_session() is not session
+        await broker.close()
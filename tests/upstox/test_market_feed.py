@@ -0,0 +1,264 @@
+"""
+Tests for the Upstox market data feed against a local WebSocket server that
+replays recorded-style protobuf frames.
+"""
+
+import json
+import asyncio
+import logging
+
+import polars as pl
+import pytest
+from aiohttp import web
+from datetime import datetime
+
+import brokers.base.broker
+from brokers.base.master_cache import EXCHANGE_TIMEZONE
+from brokers.upstox.broker import UpstoxBroker
+from brokers.upstox.market_feed import decode_frame
+from brokers.upstox.proto import MarketDataFeedV3_pb2 as feed_pb
+from tests.local_server import LocalServer
+
+
+INSTRUMENTS = {
+    "NSE_EQ|INE002A01018": ("2885", "RELIANCE"),
+    "NSE_EQ|INE467B01029": ("11536", "TCS"),
+}
+
+
+def full_feed_frame(instrument_key: str, ltp: float) -> bytes:
+    response = feed_pb.FeedResponse(type=feed_pb.live_feed, currentTs=1760600000000)
+    market_feed = response.feeds[instrument_key].fullFeed.marketFF
+    market_feed.ltpc.ltp = ltp
+    market_feed.ltpc.ltt = 1760600000000
+    market_feed.ltpc.ltq = 5
+    market_feed.ltpc.cp = ltp - 10
+    market_feed.marketLevel.bidAskQuote.add(bidQ=10, bidP=ltp - 0.05, askQ=12, askP=ltp + 0.05)
+    market_feed.marketOHLC.ohlc.add(interval="1d", open=ltp - 5, high=ltp + 5, low=ltp - 8, close=ltp, vol=1000)
+    market_feed.atp = ltp - 1
+    market_feed.vtt = 123456
+    market_feed.tbq = 1000
+    market_feed.tsq = 2000
+    return response.SerializeToString()
+
+
+def ltpc_frame(instrument_key: str, ltp: float) -> bytes:
+    response = feed_pb.FeedResponse(type=feed_pb.live_feed)
+    ltpc = response.feeds[instrument_key].ltpc
+    ltpc.ltp = ltp
+    ltpc.ltt = 1760600001000
+    ltpc.cp = ltp - 10
+    return response.SerializeToString()
+
+
+def master_df() -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "instrument_key": list(INSTRUMENTS),
+            "exchange_token": [int(token) for token, _ in INSTRUMENTS.values()],
+            "tradingsymbol": [symbol for _, symbol in INSTRUMENTS.values()],
+            "name": [symbol for _, symbol in INSTRUMENTS.values()],
+            "expiry": [None] * len(INSTRUMENTS),
+            "strike": [None] * len(INSTRUMENTS),
+            "tick_size": [0.05] * len(INSTRUMENTS),
+            "lot_size": [1] * len(INSTRUMENTS),
+            "instrument_type": ["EQ"] * len(INSTRUMENTS),
+            "option_type": [None] * len(INSTRUMENTS),
+            "exchange": ["NSE_EQ"] * len(INSTRUMENTS),
+        },
+        schema_overrides={"expiry": pl.Utf8, "strike": pl.Float64, "option_type": pl.Utf8},
+    )
+
+
+class ReplayServer(LocalServer):
+    """
+    Serves the feed authorize endpoint and a WebSocket that answers every
+    subscription with the replay frames of the subscribed instruments.
+    """
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.subscriptions = []
+        self.connections = 0
+        self.sockets = []
+        self.rest_calls = 0
+        self.history_requests = []
+
+    async def authorize(self, request):
+        return web.json_response({
+            "status": "success",
+            "data": {"authorized_redirect_uri": f"ws://{request.host}/feed"},
+        })
+
+    async def feed(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        self.sockets.append(ws)
+        async for message in ws:
+            subscription = json.loads(message.data)
+            self.subscriptions.append(subscription)
+            if subscription["method"] == "sub":
+                for instrument_key in subscription["data"]["instrumentKeys"]:
+                    for frame in self.frames.get(instrument_key, []):
+                        await ws.send_bytes(frame)
+        return ws
+
+    async def quotes(self, request):
+        self.rest_calls += 1
+        keys = request.query["instrument_key"].split(",")
+        return web.json_response({
+            "status": "success",
+            "data": {f"NSE_EQ:{key}": {"instrument_token": key, "last_price": 1.0} for key in keys},
+        })
+
+    async def history(self, request):
+        self.history_requests.append(request.path)
+        return web.json_response({"status": "success", "data": {"candles": []}})
+
+    def add_routes(self, router):
+        router.add_get("/v2/historical-candle/{tail:.*}", self.history)
+        router.add_get("/v3/feed/market-data-feed/authorize", self.authorize)
+        router.add_get("/feed", self.feed)
+        router.add_get("/v2/market-quote/ltp", self.quotes)
+
+    async def __aexit__(self, *exc_info):
+        for ws in self.sockets:
+            await ws.close()
+        await super().__aexit__(*exc_info)
+
+
+def make_broker(port: int, mode: str = "full") -> UpstoxBroker:
+    broker = UpstoxBroker(
+        config={
+            "account_name": "market-feed-test",
+            "retry_policy": {"base_delay": 0.01},
+            "market_data_feed": {"mode": mode, "batch_window_ms": 1},
+        },
+        logger=logging.getLogger("test_market_feed"),
+    )
+    broker.BASE_URL = f"http://127.0.0.1:{port}/v2"
+    broker.BASE_URL_V3 = f"http://127.0.0.1:{port}/v3"
+    broker.access_token = "token"
+    broker.master_df = master_df()
+    broker._build_master_indexes()
+    return broker
+
+
+async def wait_for(condition, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def test_decode_full_feed_frame():
+    quotes = decode_frame(full_feed_frame("NSE_EQ|INE002A01018", 1400.0))
+    quote = quotes["NSE_EQ|INE002A01018"]
+    assert quote["instrument_token"] == "NSE_EQ|INE002A01018"
+    assert quote["last_price"] == 1400.0
+    assert quote["net_change"] == 10.0
+    assert quote["ohlc"] == {"open": 1395.0, "high": 1405.0, "low": 1392.0, "close": 1400.0}
+    assert quote["depth"]["buy"] == [{"quantity": 10, "price": pytest.approx(1399.95)}]
+    assert quote["volume"] == 123456
+    assert quote["total_sell_quantity"] == 2000
+
+
+def test_decode_market_info_frame():
+    response = feed_pb.FeedResponse(type=feed_pb.market_info)
+    response.marketInfo.segmentStatus["NSE_EQ"] = feed_pb.NORMAL_OPEN
+    assert decode_frame(response.SerializeToString()) == {}
+
+
+@pytest.mark.asyncio
+async def test_feed_serves_quotes_from_book():
+    reliance, tcs = list(INSTRUMENTS)
+    frames = {reliance: [full_feed_frame(reliance, 1400.0), ltpc_frame(reliance, 1401.5)]}
+    async with ReplayServer(frames) as server:
+        broker = make_broker(server.port, mode="ltpc")
+        try:
+            await broker.start_market_feed(
+                [{"exchange_token": "2885", "exchange": "NSE", "instrument_type": "EQ"}]
+            )
+            await broker.feed_subscriptions.wait_connected(timeout=5)
+            await wait_for(lambda: broker.quote_book.get(reliance) is not None
+                           and broker.quote_book.get(reliance)["last_price"] == 1401.5)
+            assert server.subscriptions[0]["data"] == {"mode": "ltpc", "instrumentKeys": [reliance]}
+
+            quotes = await broker.ltp_quote([
+                {"exchange_token": "2885", "exchange": "NSE", "instrument_type": "EQ"},
+                {"exchange_token": "11536", "exchange": "NSE", "instrument_type": "EQ"},
+            ])
+            assert quotes[2885]["last_price"] == 1401.5
+            assert quotes[2885]["trading_symbol"] == "RELIANCE"
+            assert quotes[11536]["last_price"] == 1.0
+            assert server.rest_calls == 1
+
+            # A forced fresh fetch bypasses the book.
+            quotes = await broker.ltp_quote(
+                [{"exchange_token": "2885", "exchange": "NSE", "instrument_type": "EQ"}], max_age=0
+            )
+            assert quotes[2885]["last_price"] == 1.0
+
+            # Streamed ticks and the fresh REST quote are recorded for the held instrument.
+            ticks = broker.ticks([{"exchange_token": "2885", "exchange": "NSE", "instrument_type": "EQ"}])
+            assert ticks["2885"]["last_price"] == [1400.0, 1401.5, 1.0]
+        finally:
+            await broker.close()
+        assert len(broker.quote_book) == 0
+
+
+@pytest.mark.asyncio
+async def test_feed_resubscribes_after_disconnect():
+    reliance = "NSE_EQ|INE002A01018"
+    async with ReplayServer({reliance: [full_feed_frame(reliance, 1400.0)]}) as server:
+        broker = make_broker(server.port)
+        try:
+            await broker.start_market_feed(
+                [{"exchange_token": "2885", "exchange": "NSE", "instrument_type": "EQ"}]
+            )
+            await wait_for(lambda: broker.quote_book.get(reliance) is not None)
+
+            await server.sockets[0].close()
+            await wait_for(lambda: server.connections == 2 and broker.quote_book.get(reliance) is not None)
+            assert [s["data"]["instrumentKeys"] for s in server.subscriptions] == [[reliance], [reliance]]
+        finally:
+            await broker.close()
+
+
+class SessionDatetime(datetime):
+    """
+    datetime pinned to 10:00 on a trading day.
+    """
+
+    @classmethod
+    def now(cls, tz=None):
+        now = datetime(2026, 10, 15, 10, 0, tzinfo=EXCHANGE_TIMEZONE)
+        return now.astimezone(tz) if tz else now.replace(tzinfo=None)
+
+
+@pytest.mark.asyncio
+async def test_historical_data_serves_the_current_session_from_ticks(monkeypatch):
+    monkeypatch.setattr(brokers.base.broker, "datetime", SessionDatetime)
+    reliance = "NSE_EQ|INE002A01018"
+    session = lambda clock: datetime.fromisoformat(f"2026-10-15T{clock}+05:30").timestamp()
+    async with ReplayServer({}) as server:
+        broker = make_broker(server.port)
+        try:
+            broker.tick_store.track([reliance], timestamp=session("09:00:00"))
+            broker.tick_store.record({reliance: {"last_price": 1400.0, "volume": 100}}, timestamp=session("09:15:30"))
+            broker.tick_store.record({reliance: {"last_price": 1402.5, "volume": 160}}, timestamp=session("09:16:10"))
+            request = dict(exchange="NSE", exchange_token="2885", instrument_type="EQ", interval="1minute")
+
+            candles = await broker.historical_data(**request, from_date="2026-10-15", to_date="2026-10-15")
+            assert [candle["datetime"] for candle in candles] == ["2026-10-15 09:15:00", "2026-10-15 09:16:00"]
+            assert [candle["volume"] for candle in candles] == [100, 60]
+            assert server.history_requests == []
+
+            # Only the closed sessions are fetched upstream.
+            candles = await broker.historical_data(**request, from_date="2026-10-14", to_date="2026-10-15")
+            assert server.history_requests == [f"/v2/historical-candle/{reliance}/1minute/2026-10-14/2026-10-14"]
+            assert candles[-1]["close"] == 1402.5
+        finally:
+            await broker.close()
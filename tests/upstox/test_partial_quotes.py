@@ -0,0 +1,107 @@
+"""
+Tests for keeping the successful chunks of a request when others fail.
+"""
+
+import polars as pl
+import pytest
+from aiohttp import web
+
+from api.endpoints import get_ltp_quote
+from tests.local_server import LocalServer
+from tests.upstox.test_market_feed import make_broker
+
+
+# More instruments than one LTP chunk (750) holds.
+TOKENS = list(range(1, 801))
+
+
+def big_master_df() -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "instrument_key": [f"NSE_EQ|ISIN{token}" for token in TOKENS],
+            "exchange_token": TOKENS,
+            "tradingsymbol": [f"SYM{token}" for token in TOKENS],
+            "name": [f"SYM{token}" for token in TOKENS],
+            "expiry": [None] * len(TOKENS),
+            "strike": [None] * len(TOKENS),
+            "tick_size": [0.05] * len(TOKENS),
+            "lot_size": [1] * len(TOKENS),
+            "instrument_type": ["EQ"] * len(TOKENS),
+            "option_type": [None] * len(TOKENS),
+            "exchange": ["NSE_EQ"] * len(TOKENS),
+        },
+        schema_overrides={"expiry": pl.Utf8, "strike": pl.Float64, "option_type": pl.Utf8},
+    )
+
+
+class FailingChunkServer(LocalServer):
+    """
+    Serves LTP quotes, rejecting any chunk that contains the last instrument.
+    """
+
+    async def quotes(self, request):
+        keys = request.query["instrument_key"].split(",")
+        if f"NSE_EQ|ISIN{TOKENS[-1]}" in keys:
+            return web.json_response({"status": "error"}, status=400)
+        return web.json_response({
+            "status": "success",
+            "data": {f"NSE_EQ:{key}": {"instrument_token": key, "last_price": 1.0} for key in keys},
+        })
+
+    def add_routes(self, router):
+        router.add_get("/v2/market-quote/ltp", self.quotes)
+
+
+@pytest.mark.asyncio
+async def test_failed_chunks_are_reported_instead_of_failing_the_request():
+    broker = make_broker(0)
+
+    async def fetch_chunk(chunk):
+        if "b" in chunk:
+            raise Exception("rejected")
+        return {key: key.upper() for key in chunk}
+
+    errors = {}
+    result = await broker._gather_chunks("ltp", [["a"], ["b", "c"], ["d"]], fetch_chunk, errors=errors)
+    assert result == {"a": "A", "d": "D"}
+    assert {key: str(error) for key, error in errors.items()} == {"b": "rejected", "c": "rejected"}
+
+    # Without an errors map, or when every chunk fails, the request fails.
+    with pytest.raises(Exception, match="rejected"):
+        await broker._gather_chunks("ltp", [["a"], ["b"]], fetch_chunk)
+    with pytest.raises(Exception, match="rejected"):
+        await broker._gather_chunks("ltp", [["b"]], fetch_chunk, errors={})
+
+
+@pytest.mark.asyncio
+async def test_ltp_quote_returns_the_fetched_instruments_and_their_errors():
+    request = [{"exchange_token": str(token), "exchange": "NSE", "instrument_type": "EQ"} for token in TOKENS]
+    async with FailingChunkServer() as server:
+        broker = make_broker(server.port)
+        broker.master_df = big_master_df()
+        broker._build_master_indexes()
+
+        errors = {}
+        quotes = await broker.ltp_quote(request, max_age=0, errors=errors)
+        assert len(quotes) == 750
+        assert set(errors) == {str(token) for token in TOKENS[750:]}
+        assert "400" in errors[str(TOKENS[-1])]
+
+        with pytest.raises(Exception):
+            await broker.ltp_quote(request, max_age=0)
+        await broker.close()
+
+
+@pytest.mark.asyncio
+async def test_quote_endpoint_reports_a_partial_response():
+    class PartialBroker:
+        async def ltp_quote(self, request_data, max_age=None, errors=None):
+            errors["11536"] = "rejected"
+            return {"2885": {"last_price": 1.0}}
+
+    response = await get_ltp_quote(instruments=[], max_age=None, broker=PartialBroker())
+    assert response == {
+        "status": "partial",
+        "data": {"2885": {"last_price": 1.0}},
+        "errors": {"11536": "rejected"},
+    }
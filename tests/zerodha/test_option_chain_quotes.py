@@ -0,0 +1,132 @@
+"""
+Tests for option chains with attached Kite quotes.
+"""
+
+import logging
+
+import polars as pl
+import pytest
+from aiohttp import web
+
+from api.endpoints import get_option_chain_instruments
+from brokers.zerodha.broker import ZERODHA_MASTER_SCHEMA, ZerodhaBroker
+from tests.local_server import LocalServer
+
+
+# (instrument_token, exchange_token, tradingsymbol, expiry, strike, instrument_type)
+CONTRACTS = [
+    (1001, 11, "NIFTY26OCT25000CE", "2026-10-27", 25000.0, "CE"),
+    (1002, 12, "NIFTY26OCT25000PE", "2026-10-27", 25000.0, "PE"),
+    (1003, 13, "NIFTY26OCT25100CE", "2026-10-27", 25100.0, "CE"),
+]
+
+
+def master_df() -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "instrument_token": [contract[0] for contract in CONTRACTS],
+            "exchange_token": [contract[1] for contract in CONTRACTS],
+            "tradingsymbol": [contract[2] for contract in CONTRACTS],
+            "name": ["NIFTY"] * len(CONTRACTS),
+            "last_price": [0.0] * len(CONTRACTS),
+            "expiry": [contract[3] for contract in CONTRACTS],
+            "strike": [contract[4] for contract in CONTRACTS],
+            "tick_size": [0.05] * len(CONTRACTS),
+            "lot_size": [75] * len(CONTRACTS),
+            "instrument_type": [contract[5] for contract in CONTRACTS],
+            "segment": ["NFO-OPT"] * len(CONTRACTS),
+            "exchange": ["NFO"] * len(CONTRACTS),
+        },
+        schema=ZERODHA_MASTER_SCHEMA,
+    )
+
+
+class QuoteServer(LocalServer):
+    """
+    Serves the Kite full and OHLC quote endpoints for the master's contracts.
+    """
+
+    def __init__(self):
+        self.requests = []
+
+    async def quote(self, request):
+        keys = request.query.getall("i")
+        self.requests.append(keys)
+        tokens = {f"NFO:{contract[2]}": contract[0] for contract in CONTRACTS}
+        return web.json_response({
+            "status": "success",
+            "data": {
+                key: {"instrument_token": tokens[key], "last_price": 100.0 + tokens[key] % 10, "oi": 5}
+                for key in keys
+            },
+        })
+
+    async def ohlc(self, request):
+        keys = request.query.getall("i")
+        self.requests.append(keys)
+        tokens = {f"NFO:{contract[2]}": contract[0] for contract in CONTRACTS}
+        return web.json_response({
+            "status": "success",
+            "data": {
+                key: {
+                    "instrument_token": tokens[key],
+                    "last_price": 100.0,
+                    "ohlc": {"open": 90.0, "high": 110.0, "low": 85.0, "close": 95.0},
+                }
+                for key in keys
+            },
+        })
+
+    def add_routes(self, router):
+        router.add_get("/quote", self.quote)
+        router.add_get("/quote/ohlc", self.ohlc)
+
+
+def make_broker(port: int) -> ZerodhaBroker:
+    broker = ZerodhaBroker(
+        config={"account_name": "option-chain-test"},
+        logger=logging.getLogger("test_option_chain_quotes"),
+    )
+    broker.BASE_URL = f"http://127.0.0.1:{port}/"
+    broker.access_token = "token"
+    broker.master_df = master_df()
+    broker._build_master_indexes()
+    return broker
+
+
+@pytest.mark.asyncio
+async def test_option_chain_with_full_quotes():
+    async with QuoteServer() as server:
+        broker = make_broker(server.port)
+        try:
+            response = await get_option_chain_instruments(
+                underlying="NIFTY", expiry=None, quote="full", broker=broker
+            )
+        finally:
+            await broker.close()
+
+    # The whole chain is quoted in one batched call.
+    assert sorted(server.requests[0]) == sorted(f"NFO:{contract[2]}" for contract in CONTRACTS)
+    strikes = response["data"]["expiries"]["2026-10-27"]
+    assert [row["strike"] for row in strikes] == [25000.0, 25100.0]
+    assert strikes[0]["CE"]["quote"]["last_price"] == 101.0
+    assert strikes[0]["PE"]["quote"]["last_price"] == 102.0
+    assert strikes[1]["CE"]["quote"]["oi"] == 5
+    assert strikes[1]["PE"] is None
+
+
+@pytest.mark.asyncio
+async def test_option_chain_with_ohlc_quotes():
+    async with QuoteServer() as server:
+        broker = make_broker(server.port)
+        try:
+            response = await get_option_chain_instruments(
+                underlying="NIFTY", expiry=None, quote="ohlc", broker=broker
+            )
+        finally:
+            await broker.close()
+
+    assert sorted(server.requests[0]) == sorted(f"NFO:{contract[2]}" for contract in CONTRACTS)
+    strikes = response["data"]["expiries"]["2026-10-27"]
+    assert strikes[0]["CE"]["quote"]["ohlc"] == {"open": 90.0, "high": 110.0, "low": 85.0, "close": 95.0}
+    assert strikes[1]["CE"]["quote"]["tradingsymbol"] == "NIFTY26OCT25100CE"
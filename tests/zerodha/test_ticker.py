@@ -0,0 +1,86 @@
+"""
+Tests for the Kite ticker binary packet decoder.
+"""
+
+import struct
+
+import pytest
+
+from brokers.zerodha.ticker import batch_quotes, decode_message
+
+
+NSE_TOKEN = (738561 << 8) | 1     # segment 1: NSE, prices in paise
+CDS_TOKEN = (1234 << 8) | 3       # segment 3: CDS, 7 decimals
+INDEX_TOKEN = (1024 << 8) | 9     # segment 9: indices
+
+
+def message(*packets: bytes) -> bytes:
+    body = b"".join(struct.pack(">H", len(packet)) + packet for packet in packets)
+    return struct.pack(">H", len(packets)) + body
+
+
+def ltp_packet(token: int, ltp: int) -> bytes:
+    return struct.pack(">II", token, ltp)
+
+
+def quote_packet(token: int, ltp: int) -> bytes:
+    # ltp, last qty, avg price, volume, buy qty, sell qty, open, high, low, close
+    return struct.pack(">11I", token, ltp, 7, ltp - 50, 100000, 400, 600, ltp - 100, ltp + 200, ltp - 300, ltp - 1000)
+
+
+def full_packet(token: int, ltp: int) -> bytes:
+    packet = quote_packet(token, ltp)
+    packet += struct.pack(">5I", 1760600000, 5000, 5200, 4800, 1760600001)
+    for level in range(10):
+        price = ltp - 5 * (level + 1) if level < 5 else ltp + 5 * (level - 4)
+        packet += struct.pack(">IIHxx", 10 * (level + 1), price, level + 1)
+    return packet
+
+
+def test_decode_ltp_message():
+    [(mode, columns)] = decode_message(message(ltp_packet(NSE_TOKEN, 250075), ltp_packet(CDS_TOKEN, 835000000)))
+    assert mode == "ltp"
+    assert columns["instrument_token"].tolist() == [NSE_TOKEN, CDS_TOKEN]
+    assert columns["last_price"].tolist() == [2500.75, 83.5]
+
+
+def test_decode_full_message():
+    [(mode, columns)] = decode_message(message(full_packet(NSE_TOKEN, 250000)))
+    assert mode == "full"
+    quote = batch_quotes(columns)[NSE_TOKEN]
+    assert quote["last_price"] == 2500.0
+    assert quote["last_quantity"] == 7
+    assert quote["average_price"] == 2499.5
+    assert quote["volume"] == 100000
+    assert quote["ohlc"] == {"open": 2499.0, "high": 2502.0, "low": 2497.0, "close": 2490.0}
+    assert quote["net_change"] == 10.0
+    assert quote["oi"] == 5000
+    assert quote["oi_day_low"] == 4800
+    assert quote["last_trade_time"] == "2025-10-16 13:03:20"
+    assert quote["timestamp"] == "2025-10-16 13:03:21"
+    assert quote["depth"]["buy"][0] == {"price": 2499.95, "quantity": 10, "orders": 1}
+    assert quote["depth"]["sell"][4] == {"price": 2500.25, "quantity": 100, "orders": 10}
+
+
+def test_decode_index_quote():
+    packet = struct.pack(">7I", INDEX_TOKEN, 2500000, 2510000, 2490000, 2495000, 2480000, 0)
+    [(mode, columns)] = decode_message(message(packet))
+    assert mode == "quote"
+    quote = batch_quotes(columns)[INDEX_TOKEN]
+    assert quote["ohlc"] == {"open": 24950.0, "high": 25100.0, "low": 24900.0, "close": 24800.0}
+    assert quote["net_change"] == 200.0
+    assert "volume" not in quote
+
+
+def test_decode_mixed_modes():
+    batches = dict(decode_message(message(
+        ltp_packet(CDS_TOKEN, 835000000), quote_packet(NSE_TOKEN, 250000), ltp_packet(NSE_TOKEN + 256, 100)
+    )))
+    assert batches["ltp"]["instrument_token"].tolist() == [CDS_TOKEN, NSE_TOKEN + 256]
+    assert batches["quote"]["last_price"].tolist() == [2500.0]
+
+
+def test_heartbeat_and_truncated_messages():
+    assert decode_message(b"\x00") == []
+    with pytest.raises(ValueError):
+        decode_message(message(quote_packet(NSE_TOKEN, 250000), ltp_packet(NSE_TOKEN, 1))[:-3])